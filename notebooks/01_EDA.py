@@ -1,31 +1,39 @@
-
 # 01_EDA.py
 # Quick EDA: correlations and simple aggregations for Q03-Q06.
 # Usage:
-#   pip install pandas numpy matplotlib seaborn
+#   pip install pandas numpy matplotlib seaborn duckdb
 #   python notebooks/01_EDA.py
+#   PM_MEMORY_LIMIT=2GB python notebooks/01_EDA.py   # hourly/nodal-scale data
+#   PM_PROFILE=1 python notebooks/01_EDA.py          # + run report in outputs/profiles/
+#
+# The correlations are computed inside DuckDB (see power_market/questions.py),
+# so the drivers table is streamed rather than loaded into pandas. Nothing
+# runs on import; matplotlib loads only when the heatmap is drawn.
 
 import os
-import pandas as pd
-import matplotlib.pyplot as plt
+import sys
+
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE)
+
+from power_market.cache import connect  # noqa: E402
+from power_market.paths import CHARTS_DIR, OUTPUTS_DIR  # noqa: E402
+from power_market.profiling import RunReport, enabled  # noqa: E402
+from power_market.questions import corr_heatmap, q03  # noqa: E402
+
 
-BASE = os.path.dirname(os.path.dirname(__file__))
-VIEW_CSV = os.path.join(BASE, "outputs", "v_price_drivers_daily.csv")
+def main():
+    report = RunReport("eda") if enabled() else None
 
-df = pd.read_csv(VIEW_CSV, parse_dates=['date'])
+    with connect(names=["v_price_drivers_daily"]) as con:
+        corr = (report.stage("q03", q03, con, con=con) if report else q03(con)).set_index("")
+    corr.to_csv(os.path.join(OUTPUTS_DIR, "q03_correlations.csv"), index=True)
 
-num_cols = ['avg_price_usd_mwh','total_demand_mwh','renewable_share_pct','curtailment_mwh',
-            'hdd','cdd','dart_spread_usd_mwh','natgas_monthly',
-            'energy_cost_usd_mwh','congestion_cost_usd_mwh','losses_cost_usd_mwh']
+    corr_heatmap(corr, os.path.join(CHARTS_DIR, "q03_corr_heatmap.png"))
+    print("Saved correlations and heatmap.")
+    if report:
+        report.write()
 
-corr = df[num_cols].corr()
-corr.to_csv(os.path.join(BASE, "outputs", "q03_correlations.csv"), index=True)
 
-plt.figure(figsize=(8,6))
-plt.imshow(corr, cmap='coolwarm', vmin=-1, vmax=1)
-plt.xticks(range(len(num_cols)), num_cols, rotation=90)
-plt.yticks(range(len(num_cols)), num_cols)
-plt.colorbar(label='Correlation')
-plt.tight_layout()
-plt.savefig(os.path.join(BASE, "outputs/charts", "q03_corr_heatmap.png"), dpi=140)
-print("Saved correlations and heatmap.")
+if __name__ == "__main__":
+    main()
@@ -1,86 +1,87 @@
-
 # 02_Model_Forecast.py
 # Time-aware train/test, OLS + XGBoost for price modeling, and ARIMA for demand (optional).
 # Usage:
 #   pip install pandas numpy scikit-learn statsmodels xgboost
 #   python notebooks/02_Model_Forecast.py
+#   python notebooks/02_Model_Forecast.py --backtest --folds 24 --horizon 30 --workers 4
+#   python notebooks/02_Model_Forecast.py --fleet --workers 4      # one model per (region, scenario)
+#   python notebooks/02_Model_Forecast.py --profile                # + run report in outputs/profiles/
 
+import argparse
 import os
-import pandas as pd
-import numpy as np
-
-from sklearn.model_selection import TimeSeriesSplit
-from sklearn.compose import ColumnTransformer
-from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import OneHotEncoder, StandardScaler
-from sklearn.metrics import mean_absolute_error, mean_absolute_percentage_error, r2_score
-from sklearn.linear_model import LinearRegression
-from xgboost import XGBRegressor
+import sys
+from pathlib import Path
 
 # Paths (adjust if needed)
-BASE = os.path.dirname(os.path.dirname(__file__))
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 VIEW_CSV = os.path.join(BASE, "outputs", "v_price_drivers_daily.csv")  # Export this from DuckDB first!
-
-df = pd.read_csv(VIEW_CSV, parse_dates=['date'])
-
-# Keep only needed columns
-keep = [
-    'date','region','avg_price_usd_mwh','total_demand_mwh',
-    'energy_cost_usd_mwh','congestion_cost_usd_mwh','losses_cost_usd_mwh',
-    'renewable_share_pct','curtailment_mwh','hdd','cdd','dart_spread_usd_mwh',
-    'natgas_monthly','scenario'
-]
-df = df[keep].dropna()
-
-# Train/test split by time (2023-2024 train, 2025 test)
-train = df[df['date'] < '2025-01-01'].copy()
-test  = df[df['date'] >= '2025-01-01'].copy()
-
-target = 'avg_price_usd_mwh'
-num_feats = ['total_demand_mwh','energy_cost_usd_mwh','congestion_cost_usd_mwh','losses_cost_usd_mwh',
-             'renewable_share_pct','curtailment_mwh','hdd','cdd','dart_spread_usd_mwh','natgas_monthly']
-cat_feats = ['region','scenario']
-
-X_train = train[num_feats + cat_feats]
-y_train = train[target]
-X_test  = test[num_feats + cat_feats]
-y_test  = test[target]
-
-pre = ColumnTransformer([
-    ("num", StandardScaler(with_mean=False), num_feats),
-    ("cat", OneHotEncoder(handle_unknown="ignore"), cat_feats),
-])
-
-# 1) OLS (via LinearRegression) for interpretable coefficients (after one-hot/scale)
-ols = Pipeline([("pre", pre), ("model", LinearRegression(n_jobs=None))])
-
-# 2) XGBoost for non-linear interactions
-xgb = Pipeline([("pre", pre), ("model", XGBRegressor(
-    n_estimators=400, max_depth=6, learning_rate=0.06, subsample=0.9, colsample_bytree=0.9, random_state=42
-))])
-
-results = []
-
-for name, model in [("OLS", ols), ("XGB", xgb)]:
-    model.fit(X_train, y_train)
-    pred = model.predict(X_test)
-    mae = mean_absolute_error(y_test, pred)
-    mape = mean_absolute_percentage_error(y_test, pred)
-    r2 = r2_score(y_test, pred)
-    results.append({"model": name, "MAE": round(mae,2), "MAPE": round(mape,3), "R2": round(r2,3)})
-
-metrics = pd.DataFrame(results)
-OUT_METRICS = os.path.join(BASE, "outputs", "q07_model_metrics.csv")
-metrics.to_csv(OUT_METRICS, index=False)
-
-# Save sample predictions for Power BI
-pred_out = pd.DataFrame({
-    "date": test["date"],
-    "region": test["region"],
-    "y_true": y_test.values,
-    "y_pred": pred
-})
-pred_out_path = os.path.join(BASE, "outputs", "q08_price_forecast_sample.csv")
-pred_out.to_csv(pred_out_path, index=False)
-
-print("Saved:", OUT_METRICS, "and", pred_out_path)
+sys.path.insert(0, BASE)
+
+# The runs live in power_market.forecast (importable, no model libraries
+# loaded until a model is fitted); this script only prints and profiles them
+from power_market import forecast  # noqa: E402
+from power_market.fleet import FLEET_DIR  # noqa: E402
+from power_market.profiling import RunReport, enabled  # noqa: E402
+from power_market.scoring import GLOBAL_DIR  # noqa: E402
+
+
+def holdout(df):
+    forecast.holdout(df, out_dir=Path(BASE, "outputs"))
+    print("Saved:", os.path.join(BASE, "outputs", forecast.HOLDOUT_METRICS), "and",
+          os.path.join(BASE, "outputs", forecast.HOLDOUT_PREDS), "| models ->", GLOBAL_DIR)
+
+
+def rolling_backtest(df, folds, horizon, min_train, workers):
+    metrics, _ = forecast.rolling_backtest(df, folds, horizon, min_train, workers, out_dir=Path(BASE, "outputs"))
+    summary = metrics.groupby("model")[["MAE", "MAPE", "R2"]].agg(["mean", "std"]).round(3)
+    print(f"{metrics['fold'].nunique()} folds x {metrics['model'].nunique()} models")
+    print(summary)
+    print("Saved:", os.path.join(BASE, "outputs", forecast.BACKTEST_METRICS), "and",
+          os.path.join(BASE, "outputs", forecast.BACKTEST_PREDS))
+
+
+def fleet(df, workers, test_days, force):
+    metrics = forecast.fleet(df, workers, test_days, force)
+    summary = metrics.groupby("model")[["MAE", "MAPE", "R2"]].agg(["mean", "max"]).round(3)
+    retrained = int(metrics["retrained"].sum())
+    print(f"Fleet: {len(metrics)} shard model(s), {retrained} retrained, {len(metrics) - retrained} up to date")
+    print(summary)
+    print("Saved:", FLEET_DIR)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Price forecast models: 2025 holdout or rolling-origin backtest.")
+    parser.add_argument("--backtest", action="store_true", help="Rolling-origin backtest instead of the 2025 holdout")
+    parser.add_argument("--folds", type=int, default=24)
+    parser.add_argument("--horizon", type=int, default=30, help="Test days per fold")
+    parser.add_argument("--min-train", type=int, default=365, help="Minimum training days per fold")
+    parser.add_argument("--fleet", action="store_true", help="Train one model per (region, scenario) shard")
+    parser.add_argument("--test-days", type=int, default=90, help="Fleet holdout days per shard")
+    parser.add_argument("--force", action="store_true", help="Fleet: retrain every shard, even unchanged ones")
+    parser.add_argument("--workers", type=int, help="Process pool size (default: one per core)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Measure each stage into a JSON run report (outputs/profiles/); also PM_PROFILE=1")
+    args = parser.parse_args(argv)
+
+    report = RunReport("forecast") if enabled(args.profile) else None
+    stage = report.stage if report else (lambda name, fn, *a, outputs=(), **kw: fn(*a, **kw))
+    outputs = lambda *names: [Path(BASE, "outputs", n) for n in names]  # noqa: E731
+
+    df = stage("load", forecast.load_drivers, VIEW_CSV)
+
+    if args.fleet:
+        stage("fleet", fleet, df, args.workers, args.test_days, args.force,
+              outputs=[FLEET_DIR / "fleet_metrics.csv"])
+    elif args.backtest:
+        stage("backtest", rolling_backtest, df, args.folds, args.horizon, args.min_train, args.workers,
+              outputs=outputs(forecast.BACKTEST_METRICS, forecast.BACKTEST_PREDS))
+    else:
+        stage("holdout", holdout, df,
+              outputs=outputs(forecast.HOLDOUT_METRICS, forecast.HOLDOUT_PREDS))
+    if report:
+        report.write(mode="fleet" if args.fleet else "backtest" if args.backtest else "holdout",
+                     rows_in=len(df), workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
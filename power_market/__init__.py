@@ -0,0 +1,2 @@
+# power_market
+# Shared helpers for the scripts/ and notebooks/ analyses.
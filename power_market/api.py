@@ -0,0 +1,115 @@
+# api.py
+# Q03 and Q6–Q15 as plain functions for in-process callers (dashboards,
+# notebooks, other tools): no subprocess, no files written.
+#
+# Every function takes an optional connection plus the run filters and
+# returns a pandas DataFrame:
+#   con        a connection from cache.connect() (reused, e.g. across calls),
+#              or None to open one on the question's sources for this call
+#   regions, scenarios, start, end   as runner --region/--scenario/--start/--end
+#                                    (filters.Filters; Baseline is always kept)
+# The filters apply to a cursor of con only (cache.scoped), so one warm
+# connection serves any mix of them. Heavy libraries (matplotlib, xgboost,
+# scikit-learn) are not imported by this module or the questions it calls.
+#
+# Usage:
+#   from power_market.api import dart_stats
+#   dart_stats(regions=["CAISO"], start="2025-01-01")
+#
+#   from power_market.cache import connect
+#   con = connect()
+#   dart_stats(con, regions=["CAISO", "ERCOT"], start="2024-01-01", end="2024-12-31")
+
+import pandas as pd
+
+import power_market.questions  # noqa: F401  (registers the questions)
+from power_market.cache import connect, scoped
+from power_market.filters import Filters
+from power_market.output import to_frame
+from power_market.registry import QUESTIONS
+
+
+def answer(qid: str, con=None, regions=None, scenarios=None, start=None, end=None, **kwargs) -> pd.DataFrame:
+    """Any registered question as a DataFrame; kwargs go to the question function.
+
+    Answers computed in pandas come back as they are (index included); use
+    output.to_relation(con, df) when a DuckDB relation is wanted.
+    """
+    q = QUESTIONS[qid]
+    if q.takes_out_dir:
+        raise ValueError(f"{qid} writes files (charts); run it through power_market.runner")
+    owned = con is None
+    con = connect(names=q.sources) if owned else con
+    cur = scoped(con, Filters(regions, scenarios, start, end), q.sources)
+    try:
+        return to_frame(q.fn(cur, **kwargs))
+    finally:
+        cur.close()
+        if owned:
+            con.close()
+
+
+def correlation_matrix(con=None, *, regions=None, scenarios=None, start=None, end=None) -> pd.DataFrame:
+    """Q03: correlation matrix of the daily drivers."""
+    return answer("q03", con, regions, scenarios, start, end)
+
+
+def dart_stats(con=None, *, regions=None, scenarios=None, start=None, end=None) -> pd.DataFrame:
+    """Q6: min / mean / max DART spread by region."""
+    return answer("q06", con, regions, scenarios, start, end)
+
+
+def price_deltas(con=None, *, regions=None, scenarios=None, start=None, end=None) -> pd.DataFrame:
+    """Q7: monthly price by region and scenario against Baseline."""
+    return answer("q07", con, regions, scenarios, start, end)
+
+
+def natgas_price_correlation(con=None, *, regions=None, scenarios=None, start=None, end=None) -> pd.DataFrame:
+    """Q8: natgas vs price correlation by region and scenario."""
+    return answer("q08", con, regions, scenarios, start, end)
+
+
+def curtailment_deltas(con=None, *, regions=None, scenarios=None, start=None, end=None) -> pd.DataFrame:
+    """Q9: monthly curtailment and renewable share against Baseline."""
+    return answer("q09", con, regions, scenarios, start, end)
+
+
+def storage_dart_delta(con=None, *, regions=None, scenarios=None, start=None, end=None) -> pd.DataFrame:
+    """Q10: monthly DART spread, Storage_Focus against Baseline."""
+    return answer("q10", con, regions, scenarios, start, end)
+
+
+def capacity_additions(con=None, *, regions=None, scenarios=None, start=None, end=None) -> pd.DataFrame:
+    """Q11: annual MW additions by region and technology."""
+    return answer("q11", con, regions, scenarios, start, end)
+
+
+def capacity_stock(con=None, *, regions=None, scenarios=None, start=None, end=None) -> pd.DataFrame:
+    """Q11: installed stock, net additions and capex by region, technology and year."""
+    return answer("q11_stock", con, regions, scenarios, start, end)
+
+
+def annual_curtailment(con=None, *, regions=None, scenarios=None, start=None, end=None) -> pd.DataFrame:
+    """Q12: annual curtailment and average renewable share."""
+    return answer("q12", con, regions, scenarios, start, end)
+
+
+def summer_stress(con=None, *, regions=None, scenarios=None, start=None, end=None) -> pd.DataFrame:
+    """Q13: summer peak stress screen (Baseline, Jun–Sep)."""
+    return answer("q13", con, regions, scenarios, start, end)
+
+
+def driver_attribution(con=None, *, by=("region",), drivers=None,
+                       regions=None, scenarios=None, start=None, end=None) -> pd.DataFrame:
+    """Q14: price ~ drivers fit per group (default natgas and CDD by region)."""
+    return answer("q14", con, regions, scenarios, start, end, by=by, drivers=drivers)
+
+
+def volatility(con=None, *, regions=None, scenarios=None, start=None, end=None) -> pd.DataFrame:
+    """Q15: monthly price and DART volatility by region."""
+    return answer("q15", con, regions, scenarios, start, end)
+
+
+def rolling_volatility(con=None, *, regions=None, scenarios=None, start=None, end=None) -> pd.DataFrame:
+    """Q15: trailing 7/30/90-day and EWMA volatility by region and scenario."""
+    return answer("q15_rolling", con, regions, scenarios, start, end)
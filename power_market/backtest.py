@@ -0,0 +1,150 @@
+# backtest.py
+# Rolling-origin backtest for the price forecast models (OLS, XGB).
+#
+# Origins come from TimeSeriesSplit over the calendar days: each fold trains on
+# every day up to its origin and tests on the next `horizon` days. Every
+# (model, fold) pair is an independent task on a process pool. Features come
+# from the feature store (features.py): built once, memory-mapped by each
+# worker, and every fold is a contiguous row slice, so nothing is refit or
+# pickled per task. XGBoost / BLAS threads are capped so workers x threads
+# never exceeds the cores.
+#
+# Used by notebooks/02_Model_Forecast.py --backtest.
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from power_market.features import CAT_FEATS, NUM_FEATS, TARGET, FeatureMatrix, build_features, make_transformer
+
+MODELS = ("OLS", "XGB")
+
+
+def make_model(name: str, n_jobs: int = None, preprocess: bool = True):
+    """Unfitted model for a name (same settings as the notebook holdout).
+
+    preprocess=True wraps it in a Pipeline with the ColumnTransformer (raw
+    frame in); False returns the bare estimator for feature-store matrices.
+    """
+    # scikit-learn / xgboost load on first use, not when the package is imported
+    from sklearn.pipeline import Pipeline
+
+    if name == "OLS":
+        from sklearn.linear_model import LinearRegression
+
+        est = LinearRegression(n_jobs=None)
+    elif name == "XGB":
+        from xgboost import XGBRegressor
+
+        est = XGBRegressor(
+            n_estimators=400, max_depth=6, learning_rate=0.06, subsample=0.9, colsample_bytree=0.9,
+            random_state=42, n_jobs=n_jobs,
+        )
+    else:
+        raise ValueError(f"Unknown model {name!r}; expected one of {MODELS}")
+    return Pipeline([("pre", make_transformer()), ("model", est)]) if preprocess else est
+
+
+def rolling_origin_folds(dates, n_folds: int = 24, horizon: int = 30, min_train: int = 365):
+    """[(fold, train_end, test_start, test_end)] over the distinct days in dates.
+
+    Folds whose training window is shorter than min_train days are skipped.
+    """
+    from sklearn.model_selection import TimeSeriesSplit
+
+    days = np.sort(pd.to_datetime(pd.Series(dates)).unique())
+    if len(days) <= horizon:
+        raise ValueError(f"Need more than {horizon} distinct days for a backtest, got {len(days)}")
+    n_folds = min(n_folds, len(days) // horizon - 1)
+    splitter = TimeSeriesSplit(n_splits=n_folds, test_size=horizon)
+    folds = []
+    for train_idx, test_idx in splitter.split(days):
+        if len(train_idx) < min_train:
+            continue
+        folds.append((len(folds), days[train_idx[-1]], days[test_idx[0]], days[test_idx[-1]]))
+    return folds
+
+
+# Worker state, set once per process by _init_worker
+_FEATURES = None
+_THREADS = 1
+
+
+def limit_threads(threads: int):
+    """Cap BLAS/OpenMP threads in this process (XGBoost gets n_jobs separately)."""
+    try:
+        from threadpoolctl import threadpool_limits  # ships with scikit-learn
+
+        threadpool_limits(threads)
+    except ImportError:
+        pass
+
+
+def _init_worker(features_path, threads: int):
+    global _FEATURES, _THREADS
+    _FEATURES, _THREADS = FeatureMatrix(features_path), threads
+    limit_threads(threads)
+
+
+def _evaluate(model_name: str, fold):
+    from sklearn.metrics import mean_absolute_error, mean_absolute_percentage_error, r2_score
+
+    k, train_end, test_start, test_end = fold
+    fm = _FEATURES
+    # Rows are sorted by date: both windows are views into the memory map
+    train, test = fm.rows(end=train_end), fm.rows(test_start, test_end)
+
+    t0 = time.perf_counter()
+    model = make_model(model_name, n_jobs=_THREADS, preprocess=False)
+    model.fit(fm.X[train], fm.y[train])
+    pred = model.predict(fm.X[test])
+
+    y_true = np.asarray(fm.y[test])
+    metrics = {
+        "model": model_name, "fold": k,
+        "train_end": train_end, "test_start": test_start, "test_end": test_end,
+        "n_train": train.stop - train.start, "n_test": test.stop - test.start,
+        "MAE": mean_absolute_error(y_true, pred),
+        "MAPE": mean_absolute_percentage_error(y_true, pred),
+        "R2": r2_score(y_true, pred),
+        "fit_seconds": time.perf_counter() - t0,
+    }
+    preds = fm.labels(test)
+    preds.insert(0, "model", model_name)
+    preds.insert(1, "fold", k)
+    preds["y_true"] = y_true
+    preds["y_pred"] = pred
+    return metrics, preds
+
+
+def backtest(df: pd.DataFrame, models=MODELS, n_folds: int = 24, horizon: int = 30,
+             min_train: int = 365, workers: int = None):
+    """Evaluate every (model, fold) pair; returns (per-fold metrics, predictions).
+
+    workers: process count (default: one per core, capped at the task count);
+    1 runs serially in this process. Each worker gets cores // workers threads.
+    """
+    fm = build_features(df)
+    folds = rolling_origin_folds(fm.date, n_folds, horizon, min_train)
+    tasks = [(m, f) for m in models for f in folds]
+    if not tasks:
+        raise ValueError("No folds: lower min_train or horizon")
+
+    cores = os.cpu_count() or 1
+    workers = max(1, min(workers or cores, len(tasks)))
+    threads = max(1, cores // workers)
+
+    if workers == 1:
+        _init_worker(fm.path, threads)
+        results = [_evaluate(m, f) for m, f in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(fm.path, threads)) as pool:
+            results = list(pool.map(_evaluate, *zip(*tasks)))
+
+    metrics = pd.DataFrame([r[0] for r in results]).sort_values(["model", "fold"], ignore_index=True)
+    preds = pd.concat([r[1] for r in results], ignore_index=True)
+    return metrics, preds
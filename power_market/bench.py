@@ -0,0 +1,135 @@
+# bench.py
+# Benchmark Q03 and Q6–Q15 at several synthetic scale points.
+#
+# Each scale point is generated into a temp project root (power_market.synth),
+# the warehouse is built there, and every question runs in its own subprocess
+# (PM_HOME pointing at that root) so wall time, CPU time and peak RSS are
+# measured per question. Results go to a JSON file for regression tracking.
+#
+# Usage:
+#   python -m power_market.bench                           # default scale points
+#   python -m power_market.bench --scales 5x5x3,20x10x5,5x5x3h --out bench.json
+# A scale point is REGIONSxSCENARIOSxYEARS, with a trailing "h" for hourly rows.
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from power_market.paths import BASE, OUTPUTS_DIR
+from power_market.profiling import peak_rss_mb
+
+BENCH_QUESTIONS = ["q03", "q06", "q07", "q08", "q09", "q10", "q11", "q12", "q13", "q14", "q15"]
+DEFAULT_SCALES = ["5x5x3", "10x10x3", "20x10x5"]
+BENCH_DIR = OUTPUTS_DIR / "benchmarks"
+
+
+def parse_scale(spec: str) -> dict:
+    hourly = spec.endswith("h")
+    r, s, y = (int(v) for v in spec.rstrip("h").split("x"))
+    return {"spec": spec, "regions": r, "scenarios": s, "years": y, "hourly": hourly}
+
+
+def _worker(qid: str):
+    """Run one question in this process and print its measurements as JSON."""
+    from power_market.cache import connect
+    from power_market.registry import QUESTIONS
+    from power_market.runner import run_question
+
+    baseline_rss = peak_rss_mb()
+    wall0, cpu0 = time.perf_counter(), time.process_time()
+    con = connect(names=QUESTIONS[qid].sources)
+    run_question(qid, con)
+    con.close()
+    print(json.dumps({
+        "qid": qid,
+        "seconds": time.perf_counter() - wall0,
+        "cpu_seconds": time.process_time() - cpu0,
+        "peak_rss_mb": peak_rss_mb(),
+        "import_rss_mb": baseline_rss,
+    }))
+
+
+def _run(args, root: Path) -> dict:
+    env = dict(os.environ, PM_HOME=str(root))
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(BASE), env.get("PYTHONPATH")]))
+    t0 = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-m", *args], env=env, cwd=BASE,
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} failed:\n{proc.stderr}")
+    return {"seconds": time.perf_counter() - t0, "stdout": proc.stdout}
+
+
+def bench_scale(spec: str, questions, keep: bool = False) -> list:
+    from power_market.synth import generate
+
+    scale = parse_scale(spec)
+    root = Path(tempfile.mkdtemp(prefix=f"pm_bench_{spec}_"))
+    records = []
+    try:
+        t0 = time.perf_counter()
+        counts = generate(root, scale["regions"], scale["scenarios"], scale["years"],
+                          hourly=scale["hourly"])
+        meta = {**scale, "market_rows": counts.get("market_hourly", counts.get("market_daily"))}
+        records.append({**meta, "qid": "generate", "seconds": time.perf_counter() - t0})
+
+        built = _run(["power_market.warehouse", *(["--hourly"] if scale["hourly"] else [])], root)
+        records.append({**meta, "qid": "warehouse", "seconds": built["seconds"]})
+
+        for qid in questions:
+            out = _run(["power_market.bench", "--worker", qid], root)
+            records.append({**meta, **json.loads(out["stdout"].strip().splitlines()[-1])})
+            print(f"  {spec:<10} {qid:<10} {records[-1]['seconds']:8.2f}s  "
+                  f"{records[-1]['peak_rss_mb']:8.1f} MB")
+    finally:
+        if keep:
+            print("kept ->", root)
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+    return records
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the questions at synthetic scale points.")
+    parser.add_argument("--scales", default=",".join(DEFAULT_SCALES),
+                        help="Comma-separated REGIONSxSCENARIOSxYEARS[h] points")
+    parser.add_argument("--only", help="Comma-separated question ids (default Q03 and Q6–Q15)")
+    parser.add_argument("--out", help="Results JSON (default outputs/benchmarks/bench_<timestamp>.json)")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated data roots")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        _worker(args.worker)
+        return
+
+    import duckdb
+    questions = args.only.split(",") if args.only else BENCH_QUESTIONS
+    records = []
+    for spec in args.scales.split(","):
+        records += bench_scale(spec.strip(), questions, keep=args.keep)
+
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    out = Path(args.out) if args.out else BENCH_DIR / f"bench_{stamp}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps({
+        "created": stamp,
+        "python": platform.python_version(),
+        "duckdb": duckdb.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "records": records,
+    }, indent=2))
+    print("✔ saved ->", out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+# cache.py
+# Source resolution for the analyses: partitioned lake, warehouse tables, CSV cache.
+#
+# A fresh Hive-partitioned copy under lake/ (see lake.py) wins when present.
+# When power_market.duckdb holds the materialized views (sql/02_views.sql),
+# connections attach it read-only and query the typed tables directly.
+# Otherwise each exported v_* CSV is converted to typed Parquet once and reused
+# until the CSV changes (size + mtime fingerprint); its labels are cast back to
+# ENUMs on the views. Either way connect() returns one DuckDB connection with
+# every source registered as a view, so all the questions in a run share the
+# same warm connection.
+#
+# Set PM_MEMORY_LIMIT (e.g. "2GB") to cap DuckDB's memory on every connection;
+# larger-than-memory aggregates and sorts then spill to outputs/.cache/spill.
+
+import json
+import os
+from pathlib import Path
+
+import duckdb
+
+from power_market import schema
+from power_market.paths import CACHE_DIR, SOURCE_CSVS, WAREHOUSE
+
+WAREHOUSE_ALIAS = "wh"
+SPILL_DIR = CACHE_DIR / "spill"
+
+_warehouse_tables = {}  # warehouse fingerprint -> set of table names
+
+
+def fingerprint(path: Path) -> dict:
+    st = os.stat(path)
+    return {"path": Path(path).as_posix(), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def warehouse_tables() -> set:
+    """Tables (and materialized views) currently stored in power_market.duckdb."""
+    if not WAREHOUSE.exists():
+        return set()
+    key = json.dumps(fingerprint(WAREHOUSE))
+    if key not in _warehouse_tables:
+        with duckdb.connect(WAREHOUSE.as_posix(), read_only=True) as wh:
+            rows = wh.execute("SELECT table_name FROM duckdb_tables() WHERE schema_name = 'main'").fetchall()
+        _warehouse_tables[key] = {r[0] for r in rows}
+    return _warehouse_tables[key]
+
+
+def in_warehouse(name: str) -> bool:
+    return name in warehouse_tables()
+
+
+def source_fingerprint(name: str) -> dict:
+    """Fingerprint of the data source name is served from right now.
+
+    The warehouse file when the table lives there, else the CSV; a fresh
+    lake copy mirrors one of those, so it only counts when its upstream is gone.
+    """
+    if in_warehouse(name):
+        return fingerprint(WAREHOUSE)
+    if SOURCE_CSVS[name].exists():
+        return {**fingerprint(SOURCE_CSVS[name]), "schema": schema.version(name)}
+    from power_market.lake import _manifest
+
+    return {"lake": _manifest().get(name)}
+
+
+def cached_parquet(name: str, refresh: bool = False) -> Path:
+    """Return the Parquet copy of SOURCE_CSVS[name], rebuilding it if stale."""
+    src = SOURCE_CSVS[name]
+    if not src.exists():
+        raise FileNotFoundError(
+            f"Expected file not found: {src}\n"
+            f"Build the warehouse (python -m power_market.warehouse) or export {src.name} from DuckDB."
+        )
+
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    pq_path = CACHE_DIR / f"{name}.parquet"
+    fp_path = CACHE_DIR / f"{name}.fingerprint.json"
+
+    # A changed schema rebuilds the copy as surely as a changed file
+    fp = {**fingerprint(src), "schema": schema.version(name)}
+    if not refresh and pq_path.exists() and fp_path.exists():
+        if json.loads(fp_path.read_text()).get("source") == fp:
+            return pq_path
+
+    # Write to a temp file first so a concurrent reader never sees half a file
+    tmp_path = pq_path.with_suffix(f".{os.getpid()}.tmp")
+    with configure(duckdb.connect()) as con:
+        try:
+            con.execute(f"""
+                COPY (SELECT * FROM {schema.csv_relation(name, src)})
+                TO '{tmp_path.as_posix()}' (FORMAT PARQUET)
+            """)
+        except (duckdb.BinderException, duckdb.ConversionException) as e:
+            raise RuntimeError(f"{src} does not match the {name} schema: {e}") from e
+        # Parquet stores labels as plain strings; connect() casts them back to
+        # ENUMs built from these values (a dictionary-page read of the copy)
+        labels = schema.enum_values(con, f"read_parquet('{tmp_path.as_posix()}')", name)
+    os.replace(tmp_path, pq_path)
+    fp_path.write_text(json.dumps({"source": fp, "labels": labels}))
+    return pq_path
+
+
+def cached_labels(name: str) -> dict:
+    """Label column -> sorted values of the Parquet copy of name (see cached_parquet)."""
+    cached_parquet(name)
+    return json.loads((CACHE_DIR / f"{name}.fingerprint.json").read_text())["labels"]
+
+
+def prepare(names=None, refresh: bool = False):
+    """Warm the Parquet cache for every source the warehouse does not provide."""
+    for name in (names or SOURCE_CSVS):
+        if not in_warehouse(name):
+            cached_parquet(name, refresh=refresh)
+
+
+def source_relation(con, name: str, refresh: bool = False, filters=None) -> str:
+    """SQL relation for a source on con, attaching the warehouse if needed."""
+    return _resolve(con, name, refresh, filters)[1]
+
+
+def _resolve(con, name: str, refresh: bool = False, filters=None) -> tuple:
+    """(kind, relation) of the source name is served from: "lake", "warehouse" or "csv"."""
+    from power_market.lake import lake_relation
+
+    lake = lake_relation(name, filters)
+    if lake is not None:
+        return "lake", lake
+    if in_warehouse(name):
+        attached = {r[0] for r in con.execute("SELECT database_name FROM duckdb_databases()").fetchall()}
+        if WAREHOUSE_ALIAS not in attached:
+            con.execute(f"ATTACH '{WAREHOUSE.as_posix()}' AS {WAREHOUSE_ALIAS} (READ_ONLY)")
+        return "warehouse", f"{WAREHOUSE_ALIAS}.main.{name}"
+    return "csv", f"read_parquet('{cached_parquet(name, refresh=refresh).as_posix()}')"
+
+
+def configure(con, memory_limit=None, threads=None):
+    """Apply the out-of-core settings (memory_limit defaults to PM_MEMORY_LIMIT)."""
+    memory_limit = memory_limit or os.environ.get("PM_MEMORY_LIMIT")
+    if memory_limit:
+        SPILL_DIR.mkdir(parents=True, exist_ok=True)
+        con.execute(f"SET memory_limit = '{memory_limit}'")
+        con.execute(f"SET temp_directory = '{SPILL_DIR.as_posix()}'")
+        # Row order is always fixed by an explicit ORDER BY; dropping the
+        # implicit guarantee lets scans and COPY stream without buffering
+        con.execute("SET preserve_insertion_order = false")
+    if threads:
+        con.execute(f"SET threads = {int(threads)}")
+    return con
+
+
+def connect(names=None, refresh: bool = False, filters=None) -> duckdb.DuckDBPyConnection:
+    """In-memory DuckDB connection with the sources registered as views.
+
+    filters (a filters.Filters) restricts every view to the selected
+    regions, scenarios and dates.
+    """
+    con = configure(duckdb.connect())
+    rels = {name: _resolve(con, name, refresh=refresh, filters=filters) for name in (names or SOURCE_CSVS)}
+
+    # Labels read from the Parquet cache become ENUMs as in the warehouse: one
+    # type per label column over every cached source, so joins stay on ENUMs
+    enums = {}
+    for name, (kind, _) in rels.items():
+        if kind == "csv":
+            for col, values in cached_labels(name).items():
+                enums.setdefault(col, set()).update(values)
+    schema.create_enums(con, enums)
+
+    for name, (kind, rel) in rels.items():
+        where = ""
+        if filters:
+            cols = [r[0] for r in con.execute(f"DESCRIBE SELECT * FROM {rel}").fetchall()]
+            where = filters.where(name, cols)
+        labels = enums if kind == "csv" else {}
+        con.execute(f"CREATE OR REPLACE VIEW {name} AS {schema.enum_select(name, rel, labels)} {where};")
+    return con
+
+
+def scoped(con, filters=None, names=None):
+    """Cursor on con whose source views see only the rows filters select.
+
+    The filtered views are temp views private to the cursor, shadowing con's
+    views of the same name, so one warm connection serves any mix of filters
+    while con and its other cursors stay unfiltered. Close the cursor when done.
+    """
+    cur = con.cursor()
+    if filters:
+        db = cur.execute("SELECT current_database()").fetchone()[0]
+        for name in (names or SOURCE_CSVS):
+            cols = [r[0] for r in cur.execute(f"DESCRIBE {name}").fetchall()]
+            cur.execute(f"CREATE TEMP VIEW {name} AS SELECT * FROM {db}.main.{name} {filters.where(name, cols)}")
+    return cur
@@ -0,0 +1,196 @@
+# capacity.py
+# Capacity stock projection over many build-out variants at once.
+#
+# capacity_plan (region, year, tech, add_capacity_mw, retire_capacity_mw,
+# capex_usd_per_kw) becomes dense (region x tech x year) arrays. A variant is
+# a set of knobs applied to that plan:
+#   add_scale      multiplier on additions (per variant, or per variant x tech)
+#   retire_delay   whole years every retirement is pushed back
+#   capex_learning annual capex decline from the first plan year (per variant,
+#                  or per variant x tech), e.g. 0.03 = 3 %/yr
+# and every variant is evaluated as array operations on a
+# (variant x region x tech x year) tensor: additions, retirements, net
+# additions, cumulative stock (net MW since the start of the plan, plus an
+# optional initial stock) and capex spend. Thousands of variants cost one
+# broadcast, not one SQL aggregate each. The year axis is extended by the
+# largest delay so deferred retirements stay visible.
+#
+# Usage:
+#   python -m power_market.capacity --add-scale 0.8,1,1.2 --retire-delay 0,2,5 --capex-learning 0,0.03
+#   python -m power_market.capacity --add-scale 0.5:1.5:101 --retire-delay 0:10:11 --detail
+
+import argparse
+import itertools
+import time
+
+import numpy as np
+import pandas as pd
+
+from power_market.paths import ANSWERS_DIR
+
+SUMMARY_CSV = ANSWERS_DIR / "capacity_variant_summary.csv"
+DETAIL_CSV = ANSWERS_DIR / "capacity_projection_variants.csv"
+
+
+class CapacityPlan:
+    """Dense plan arrays (region, tech, year); absent rows are zero MW."""
+
+    def __init__(self, regions, techs, years, add, retire, capex):
+        self.regions = list(regions)
+        self.techs = list(techs)
+        self.years = np.asarray(years)
+        self.add = add
+        self.retire = retire
+        self.capex = capex
+
+
+def load_plan(con) -> CapacityPlan:
+    df = con.execute("""
+        SELECT region, tech, year,
+               sum(add_capacity_mw)    AS add_mw,
+               sum(retire_capacity_mw) AS retire_mw,
+               -- MW-weighted when a (region, tech, year) has several rows
+               coalesce(sum(add_capacity_mw * capex_usd_per_kw) / nullif(sum(add_capacity_mw), 0),
+                        avg(capex_usd_per_kw)) AS capex
+        FROM capacity_plan
+        GROUP BY ALL
+    """).df()
+    regions = sorted(df["region"].unique())
+    techs = sorted(df["tech"].unique())
+    years = np.arange(df["year"].min(), df["year"].max() + 1)
+    idx = (pd.Categorical(df["region"], regions).codes,
+           pd.Categorical(df["tech"], techs).codes,
+           (df["year"] - years[0]).to_numpy())
+    arrays = []
+    for col in ("add_mw", "retire_mw", "capex"):
+        a = np.zeros((len(regions), len(techs), len(years)))
+        a[idx] = df[col].fillna(0.0).to_numpy()
+        arrays.append(a)
+    return CapacityPlan(regions, techs, years, *arrays)
+
+
+def variant_grid(add_scale=(1.0,), retire_delay=(0,), capex_learning=(0.0,)) -> pd.DataFrame:
+    """Every combination of the knob values, one row per variant."""
+    rows = list(itertools.product(add_scale, retire_delay, capex_learning))
+    grid = pd.DataFrame(rows, columns=["add_scale", "retire_delay", "capex_learning"])
+    grid["retire_delay"] = grid["retire_delay"].astype(int)
+    grid.index.name = "variant"
+    return grid
+
+
+def _per_tech(values, n_variants: int, n_techs: int):
+    """(V,) or (V, T) knob values as a (V, 1, T, 1) array."""
+    v = np.asarray(values, dtype=float)
+    v = np.broadcast_to(v[:, None] if v.ndim == 1 else v, (n_variants, n_techs))
+    return v[:, None, :, None]
+
+
+def project(plan: CapacityPlan, add_scale, retire_delay, capex_learning, initial_stock=None) -> dict:
+    """Arrays (variant, region, tech, year) for every variant at once.
+
+    add_scale / capex_learning: (V,) or (V, T); retire_delay: (V,) whole years.
+    Returns add_mw, retire_mw, net_mw, stock_mw, capex_usd (spend on the
+    additions) and capex_cum_usd, plus the extended "years" axis.
+    """
+    delay = np.asarray(retire_delay, dtype=int)
+    if (delay < 0).any():
+        raise ValueError("retire_delay must be >= 0")
+    V = len(delay)
+    R, T, Y = plan.add.shape
+    Y_out = Y + int(delay.max(initial=0))
+    years = np.arange(plan.years[0], plan.years[0] + Y_out)
+
+    def extend(a):
+        return np.concatenate([a, np.zeros((R, T, Y_out - Y))], axis=2)
+
+    add_base, retire_base, capex_base = extend(plan.add), extend(plan.retire), extend(plan.capex)
+
+    add = add_base[None] * _per_tech(add_scale, V, T)
+
+    # Retirement in year y comes from plan year y - delay (zero before the plan starts)
+    src = np.arange(Y_out)[None, :] - delay[:, None]                      # (V, Y_out)
+    retire = np.where((src >= 0)[:, None, None, :], retire_base[:, :, np.clip(src, 0, None)].transpose(2, 0, 1, 3), 0.0)
+
+    # Capex curve: plan capex x (1 - learning) ** years since the first plan year
+    t = np.arange(Y_out)[None, None, None, :]
+    capex_kw = capex_base[None] * (1.0 - _per_tech(capex_learning, V, T)) ** t
+
+    net = add - retire
+    stock = np.cumsum(net, axis=3)
+    if initial_stock is not None:
+        stock += np.asarray(initial_stock, dtype=float)[None, :, :, None]
+    capex = add * 1000.0 * capex_kw  # MW x 1000 kW/MW x USD/kW
+    return {
+        "years": years,
+        "add_mw": add,
+        "retire_mw": retire,
+        "net_mw": net,
+        "stock_mw": stock,
+        "capex_usd": capex,
+        "capex_cum_usd": np.cumsum(capex, axis=3),
+    }
+
+
+def summarize(result: dict, grid: pd.DataFrame) -> pd.DataFrame:
+    """One row per variant: final stock, total adds/retirements and capex."""
+    out = grid.copy()
+    out["final_stock_mw"] = result["stock_mw"][..., -1].sum(axis=(1, 2))
+    out["total_add_mw"] = result["add_mw"].sum(axis=(1, 2, 3))
+    out["total_retire_mw"] = result["retire_mw"].sum(axis=(1, 2, 3))
+    out["capex_busd"] = result["capex_usd"].sum(axis=(1, 2, 3)) / 1e9
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out["avg_capex_usd_per_kw"] = out["capex_busd"] * 1e9 / (out["total_add_mw"] * 1000.0)
+    return out.reset_index()
+
+
+def to_frame(result: dict, plan: CapacityPlan, grid: pd.DataFrame, variants=None) -> pd.DataFrame:
+    """Long table (variant, region, technology, year) for the selected variants (default all)."""
+    variants = np.arange(len(grid)) if variants is None else np.asarray(variants)
+    V, (R, T, Y) = len(variants), result["add_mw"].shape[1:]
+    index = pd.MultiIndex.from_product([variants, plan.regions, plan.techs, result["years"]],
+                                       names=["variant", "region", "technology", "year"])
+    out = pd.DataFrame(index=index).reset_index()
+    for k in ("add_mw", "retire_mw", "net_mw", "stock_mw", "capex_usd", "capex_cum_usd"):
+        out[k] = result[k][variants].reshape(V * R * T * Y)
+    return out
+
+
+def _values(spec: str, cast=float):
+    """'a,b,c' or 'start:stop:count' (inclusive linspace)."""
+    if ":" in spec:
+        lo, hi, n = spec.split(":")
+        vals = np.linspace(float(lo), float(hi), int(n))
+        return [cast(round(v)) if cast is int else cast(v) for v in vals]
+    return [cast(v) for v in spec.split(",")]
+
+
+def main(argv=None):
+    from power_market.cache import connect
+
+    parser = argparse.ArgumentParser(description="Capacity stock projection over plan variants.")
+    parser.add_argument("--add-scale", default="1", help="Additions multipliers: a,b,c or start:stop:count")
+    parser.add_argument("--retire-delay", default="0", help="Retirement delays in years")
+    parser.add_argument("--capex-learning", default="0", help="Annual capex decline, e.g. 0,0.03")
+    parser.add_argument("--detail", action="store_true", help="Also write the per-(variant, region, tech, year) table")
+    parser.add_argument("--out", default=str(SUMMARY_CSV))
+    args = parser.parse_args(argv)
+
+    with connect(names=["capacity_plan"]) as con:
+        plan = load_plan(con)
+    grid = variant_grid(_values(args.add_scale), _values(args.retire_delay, int), _values(args.capex_learning))
+
+    t0 = time.perf_counter()
+    result = project(plan, grid["add_scale"], grid["retire_delay"], grid["capex_learning"])
+    elapsed = time.perf_counter() - t0
+    print(f"{len(grid):,} variants x {len(plan.regions)} regions x {len(plan.techs)} techs x "
+          f"{len(result['years'])} years projected in {elapsed * 1000:.1f} ms")
+
+    summarize(result, grid).to_csv(args.out, index=False)
+    print("✔ saved ->", args.out)
+    if args.detail:
+        to_frame(result, plan, grid).to_csv(DETAIL_CSV, index=False)
+        print("✔ saved ->", DETAIL_CSV)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+# charts.py
+# Chart stage: PNGs of the scenario answers.
+#
+# Each answer in CHART_SPECS is split by its group columns and drawn with
+# matplotlib's object-oriented API (Figure / Axes, no pyplot state) on the
+# non-interactive Agg backend, in a (spawned) process pool. Long series are
+# reduced to a min/max envelope of at most max_points per line before
+# plotting, so a daily rolling series costs the same as a monthly one and
+# spikes survive. A chart is redrawn only when the rows it shows (or its
+# spec) changed: the digest of every chart is kept in
+# outputs/.cache/charts.json, and the index (charts/index.csv) lists what
+# was rendered or left as is.
+#
+# Drawing costs about 0.2 s a chart, so the default set is an overview (a
+# chart per answer, or per region or scenario with the others as lines,
+# about 35 in all); the per-(region, scenario) drill-downs (about 100) are
+# drawn only on request (--detail).
+#
+# charts/<answer>/<group>.png          overview (all.png for ungrouped answers)
+# charts/<answer>/detail/<group>.png   drill-down
+#
+# Usage:
+#   python -m power_market.charts                      # after the runner
+#   python -m power_market.charts --detail --answers q07_price_delta_vs_baseline
+#   python -m power_market.charts --workers 4 --force  # redraw everything
+#   python -m power_market.runner --only charts        # as a registered question
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from power_market import schema
+from power_market.paths import CACHE_DIR, OUTPUTS_DIR
+
+CHART_STATE = CACHE_DIR / "charts.json"
+MAX_POINTS = 400
+REFERENCE = "Baseline"
+# Bump to redraw every chart after a change to render()
+CHART_VERSION = 2
+
+
+class ChartSpec:
+    """How one answer file is charted.
+
+    by: group columns (one chart per group); x: x-axis column; panels: one
+    list of y columns per stacked axis; series: column whose values become
+    separate lines / bar groups; kind: "line" or "bar"; skip_reference drops
+    the reference scenario (its deltas are zero by construction); detail
+    marks a drill-down drawn only on request.
+    """
+
+    def __init__(self, answer: str, x: str, panels, by=(), series=None, kind: str = "line",
+                 skip_reference: bool = False, detail: bool = False):
+        if kind not in ("line", "bar"):
+            raise ValueError(f"kind must be 'line' or 'bar', got {kind!r}")
+        self.answer = answer
+        self.x = x
+        self.panels = [list(p) for p in panels]
+        self.by = tuple(by)
+        self.series = series
+        self.kind = kind
+        self.skip_reference = skip_reference
+        self.detail = detail
+
+    @property
+    def subdir(self) -> str:
+        """Directory of this spec's charts, relative to outputs/ (one spec per directory)."""
+        return f"charts/{self.answer}/detail" if self.detail else f"charts/{self.answer}"
+
+    @property
+    def columns(self):
+        return [*self.by, self.x, *([self.series] if self.series else []), *(c for p in self.panels for c in p)]
+
+    def __repr__(self):
+        return (f"ChartSpec({self.answer!r}, x={self.x!r}, panels={self.panels}, by={self.by}, "
+                f"series={self.series!r}, kind={self.kind!r}, skip_reference={self.skip_reference}, "
+                f"detail={self.detail})")
+
+
+CHART_SPECS = [
+    ChartSpec("q06_dart_spread_stats_by_region", x="region", panels=[["dart_min", "dart_avg", "dart_max"]],
+              kind="bar"),
+    ChartSpec("q07_price_delta_vs_baseline", by=("scenario",), x="month", series="region",
+              panels=[["price_delta_vs_baseline"]], skip_reference=True),
+    ChartSpec("q08_corr_natgas_vs_price_by_scenario", x="region", series="scenario",
+              panels=[["r_natgas_price"]], kind="bar"),
+    ChartSpec("q09_curtailment_and_share_deltas_vs_baseline", by=("scenario",), x="month", series="region",
+              panels=[["renew_share_delta_vs_baseline"], ["curtailment_delta_vs_baseline"]], skip_reference=True),
+    ChartSpec("q10_dart_spread_delta_storage_focus", x="month", series="region",
+              panels=[["dart_delta_vs_baseline"]]),
+    ChartSpec("q11_capacity_additions_by_tech", by=("region",), x="year", series="technology",
+              panels=[["total_add_mw"]]),
+    ChartSpec("q11_capacity_stock_and_capex", by=("region",), x="year", series="technology",
+              panels=[["stock_mw"], ["capex_cum_usd"]]),
+    ChartSpec("q12_annual_curtailment_and_share", by=("region",), x="year", series="scenario",
+              panels=[["total_curtailment_mwh"], ["avg_renew_share_pct"]]),
+    ChartSpec("q13_summer_peak_stress", x="month", series="region", panels=[["stress_score"]]),
+    ChartSpec("q14_driver_attribution_by_region", x="region",
+              panels=[["importance_natgas_pct", "importance_cdd_pct"], ["r2"]], kind="bar"),
+    ChartSpec("q15_price_and_dart_volatility_monthly", x="month", series="region",
+              panels=[["price_vol_usd"], ["dart_vol_usd"]]),
+    ChartSpec("q15_price_and_dart_volatility_rolling", by=("scenario",), x="date", series="region",
+              panels=[["price_vol_30d"], ["dart_vol_30d"]]),
+    # Drill-downs (--detail)
+    ChartSpec("q07_price_delta_vs_baseline", by=("region", "scenario"), x="month",
+              panels=[["price", "base_price"], ["price_delta_vs_baseline"]], skip_reference=True, detail=True),
+    ChartSpec("q09_curtailment_and_share_deltas_vs_baseline", by=("region", "scenario"), x="month",
+              panels=[["renew_share_delta_vs_baseline"], ["curtailment_delta_vs_baseline"]], skip_reference=True,
+              detail=True),
+    ChartSpec("q10_dart_spread_delta_storage_focus", by=("region",), x="month",
+              panels=[["base_dart", "storage_dart"], ["dart_delta_vs_baseline"]], detail=True),
+    ChartSpec("q13_summer_peak_stress", by=("region",), x="month",
+              panels=[["z_cdd", "z_congestion", "z_curtailment"], ["stress_score"]], detail=True),
+    ChartSpec("q15_price_and_dart_volatility_monthly", by=("region",), x="month",
+              panels=[["price_vol_usd", "dart_vol_usd"]], detail=True),
+    ChartSpec("q15_price_and_dart_volatility_rolling", by=("region", "scenario"), x="date",
+              panels=[["price_vol_7d", "price_vol_30d", "price_vol_90d", "price_vol_ewma"],
+                      ["dart_vol_7d", "dart_vol_30d", "dart_vol_90d", "dart_vol_ewma"]], detail=True),
+]
+
+
+def downsample(x, y, max_points: int = MAX_POINTS):
+    """Min/max envelope of (x, y): at most max_points points, extremes kept, order preserved."""
+    n = len(y)
+    if n <= max_points:
+        return x, y
+    buckets = max_points // 2
+    edges = np.linspace(0, n, buckets + 1).astype(int)
+    # NaN (e.g. a rolling window still filling) must not win argmin / argmax
+    lo = np.where(np.isnan(y), np.inf, y)
+    hi = np.where(np.isnan(y), -np.inf, y)
+    keep = []
+    for a, b in zip(edges[:-1], edges[1:]):
+        keep += [a + int(np.argmin(lo[a:b])), a + int(np.argmax(hi[a:b]))]
+    idx = np.unique(keep)
+    return x[idx], y[idx]
+
+
+def _digest(spec: ChartSpec, sub: pd.DataFrame) -> str:
+    h = hashlib.sha1(f"{CHART_VERSION} {spec!r} {MAX_POINTS}".encode())
+    # float32: last-digit noise from a recomputed aggregate is not a visible change
+    floats = sub.select_dtypes("float").columns
+    sub = sub.astype(dict.fromkeys(floats, "float32"))
+    h.update(pd.util.hash_pandas_object(sub, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def _job(spec: ChartSpec, key, sub: pd.DataFrame, path) -> dict:
+    """Picklable drawing instructions for one chart (series already downsampled)."""
+    title = spec.answer if not key else f"{spec.answer} — {' / '.join(map(str, key))}"
+    panels = []
+    for cols in spec.panels:
+        lines = []
+        if spec.kind == "bar":
+            # One bar group per column (or per series value); categories aligned across groups
+            cats = list(dict.fromkeys(sub[spec.x]))
+            if spec.series:
+                wide = sub.pivot_table(index=spec.x, columns=spec.series, values=cols[0], aggfunc="first")
+                lines = [(str(s), cats, wide[s].reindex(cats).to_numpy(float)) for s in wide.columns]
+            else:
+                by_x = sub.drop_duplicates(spec.x).set_index(spec.x)
+                lines = [(c, cats, by_x[c].reindex(cats).to_numpy(float)) for c in cols]
+        else:
+            parts = sub.groupby(spec.series, sort=True) if spec.series else [(None, sub)]
+            for label, part in parts:
+                x = part[spec.x].to_numpy()
+                for c in cols:
+                    xs, ys = downsample(x, part[c].to_numpy(float))
+                    name = c if label is None else (str(label) if len(cols) == 1 else f"{label} {c}")
+                    lines.append((name, xs, ys))
+        # Several columns on one axis are named by the legend instead
+        panels.append((cols[0] if len(cols) == 1 else "", lines))
+    return {"path": str(path), "title": title, "kind": spec.kind, "x": spec.x, "panels": panels}
+
+
+def render(job: dict) -> str:
+    """Draw one chart with the OO API on Agg and write it atomically."""
+    import matplotlib
+
+    matplotlib.use("Agg")
+    from matplotlib.dates import AutoDateLocator
+    from matplotlib.figure import Figure
+    from matplotlib.ticker import MaxNLocator
+
+    panels = job["panels"]
+    height = 0.8 + 2.4 * len(panels)
+    fig = Figure(figsize=(9, height))
+    # Fixed margins: a layout engine would draw every figure twice
+    fig.subplots_adjust(left=0.09, right=0.98, top=1 - 0.45 / height, bottom=0.45 / height, hspace=0.12)
+    axes = fig.subplots(len(panels), 1, sharex=True, squeeze=False)[:, 0]
+    for ax, (ylabel, lines) in zip(axes, panels):
+        if job["kind"] == "bar":
+            cats = lines[0][1] if lines else []
+            pos = np.arange(len(cats))
+            width = 0.8 / max(len(lines), 1)
+            for i, (label, _, y) in enumerate(lines):
+                ax.bar(pos + (i - (len(lines) - 1) / 2) * width, y, width, label=label)
+            ax.set_xticks(pos, [str(c) for c in cats])
+        else:
+            for label, x, y in lines:
+                ax.plot(x, y, label=label, linewidth=1)
+            # Few ticks: building and drawing tick labels is most of the render time
+            dates = bool(lines) and np.issubdtype(np.asarray(lines[0][1]).dtype, np.datetime64)
+            ax.xaxis.set_major_locator(AutoDateLocator(minticks=3, maxticks=7) if dates else MaxNLocator(6, integer=True))
+        ax.yaxis.set_major_locator(MaxNLocator(5))
+        ax.set_ylabel(ylabel, fontsize=8)
+        ax.grid(alpha=0.3)
+        if len(lines) > 1:
+            ax.legend(fontsize=7, ncols=min(len(lines), 4))
+    axes[-1].set_xlabel(job["x"])
+    fig.suptitle(job["title"], fontsize=10)
+
+    path = job["path"]
+    tmp = f"{os.path.dirname(path)}/.{os.path.basename(path)}.{os.getpid()}.tmp"
+    # Fast zlib level: PNG encoding is otherwise a good share of the render time
+    fig.savefig(tmp, dpi=100, format="png", pil_kwargs={"compress_level": 1})
+    os.replace(tmp, path)
+    return path
+
+
+def select_specs(detail: bool = False, answers=None, specs=CHART_SPECS) -> list:
+    """The overview specs, plus the drill-downs with detail; answers limits them by
+    answer name or question prefix (e.g. "q07")."""
+    def wanted(spec):
+        return answers is None or any(spec.answer == a or spec.answer.startswith(f"{a}_") for a in answers)
+
+    return [spec for spec in specs if (detail or not spec.detail) and wanted(spec)]
+
+
+def plan_charts(out_dir=OUTPUTS_DIR, specs=None, force: bool = False):
+    """(jobs to render, index rows, digests) for every chart of the answers present."""
+    specs = select_specs() if specs is None else specs
+    state = json.loads(CHART_STATE.read_text()) if CHART_STATE.exists() and not force else {}
+    jobs, index, digests = [], [], {}
+    for spec in specs:
+        src = out_dir / "answers" / f"{spec.answer}.csv"
+        if not src.exists():
+            continue
+        df = schema.read_answer(src, usecols=lambda c: c in spec.columns)
+        if spec.skip_reference and "scenario" in df.columns:
+            df = df[df["scenario"] != REFERENCE]
+        chart_dir = out_dir / spec.subdir
+        chart_dir.mkdir(parents=True, exist_ok=True)
+        groups = df.groupby(list(spec.by), sort=True) if spec.by else [((), df)]
+        for key, sub in groups:
+            key = key if isinstance(key, tuple) else (key,)
+            path = chart_dir / (f"{'_'.join(map(str, key))}.png" if key else "all.png")
+            sub = sub.sort_values([spec.x, *([spec.series] if spec.series else [])])
+            digest = _digest(spec, sub)
+            digests[str(path)] = digest
+            fresh = state.get(str(path)) != digest or not path.exists()
+            if fresh:
+                jobs.append(_job(spec, key, sub, path))
+            index.append({"answer": spec.answer, "chart": path.relative_to(out_dir).as_posix(),
+                          "rows": len(sub), "status": "rendered" if fresh else "unchanged"})
+    return jobs, index, digests
+
+
+def render_charts(out_dir=OUTPUTS_DIR, workers: int = None, force: bool = False, specs=None,
+                  detail: bool = False, answers=None) -> pd.DataFrame:
+    """Render every changed chart of specs (default select_specs(detail, answers));
+    returns the index (answer, chart, rows, status)."""
+    specs = select_specs(detail, answers) if specs is None else specs
+    jobs, index, digests = plan_charts(out_dir, specs, force)
+    # A spawned worker pays ~1 s of imports: give each one at least 8 charts
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs) // 8))
+    if workers == 1:
+        for job in jobs:
+            render(job)
+    else:
+        # Spawned, not forked: the caller may have DuckDB threads running
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            list(pool.map(render, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+
+    # Each spec owns its directory: drop charts of groups no longer in the answer
+    planned = {Path(p) for p in digests}
+    for chart_dir in {p.parent for p in planned}:
+        for stale in set(chart_dir.glob("*.png")) - planned:
+            stale.unlink()
+
+    state = json.loads(CHART_STATE.read_text()) if CHART_STATE.exists() else {}
+    state.update(digests)
+    CHART_STATE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = CHART_STATE.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(state, indent=2))
+    os.replace(tmp, CHART_STATE)
+
+    return pd.DataFrame(index, columns=["answer", "chart", "rows", "status"])
+
+
+def main(argv=None):
+    from power_market.output import write_answer
+
+    parser = argparse.ArgumentParser(description="Render the charts of the scenario answers.")
+    parser.add_argument("--workers", type=int, help="Process pool size (default: one per core)")
+    parser.add_argument("--force", action="store_true", help="Redraw charts even when their rows are unchanged")
+    parser.add_argument("--detail", action="store_true",
+                        help="Also draw the per-(region, scenario) drill-downs (charts/<answer>/detail/)")
+    parser.add_argument("--answers", help="Comma-separated answers or question ids to chart, e.g. q07,q15")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    answers = [a.strip() for a in args.answers.split(",")] if args.answers else None
+    index = render_charts(workers=args.workers, force=args.force, detail=args.detail, answers=answers)
+    counts = index["status"].value_counts()
+    print(f"{counts.get('rendered', 0)} chart(s) rendered, {counts.get('unchanged', 0)} unchanged "
+          f"in {time.perf_counter() - t0:.2f}s")
+    write_answer(index, "charts/index.csv")
+
+
+if __name__ == "__main__":
+    main()
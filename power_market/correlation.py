@@ -0,0 +1,217 @@
+# correlation.py
+# Mergeable correlation moments for Q03 / Q08 (and any other grouping).
+#
+# A moment row holds, for one partition and one column pair (a, b), the
+# pairwise-complete count, means and centered co-moments:
+#   n, mean_a, mean_b, m2_a = sum((a - mean_a)^2), m2_b, c = sum((a - mean_a)(b - mean_b))
+# Partitions merge exactly (Chan et al.'s parallel update), so correlations for
+# any coarser grouping (global, region, region x scenario, year, ...) come
+# from the partition moments without rescanning the rows, and moments
+# computed by separate chunk workers combine the same way (UNION ALL the
+# moment tables, then combine()).
+#
+# outputs/.cache/correlation/moments.parquet keeps the moments of
+# v_price_drivers_daily per (region, scenario, month). refresh() reuses the
+# incremental digests (incremental.py) and only rescans the months with new or
+# changed rows.
+#
+# Usage:
+#   python -m power_market.correlation                        # global matrix -> answers/correlations_by_all.csv
+#   python -m power_market.correlation --by region,scenario   # -> answers/correlations_by_region_scenario.csv
+#   python -m power_market.correlation --by year --full-check
+
+import argparse
+import time
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+from power_market.paths import CACHE_DIR, OUTPUTS_DIR
+
+SOURCE = "v_price_drivers_daily"
+MOMENT_COLS = [
+    'avg_price_usd_mwh','total_demand_mwh','renewable_share_pct','curtailment_mwh',
+    'hdd','cdd','dart_spread_usd_mwh','natgas_monthly',
+    'energy_cost_usd_mwh','congestion_cost_usd_mwh','losses_cost_usd_mwh'
+]
+PAIRS = [(a, b) for i, a in enumerate(MOMENT_COLS) for b in MOMENT_COLS[i + 1:]]
+
+# Partition grain of the store (the incremental digest grain)
+PARTITION = ("region", "scenario", "month")
+# Grouping keys over source rows, and over stored moment rows
+ROW_KEYS = {"region": "region", "scenario": "scenario",
+            "month": "date_trunc('month', date)::DATE", "year": "year(date)"}
+MOMENT_KEYS = {"region": "region", "scenario": "scenario", "month": "month", "year": "year(month)"}
+
+MOMENTS_DIR = CACHE_DIR / "correlation"
+MOMENTS_PATH = MOMENTS_DIR / "moments.parquet"
+STATE_KEY = "correlation_moments"  # digest state name in incremental.STATE_DIR
+
+STAT_COLS = "n, mean_a, mean_b, m2_a, m2_b, c"
+
+
+def _keys(by, exprs):
+    unknown = set(by) - set(exprs)
+    if unknown:
+        raise ValueError(f"Unknown grouping key(s) {sorted(unknown)}; expected a subset of {list(exprs)}")
+    return "".join(f"{exprs[k]} AS {k}, " for k in by)
+
+
+def moments_sql(relation: str = SOURCE, by=PARTITION, pairs=PAIRS) -> str:
+    """SQL for the moment rows of relation, one per (group, pair), in one scan."""
+    # regr_*(y, x): pairwise-complete statistics with x = a, y = b
+    structs = ", ".join(
+        f"{{'a': '{a}', 'b': '{b}', 'n': regr_count({b}, {a})::BIGINT, "
+        f"'mean_a': regr_avgx({b}, {a}), 'mean_b': regr_avgy({b}, {a}), "
+        f"'m2_a': regr_sxx({b}, {a}), 'm2_b': regr_syy({b}, {a}), 'c': regr_sxy({b}, {a})}}"
+        for a, b in pairs
+    )
+    keys = "".join(f"{k}, " for k in by)
+    return f"""
+        SELECT * FROM (
+            SELECT {keys}unnest(m, recursive := true) FROM (
+                SELECT {_keys(by, ROW_KEYS)}[{structs}] AS m
+                FROM {relation}
+                GROUP BY ALL
+            )
+        )
+        WHERE n > 0
+    """
+
+
+def partition_moments(con, by=PARTITION, pairs=PAIRS, relation: str = SOURCE):
+    """Moment rows of relation (a view on con) per by-group, as a relation."""
+    return con.sql(moments_sql(relation, by, pairs))
+
+
+def combine(moments, by=()):
+    """Merge moment rows (any partitions, any chunks) into one row per (by-group, pair)."""
+    keys = "".join(f"{k}, " for k in by)
+    using = ", ".join([*by, "a", "b"])
+    return moments.query("moments", f"""
+        WITH s AS (
+            SELECT {_keys(by, MOMENT_KEYS)}a, b, {STAT_COLS} FROM moments WHERE n > 0
+        ),
+        g AS (
+            SELECT {keys}a, b, sum(n) AS n,
+                   sum(n * mean_a) / sum(n) AS mean_a,
+                   sum(n * mean_b) / sum(n) AS mean_b
+            FROM s GROUP BY ALL
+        )
+        SELECT {keys}a, b,
+               any_value(g.n)::BIGINT AS n,
+               any_value(g.mean_a) AS mean_a,
+               any_value(g.mean_b) AS mean_b,
+               sum(s.m2_a + s.n * (s.mean_a - g.mean_a) ** 2) AS m2_a,
+               sum(s.m2_b + s.n * (s.mean_b - g.mean_b) ** 2) AS m2_b,
+               sum(s.c + s.n * (s.mean_a - g.mean_a) * (s.mean_b - g.mean_b)) AS c
+        FROM s JOIN g USING ({using})
+        GROUP BY ALL
+    """)
+
+
+def correlations(moments, by=()):
+    """Pearson r per (by-group, pair): by..., a, b, n, r (NULL for a constant column)."""
+    keys = "".join(f"{k}, " for k in by)
+    order = ", ".join([*by, "a", "b"])
+    return combine(moments, by).query("merged", f"""
+        SELECT {keys}a, b, n,
+               CASE WHEN m2_a > 0 AND m2_b > 0 THEN c / sqrt(m2_a * m2_b) END AS r
+        FROM merged
+        ORDER BY {order}
+    """)
+
+
+def corr_matrix(corr, cols=MOMENT_COLS) -> pd.DataFrame:
+    """Square matrix (Q03 layout) from the a, b, r rows of an ungrouped correlations()."""
+    out = pd.DataFrame(np.eye(len(cols)), index=cols, columns=cols)
+    for a, b, r in corr.select("a, b, r").fetchall():
+        out.loc[a, b] = out.loc[b, a] = np.nan if r is None else r
+    # Keep the variable names as the unnamed first column (matrix layout)
+    return out.rename_axis("").reset_index()
+
+
+def stored_moments(con):
+    """The moment store as a relation on con (run refresh() first)."""
+    if not MOMENTS_PATH.exists():
+        raise FileNotFoundError(f"No correlation moments at {MOMENTS_PATH}; run refresh() first.")
+    return con.sql(f"SELECT * FROM read_parquet('{MOMENTS_PATH.as_posix()}')")
+
+
+def _write_store(con, sql: str):
+    MOMENTS_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = MOMENTS_PATH.with_suffix(".tmp")
+    con.execute(f"COPY ({sql}) TO '{tmp.as_posix()}' (FORMAT PARQUET)")
+    tmp.replace(MOMENTS_PATH)
+
+
+def refresh(full_check: bool = False) -> str:
+    """Bring the moment store up to date with the source; returns what was done."""
+    from power_market.cache import connect, source_fingerprint
+    from power_market.incremental import _save_state, save_fingerprint, touched_partitions, unchanged
+
+    fp = source_fingerprint(SOURCE)
+    if not full_check and MOMENTS_PATH.exists() and unchanged(STATE_KEY, fp):
+        return "up to date"
+
+    con = connect(names=[SOURCE])
+    try:
+        have_state = touched_partitions(con, STATE_KEY, full_check=full_check, source=SOURCE)
+        if not have_state or not MOMENTS_PATH.exists():
+            _write_store(con, moments_sql())
+            _save_state(con, STATE_KEY, incremental=False, fingerprint=fp)
+            return "full rebuild"
+
+        n_touched = con.execute("SELECT count(*) FROM touched").fetchone()[0]
+        if n_touched == 0:
+            save_fingerprint(STATE_KEY, fp)
+            return "up to date"
+
+        # Rescan only the touched months; partitions that vanished from the
+        # source simply get no new rows
+        lower = con.execute("SELECT min(month) FROM touched").fetchone()[0]
+        rows = f"""(
+            SELECT t.* FROM {SOURCE} t
+            SEMI JOIN touched k
+              ON t.region = k.region AND t.scenario = k.scenario
+             AND date_trunc('month', t.date) = k.month
+            WHERE t.date >= DATE '{lower}'
+        )"""
+        _write_store(con, f"""
+            SELECT * FROM read_parquet('{MOMENTS_PATH.as_posix()}') o
+            WHERE NOT EXISTS (SELECT 1 FROM touched k
+                              WHERE k.region = o.region AND k.scenario = o.scenario AND k.month = o.month)
+            UNION ALL BY NAME
+            {moments_sql(rows)}
+        """)
+        _save_state(con, STATE_KEY, incremental=True, fingerprint=fp)
+        return f"{n_touched} partition(s) rescanned"
+    finally:
+        con.close()
+
+
+def main(argv=None):
+    from power_market.output import write_answer
+
+    parser = argparse.ArgumentParser(description="Correlations from the mergeable moment store.")
+    parser.add_argument("--full-check", action="store_true",
+                        help="Digest the whole history to catch restated rows")
+    parser.add_argument("--by", default="",
+                        help=f"Comma-separated grouping keys from {list(MOMENT_KEYS)} (default: all rows)")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    print("✔ moments:", refresh(full_check=args.full_check))
+    by = tuple(k.strip() for k in args.by.split(",") if k.strip())
+    name = f"answers/correlations_by_{'_'.join(by) or 'all'}.csv"
+    con = duckdb.connect()
+    try:
+        write_answer(correlations(stored_moments(con), by), name)
+    finally:
+        con.close()
+    print(f"✔ saved -> {OUTPUTS_DIR / name} ({time.perf_counter() - t0:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
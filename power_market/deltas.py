@@ -0,0 +1,83 @@
+# deltas.py
+# Scenario-vs-reference delta engine (Q7, Q9, Q10 and friends).
+#
+# One aggregation pass produces every metric per (keys, scenario, period); the
+# reference scenario's value is then pulled alongside each row with a
+# conditional window aggregate over (keys, period) — no self-join per metric
+# or per scenario, so adding metrics or scenarios does not add scans.
+
+from power_market.filters import identifier, sql_list, sql_literal
+
+GRAINS = {
+    "day":   ("date",  "date_trunc('day', {dc})::DATE"),
+    "month": ("month", "date_trunc('month', {dc})::DATE"),
+    "year":  ("year",  "year({dc})"),
+}
+
+
+def scenario_deltas(con, source: str, metrics, grain: str = "month", reference: str = "Baseline",
+                    date_col: str = "date", scenarios=None, keys=("region",),
+                    include_reference: bool = False):
+    """Absolute and percent deltas of every metric vs the reference scenario.
+
+    metrics: {name: SQL aggregate}, e.g. {"price": "AVG(avg_price_usd_mwh)"}.
+    grain: "day", "month" or "year" (output column date / month / year).
+    scenarios: limit the output to these scenarios (the reference is always
+    aggregated); None keeps every non-reference scenario.
+
+    Returns a DuckDB relation (call .df() for pandas) with columns: keys,
+    scenario, <period>, then per metric: <m>, <m>_ref, <m>_delta and
+    <m>_pct_delta (NULL when the reference is 0). Rows whose (keys, period)
+    has no reference value are dropped, as with an inner join.
+    """
+    if grain not in GRAINS:
+        raise ValueError(f"grain must be one of {sorted(GRAINS)}, got {grain!r}")
+    period, period_expr = GRAINS[grain]
+    period_expr = period_expr.format(dc=identifier(date_col))
+    keys = [identifier(k) for k in keys]
+    for m in metrics:
+        identifier(m)
+    ref = sql_literal(reference)
+    key_cols = ", ".join(keys)
+    part = f"PARTITION BY {key_cols}, {period}"
+
+    scen_filter = ""
+    if scenarios is not None:
+        scen_filter = f"WHERE scenario IN ({sql_list([reference, *scenarios])})"
+
+    agg_cols = ",\n               ".join(f"{expr} AS {m}" for m, expr in metrics.items())
+    ref_cols = ",\n               ".join(
+        f"max(CASE WHEN scenario = {ref} THEN {m} END) OVER ({part}) AS {m}_ref"
+        for m in metrics
+    )
+    delta_cols = ",\n           ".join(
+        f"{m}, {m}_ref, {m} - {m}_ref AS {m}_delta, "
+        f"CASE WHEN {m}_ref = 0 THEN NULL ELSE ({m} - {m}_ref) / {m}_ref END AS {m}_pct_delta"
+        for m in metrics
+    )
+
+    out_filter = [] if include_reference else [f"scenario <> {ref}"]
+    if scenarios is not None:
+        out_filter.append(f"scenario IN ({sql_list(scenarios)})")
+    out_filter.append("has_ref")
+
+    return con.sql(f"""
+    WITH agg AS (
+        SELECT {key_cols}, scenario, {period_expr} AS {period},
+               {agg_cols}
+        FROM {source}
+        {scen_filter}
+        GROUP BY ALL
+    ),
+    with_ref AS (
+        SELECT *,
+               {ref_cols},
+               bool_or(scenario = {ref}) OVER ({part}) AS has_ref
+        FROM agg
+    )
+    SELECT {key_cols}, scenario, {period},
+           {delta_cols}
+    FROM with_ref
+    WHERE {" AND ".join(out_filter)}
+    ORDER BY {key_cols}, {period}, scenario
+    """)
@@ -0,0 +1,127 @@
+# features.py
+# Feature store for the price models: the transformed design matrix, built once
+# per input fingerprint and memory-mapped by every model, fold and worker.
+#
+# outputs/.cache/features/<key>/
+#   X.npy, y.npy          design matrix (float64) and target, rows sorted by date
+#   date.npy              datetime64[D] per row (folds are contiguous row ranges)
+#   region.npy, scenario.npy   category codes per row
+#   transformer.joblib    the fitted ColumnTransformer
+#   meta.json             feature names, categories, row count, key
+#
+# The key hashes the input rows and the feature spec, so a changed input or a
+# changed feature list builds a new entry. Fitting the transformer once on all
+# rows does not leak across backtest folds: the scaler only rescales columns
+# (with_mean=False) and both OLS and XGB predictions are invariant to that;
+# one-hot columns for categories absent from a training window stay zero.
+
+import hashlib
+import json
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from power_market.paths import CACHE_DIR
+
+FEATURES_DIR = CACHE_DIR / "features"
+
+TARGET = 'avg_price_usd_mwh'
+NUM_FEATS = ['total_demand_mwh','energy_cost_usd_mwh','congestion_cost_usd_mwh','losses_cost_usd_mwh',
+             'renewable_share_pct','curtailment_mwh','hdd','cdd','dart_spread_usd_mwh','natgas_monthly']
+CAT_FEATS = ['region','scenario']
+
+
+def make_transformer():
+    from sklearn.compose import ColumnTransformer
+    from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+    # Dense output (sparse_threshold=0): a handful of one-hot columns, and a
+    # dense .npy memory-maps directly
+    return ColumnTransformer([
+        ("num", StandardScaler(with_mean=False), NUM_FEATS),
+        ("cat", OneHotEncoder(handle_unknown="ignore"), CAT_FEATS),
+    ], sparse_threshold=0)
+
+
+def input_key(df: pd.DataFrame) -> str:
+    """Fingerprint of the model input rows plus the feature spec."""
+    cols = ['date', TARGET, *NUM_FEATS, *CAT_FEATS]
+    h = hashlib.sha1(json.dumps([TARGET, NUM_FEATS, CAT_FEATS]).encode())
+    h.update(pd.util.hash_pandas_object(df[cols], index=False).to_numpy().tobytes())
+    return h.hexdigest()[:16]
+
+
+class FeatureMatrix:
+    """Memory-mapped design matrix; slices are views, not copies."""
+
+    def __init__(self, path):
+        self.path = path
+        self.meta = json.loads((path / "meta.json").read_text())
+        self.key = self.meta["key"]
+        self.feature_names = self.meta["feature_names"]
+        self.categories = self.meta["categories"]
+        self.X = np.load(path / "X.npy", mmap_mode="r")
+        self.y = np.load(path / "y.npy", mmap_mode="r")
+        self.date = np.load(path / "date.npy", mmap_mode="r")
+        self.region = np.load(path / "region.npy", mmap_mode="r")
+        self.scenario = np.load(path / "scenario.npy", mmap_mode="r")
+
+    def __len__(self):
+        return len(self.y)
+
+    def rows(self, start=None, end=None) -> slice:
+        """Row range with start <= date <= end (either bound optional)."""
+        lo = 0 if start is None else int(np.searchsorted(self.date, np.datetime64(start, "D"), "left"))
+        hi = len(self) if end is None else int(np.searchsorted(self.date, np.datetime64(end, "D"), "right"))
+        return slice(lo, hi)
+
+    def labels(self, rows: slice) -> pd.DataFrame:
+        """date / region / scenario for a row range (for prediction output)."""
+        return pd.DataFrame({
+            "date": self.date[rows].astype("datetime64[ns]"),
+            "region": np.asarray(self.categories["region"])[self.region[rows]],
+            "scenario": np.asarray(self.categories["scenario"])[self.scenario[rows]],
+        })
+
+    def transformer(self):
+        import joblib
+
+        return joblib.load(self.path / "transformer.joblib")
+
+
+def build_features(df: pd.DataFrame, refresh: bool = False) -> FeatureMatrix:
+    """The FeatureMatrix for df, fitting and storing it if this input is new."""
+    import joblib
+
+    df = df[['date', TARGET, *NUM_FEATS, *CAT_FEATS]].dropna()
+    key = input_key(df)
+    path = FEATURES_DIR / key
+    if path.exists() and not refresh:
+        return FeatureMatrix(path)
+
+    df = df.sort_values(['date', *CAT_FEATS], kind="stable", ignore_index=True)
+    pre = make_transformer()
+    X = np.ascontiguousarray(pre.fit_transform(df), dtype=np.float64)
+    region = pd.Categorical(df['region'])
+    scenario = pd.Categorical(df['scenario'])
+
+    # Build in a temp dir and rename, so readers never see a partial entry
+    tmp = FEATURES_DIR / f".{key}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    np.save(tmp / "X.npy", X)
+    np.save(tmp / "y.npy", df[TARGET].to_numpy(dtype=np.float64))
+    np.save(tmp / "date.npy", df['date'].to_numpy().astype("datetime64[D]"))
+    np.save(tmp / "region.npy", region.codes)
+    np.save(tmp / "scenario.npy", scenario.codes)
+    joblib.dump(pre, tmp / "transformer.joblib")
+    (tmp / "meta.json").write_text(json.dumps({
+        "key": key,
+        "n_rows": len(df),
+        "feature_names": list(pre.get_feature_names_out()),
+        "categories": {"region": list(region.categories), "scenario": list(scenario.categories)},
+    }, indent=2))
+    shutil.rmtree(path, ignore_errors=True)
+    tmp.rename(path)
+    return FeatureMatrix(path)
@@ -0,0 +1,117 @@
+# filters.py
+# Region / scenario / date filters applied to every source a question reads.
+#
+# connect(filters=...) wraps each source view in a WHERE clause, so the
+# questions run unchanged on the subset. On the Hive-partitioned lake
+# (lake.py) the region/scenario predicates prune whole directories and the
+# date range prunes year directories; on the warehouse tables (sorted by
+# region, scenario, date) they skip row groups via zonemaps.
+
+import re
+from datetime import date
+
+# Time column of each source and its grain
+SOURCE_DATE_COLS = {
+    "market_daily":              ("date", "day"),
+    "v_price_drivers_daily":     ("date", "day"),
+    "fuel_prices_monthly":       ("month", "month"),
+    "v_lmp_components_monthly":  ("month", "month"),
+    "v_renew_share_curtailment": ("month", "month"),
+    "capacity_plan":             ("year", "year"),
+}
+
+
+_IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+
+def sql_literal(value) -> str:
+    """value as a SQL string literal, embedded quotes doubled."""
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def sql_list(values) -> str:
+    """Comma-separated SQL literals: strings quoted (see sql_literal), numbers as is."""
+    return ", ".join(str(v) if isinstance(v, (int, float)) and not isinstance(v, bool) else sql_literal(v)
+                     for v in values)
+
+
+def is_identifier(name) -> bool:
+    """True for a plain SQL identifier (letters, digits, underscores)."""
+    return isinstance(name, str) and _IDENTIFIER.fullmatch(name) is not None
+
+
+def identifier(name: str) -> str:
+    """name, if it is a plain SQL identifier (see is_identifier); else ValueError."""
+    if not is_identifier(name):
+        raise ValueError(f"Not a plain SQL identifier: {name!r}")
+    return name
+
+
+def _as_date(value):
+    if value is None or isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value))
+
+
+class Filters:
+    """Row filters for a run.
+
+    regions / scenarios: lists of labels (None = all). The reference scenario
+    is always kept so scenario deltas still have something to compare against.
+    start / end: inclusive dates (str or date); month- and year-grain sources
+    keep every period overlapping the range.
+    """
+
+    def __init__(self, regions=None, scenarios=None, start=None, end=None, reference: str = "Baseline"):
+        self.regions = sorted(regions) if regions else None
+        self.scenarios = sorted({*scenarios, reference}) if scenarios else None
+        self.start = _as_date(start)
+        self.end = _as_date(end)
+
+    def __bool__(self):
+        return any(v is not None for v in (self.regions, self.scenarios, self.start, self.end))
+
+    @property
+    def years(self):
+        """(first, last) calendar year of the date range; None when open-ended."""
+        return (self.start.year if self.start else None, self.end.year if self.end else None)
+
+    @property
+    def slug(self) -> str:
+        """Directory-friendly label, e.g. region=CAISO_scenario=Baseline+Carbon_Tax."""
+        parts = []
+        if self.regions:
+            parts.append("region=" + "+".join(self.regions))
+        if self.scenarios:
+            parts.append("scenario=" + "+".join(self.scenarios))
+        if self.start or self.end:
+            parts.append(f"dates={self.start or ''}..{self.end or ''}")
+        return "_".join(parts) or "all"
+
+    def predicates(self, name: str, columns) -> list:
+        """SQL predicates for source `name` given its column names."""
+        preds = []
+        if self.regions and "region" in columns:
+            preds.append(f"region IN ({sql_list(self.regions)})")
+        if self.scenarios and "scenario" in columns:
+            preds.append(f"scenario IN ({sql_list(self.scenarios)})")
+
+        col, grain = SOURCE_DATE_COLS.get(name, ("date", "day"))
+        if col in columns:
+            for bound, op in ((self.start, ">="), (self.end, "<=")):
+                if bound is None:
+                    continue
+                if grain == "year":
+                    preds.append(f"{col} {op} {bound.year}")
+                elif grain == "month" and op == ">=":
+                    preds.append(f"{col} >= DATE '{bound.replace(day=1)}'")
+                else:
+                    preds.append(f"{col} {op} DATE '{bound}'")
+        return preds
+
+    def where(self, name: str, columns) -> str:
+        preds = self.predicates(name, columns)
+        return ("WHERE " + " AND ".join(preds)) if preds else ""
+
+    def __repr__(self):
+        return f"Filters({self.slug})"
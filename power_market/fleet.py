@@ -0,0 +1,184 @@
+# fleet.py
+# Per-(region, scenario) model fleet: one OLS / XGB model per shard.
+#
+# outputs/models/fleet/<model>/region=<r>/scenario=<s>/
+#   model.joblib    predict-ready Pipeline (raw frame in: transformer + numeric
+#                   columns + estimator)
+#   metrics.json    holdout MAE/MAPE/R2, row counts, input key, timings
+#
+# Shards train on a process pool over the shared feature store (features.py);
+# each worker memory-maps the design matrix and gets cores // workers threads.
+# Runs are resumable: a shard's input key hashes its raw rows (not the scaled
+# features, which move whenever any other shard's data changes), so only
+# shards whose rows changed, or that never finished, are retrained.
+#
+# Used by notebooks/02_Model_Forecast.py --fleet.
+
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from power_market.backtest import MODELS, limit_threads, make_model
+from power_market.features import CAT_FEATS, NUM_FEATS, TARGET, FeatureMatrix, build_features
+from power_market.paths import MODELS_DIR
+
+FLEET_DIR = MODELS_DIR / "fleet"
+
+# Columns of fleet_metrics.csv (see _train_shard)
+METRIC_COLUMNS = ["model", "region", "scenario", "input_key", "n_train", "n_test", "test_start", "test_end",
+                  "MAE", "MAPE", "R2", "refit_on_all_rows", "fit_seconds", "retrained"]
+
+
+def _numeric_columns(X):
+    # The transformer emits the scaled numeric features first, then the
+    # one-hots (constant within a shard, so shard models skip them)
+    return X[:, :len(NUM_FEATS)]
+
+
+def shard_dir(model_name: str, region: str, scenario: str):
+    return FLEET_DIR / model_name / f"region={region}" / f"scenario={scenario}"
+
+
+def shard_keys(df: pd.DataFrame) -> dict:
+    """{(region, scenario): key} hashing each shard's raw rows in date order."""
+    cols = ['date', TARGET, *NUM_FEATS, *CAT_FEATS]
+    df = df[cols].dropna().sort_values(['region', 'scenario', 'date'], kind="stable")
+    row_hash = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    spec = json.dumps([TARGET, NUM_FEATS]).encode()
+    keys = {}
+    for (region, scenario), idx in df.groupby(['region', 'scenario'], sort=True).indices.items():
+        keys[(region, scenario)] = hashlib.sha1(spec + row_hash[idx].tobytes()).hexdigest()[:16]
+    return keys
+
+
+def _read_metrics(path):
+    f = path / "metrics.json"
+    return json.loads(f.read_text()) if f.exists() else None
+
+
+# Worker state, set once per process by _init_worker
+_FEATURES = None
+_THREADS = 1
+
+
+def _init_worker(features_path, threads: int):
+    global _FEATURES, _THREADS
+    _FEATURES, _THREADS = FeatureMatrix(features_path), threads
+    limit_threads(threads)
+
+
+def shard_rows(fm: FeatureMatrix) -> dict:
+    """{(region, scenario): feature-store row indices}, each in date order.
+
+    One stable sort by shard code; every shard is a slice of it.
+    """
+    region, scenario = np.asarray(fm.region), np.asarray(fm.scenario)
+    order = np.lexsort((scenario, region))
+    code = region[order].astype(np.int64) * len(fm.categories["scenario"]) + scenario[order]
+    starts = np.flatnonzero(np.r_[True, code[1:] != code[:-1]])
+    ends = np.r_[starts[1:], len(order)]
+    return {(fm.categories["region"][region[order[lo]]], fm.categories["scenario"][scenario[order[lo]]]): order[lo:hi]
+            for lo, hi in zip(starts, ends)}
+
+
+def _train_shard(model_name: str, region: str, scenario: str, key: str, idx, test_days: int,
+                 refit: bool) -> dict:
+    from sklearn.metrics import mean_absolute_error, mean_absolute_percentage_error, r2_score
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import FunctionTransformer
+    import joblib
+
+    fm = _FEATURES
+    X = _numeric_columns(fm.X[idx])
+    y = np.asarray(fm.y[idx])
+    dates = np.asarray(fm.date[idx])
+
+    # Holdout: the shard's last test_days distinct days
+    days = np.unique(dates)
+    cut = days[-test_days] if len(days) > test_days else days[-1]
+    train, test = dates < cut, dates >= cut
+
+    t0 = time.perf_counter()
+    est = make_model(model_name, n_jobs=_THREADS, preprocess=False)
+    est.fit(X[train], y[train])
+    pred = est.predict(X[test])
+    metrics = {
+        "model": model_name, "region": region, "scenario": scenario, "input_key": key,
+        "n_train": int(train.sum()), "n_test": int(test.sum()),
+        "test_start": str(cut), "test_end": str(days[-1]),
+        "MAE": float(mean_absolute_error(y[test], pred)),
+        "MAPE": float(mean_absolute_percentage_error(y[test], pred)),
+        "R2": float(r2_score(y[test], pred)) if test.sum() > 1 else None,
+        "refit_on_all_rows": refit,
+    }
+    if refit:
+        est = make_model(model_name, n_jobs=_THREADS, preprocess=False)
+        est.fit(X, y)
+    metrics["fit_seconds"] = time.perf_counter() - t0
+
+    pipe = Pipeline([
+        ("pre", fm.transformer()),
+        ("numeric", FunctionTransformer(_numeric_columns)),
+        ("model", est),
+    ])
+    out = shard_dir(model_name, region, scenario)
+    out.mkdir(parents=True, exist_ok=True)
+    joblib.dump(pipe, out / "model.joblib")
+    # metrics.json is written last: its presence marks the shard as complete
+    (out / "metrics.json").write_text(json.dumps(metrics, indent=2))
+    return metrics
+
+
+def train_fleet(df: pd.DataFrame, models=MODELS, workers: int = None, test_days: int = 90,
+                refit: bool = True, force: bool = False, regions=None, scenarios=None) -> pd.DataFrame:
+    """Train every (model, region, scenario) shard whose inputs changed.
+
+    Returns the fleet metrics (retrained and up-to-date shards alike, told
+    apart by the retrained column; no rows when no shard is selected) and
+    writes them to
+    outputs/models/fleet/fleet_metrics.csv.
+    """
+    keys = shard_keys(df)
+    if regions:
+        keys = {k: v for k, v in keys.items() if k[0] in regions}
+    if scenarios:
+        keys = {k: v for k, v in keys.items() if k[1] in scenarios}
+
+    todo, current = [], []
+    for model_name in models:
+        for (region, scenario), key in keys.items():
+            prev = _read_metrics(shard_dir(model_name, region, scenario))
+            if not force and prev is not None and prev.get("input_key") == key:
+                current.append(prev)
+            else:
+                todo.append((model_name, region, scenario, key))
+
+    trained = []
+    if todo:
+        fm = build_features(df)
+        rows = shard_rows(fm)
+        cores = os.cpu_count() or 1
+        workers = max(1, min(workers or cores, len(todo)))
+        threads = max(1, cores // workers)
+        args = [(m, r, s, key, rows[(r, s)], test_days, refit) for m, r, s, key in todo]
+        if workers == 1:
+            _init_worker(fm.path, threads)
+            trained = [_train_shard(*a) for a in args]
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(fm.path, threads)) as pool:
+                trained = list(pool.map(_train_shard, *zip(*args)))
+
+    metrics = pd.DataFrame(current + trained)
+    metrics["retrained"] = [False] * len(current) + [True] * len(trained)
+    if metrics.empty:
+        metrics = pd.DataFrame(columns=METRIC_COLUMNS)
+    metrics = metrics.sort_values(["model", "region", "scenario"], ignore_index=True)
+    FLEET_DIR.mkdir(parents=True, exist_ok=True)
+    metrics.to_csv(FLEET_DIR / "fleet_metrics.csv", index=False)
+    return metrics
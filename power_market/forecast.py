@@ -0,0 +1,100 @@
+# forecast.py
+# Price forecast runs (2025 holdout, rolling-origin backtest, per-shard
+# fleet) as importable functions; notebooks/02_Model_Forecast.py is their CLI.
+#
+# scikit-learn and xgboost are imported by the function that fits a model,
+# so importing this module (or power_market.questions) costs neither.
+#
+# Usage:
+#   from power_market.forecast import load_drivers, holdout
+#   metrics, preds = holdout(load_drivers())
+
+import numpy as np
+import pandas as pd
+
+from power_market import schema
+from power_market.backtest import MODELS, backtest, make_model
+from power_market.features import CAT_FEATS, NUM_FEATS, TARGET, build_features
+from power_market.fleet import train_fleet
+from power_market.paths import OUTPUTS_DIR, SOURCE_CSVS
+
+HOLDOUT_METRICS = "q07_model_metrics.csv"
+HOLDOUT_PREDS = "q08_price_forecast_sample.csv"
+BACKTEST_METRICS = "q07_model_backtest_metrics.csv"
+BACKTEST_PREDS = "q08_price_forecast_backtest.csv"
+
+
+def load_drivers(path=None) -> pd.DataFrame:
+    """Daily drivers with the model columns only, incomplete rows dropped."""
+    df = schema.read_frame("v_price_drivers_daily", path or SOURCE_CSVS["v_price_drivers_daily"],
+                           columns=["date", TARGET, *NUM_FEATS, *CAT_FEATS])
+    return df.dropna()
+
+
+def holdout(df: pd.DataFrame, train_end="2024-12-31", test_start="2025-01-01", models=MODELS,
+            out_dir=OUTPUTS_DIR, save: bool = True):
+    """Fit on dates <= train_end, score dates >= test_start; returns (metrics, predictions).
+
+    With save, the metrics and predictions are written to out_dir and each
+    fitted raw-frame pipeline is persisted for batch scoring (scoring.py).
+    """
+    from sklearn.metrics import mean_absolute_error, mean_absolute_percentage_error, r2_score
+    from sklearn.pipeline import Pipeline
+
+    from power_market.scoring import save_model
+
+    # Transformed design matrix from the feature store (fit once per input)
+    fm = build_features(df)
+    train = fm.rows(end=train_end)
+    test = fm.rows(start=test_start)
+
+    X_train, y_train = fm.X[train], fm.y[train]
+    X_test, y_test = fm.X[test], np.asarray(fm.y[test])
+
+    # 1) OLS (via LinearRegression) for interpretable coefficients (after one-hot/scale)
+    # 2) XGBoost for non-linear interactions
+    results, preds = [], []
+    for name in models:
+        model = make_model(name, preprocess=False)
+        model.fit(X_train, y_train)
+        pred = model.predict(X_test)
+        mae = mean_absolute_error(y_test, pred)
+        mape = mean_absolute_percentage_error(y_test, pred)
+        r2 = r2_score(y_test, pred)
+        results.append({"model": name, "MAE": round(mae, 2), "MAPE": round(mape, 3), "R2": round(r2, 3)})
+        if save:
+            # Persist the raw-frame pipeline for batch scoring (python -m power_market.scoring)
+            save_model(Pipeline([("pre", fm.transformer()), ("model", model)]), name,
+                       metrics={"MAE": mae, "MAPE": mape, "R2": r2},
+                       train_end=str(fm.date[train.stop - 1]), feature_key=fm.key)
+        labels = fm.labels(test)
+        preds.append(pd.DataFrame({
+            "model": name,
+            "date": labels["date"],
+            "region": labels["region"],
+            "y_true": y_test,
+            "y_pred": pred,
+        }))
+
+    metrics = pd.DataFrame(results)
+    # Every model's predictions, not just the last one fitted
+    preds = pd.concat(preds, ignore_index=True)
+    if save:
+        metrics.to_csv(out_dir / HOLDOUT_METRICS, index=False)
+        preds.to_csv(out_dir / HOLDOUT_PREDS, index=False)
+    return metrics, preds
+
+
+def rolling_backtest(df: pd.DataFrame, folds: int = 24, horizon: int = 30, min_train: int = 365,
+                     workers: int = None, out_dir=OUTPUTS_DIR, save: bool = True):
+    """Rolling-origin backtest (backtest.py); returns (per-fold metrics, predictions)."""
+    metrics, preds = backtest(df, n_folds=folds, horizon=horizon, min_train=min_train, workers=workers)
+    if save:
+        metrics.to_csv(out_dir / BACKTEST_METRICS, index=False)
+        preds.to_csv(out_dir / BACKTEST_PREDS, index=False)
+    return metrics, preds
+
+
+def fleet(df: pd.DataFrame, workers: int = None, test_days: int = 90, force: bool = False) -> pd.DataFrame:
+    """One model per (region, scenario) shard (fleet.py); returns the shard metrics."""
+    return train_fleet(df, workers=workers, test_days=test_days, force=force)
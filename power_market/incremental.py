@@ -0,0 +1,234 @@
+# incremental.py
+# Month-level incremental refresh for the partitioned questions (Q7, Q9, Q10, Q12, Q15).
+#
+# For every question we keep a small state table of per-(region, scenario, month)
+# digests (row count + xor of row hashes) of its source. The high-water mark of
+# a (region, scenario) is the latest month in that table. A refresh only scans
+# source rows from each high-water month onwards, compares their digests with
+# the stored ones, recomputes the (region, month) or (region, year) partitions
+# that changed, and merges them into the existing answer file.
+#
+# Rows restated *before* a high-water month (or a brand-new region/scenario with
+# back history) are only picked up with full_check=True, which digests the
+# whole source instead.
+#
+# Digests are per month, not per day: every partitioned answer is a monthly or
+# yearly aggregate, so a changed day recomputes its whole month either way,
+# and day digests would only make the state 30x larger. Before any digest is
+# taken, the source's file fingerprint (cache.source_fingerprint) is compared
+# with the one saved with the state; an untouched source costs one stat.
+
+import json
+
+import duckdb
+
+from power_market import schema
+from power_market.cache import connect, source_fingerprint, source_relation
+from power_market.output import to_relation, write_answer
+from power_market.paths import CACHE_DIR, OUTPUTS_DIR
+from power_market.registry import QUESTIONS
+
+# Date column of each partitionable source
+DATE_COLS = {
+    "v_price_drivers_daily":     "date",
+    "v_renew_share_curtailment": "month",
+}
+
+STATE_DIR = CACHE_DIR / "incremental"
+
+
+def _state_path(qid: str):
+    return STATE_DIR / f"{qid}.parquet"
+
+
+def _fingerprint_path(qid: str):
+    return STATE_DIR / f"{qid}.source.json"
+
+
+def unchanged(qid: str, fingerprint: dict) -> bool:
+    """True when qid's digest state was taken from a source with this fingerprint."""
+    path = _fingerprint_path(qid)
+    return (_state_path(qid).exists() and path.exists()
+            and json.loads(path.read_text()) == json.loads(json.dumps(fingerprint)))
+
+
+def save_fingerprint(qid: str, fingerprint: dict):
+    """Record the source fingerprint the digest state of qid now matches."""
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    _fingerprint_path(qid).write_text(json.dumps(fingerprint))
+
+
+def _digest_sql(source: str, where: str = "") -> str:
+    dc = DATE_COLS[source]
+    return f"""
+        SELECT t.region, t.scenario,
+               date_trunc('month', t.{dc})::DATE AS month,
+               count(*)           AS n,
+               bit_xor(hash(t))   AS h
+        FROM {source} t
+        {where}
+        GROUP BY 1, 2, 3
+    """
+
+
+def touched_partitions(con, qid: str, full_check: bool = False, source: str = None):
+    """Register `cur_digest` and `touched` (region, scenario, month) on con.
+
+    qid names the digest state; source defaults to the question's source.
+    Returns False when there is no prior state, i.e. a full rebuild is needed.
+    """
+    source = source or QUESTIONS[qid].sources[0]
+    dc = DATE_COLS[source]
+    state = _state_path(qid)
+
+    if not state.exists():
+        con.execute(f"CREATE OR REPLACE TEMP TABLE cur_digest AS {_digest_sql(source)}")
+        return False
+
+    con.execute(f"CREATE OR REPLACE TEMP VIEW old_digest AS SELECT * FROM read_parquet('{state.as_posix()}')")
+    con.execute("""
+        CREATE OR REPLACE TEMP TABLE hwm AS
+        SELECT region, scenario, max(month) AS hwm FROM old_digest GROUP BY 1, 2
+    """)
+
+    if full_check:
+        con.execute(f"CREATE OR REPLACE TEMP TABLE cur_digest AS {_digest_sql(source)}")
+        scanned = "TRUE"
+    else:
+        # Constant lower bound lets DuckDB skip whole row groups; the per-pair
+        # bound then trims to each (region, scenario)'s own high-water month.
+        lower = con.execute("SELECT min(hwm) FROM hwm").fetchone()[0]
+        con.execute(f"""
+            CREATE OR REPLACE TEMP TABLE cur_digest AS
+            {_digest_sql(source, f'''
+                LEFT JOIN hwm USING (region, scenario)
+                WHERE t.{dc} >= DATE '{lower}' AND (hwm.hwm IS NULL OR t.{dc} >= hwm.hwm)
+            ''')}
+        """)
+        scanned = "o.month >= h.hwm"
+
+    # New or changed partitions, plus partitions that disappeared from the scanned range
+    con.execute(f"""
+        CREATE OR REPLACE TEMP TABLE touched AS
+        SELECT region, scenario, month FROM (
+            SELECT region, scenario, month, n, h FROM cur_digest
+            EXCEPT
+            SELECT region, scenario, month, n, h FROM old_digest
+        )
+        UNION
+        SELECT o.region, o.scenario, o.month
+        FROM old_digest o JOIN hwm h USING (region, scenario)
+        WHERE {scanned}
+          AND NOT EXISTS (SELECT 1 FROM cur_digest c
+                          WHERE c.region = o.region AND c.scenario = o.scenario AND c.month = o.month)
+    """)
+    return True
+
+
+def _save_state(con, qid: str, incremental: bool, fingerprint: dict = None):
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    _fingerprint_path(qid).unlink(missing_ok=True)
+    state = _state_path(qid)
+    tmp = state.with_suffix(".tmp")
+    if incremental:
+        # Keep old digests outside the touched partitions, take fresh ones inside
+        con.execute(f"""
+            COPY (
+                SELECT o.* FROM old_digest o
+                WHERE NOT EXISTS (SELECT 1 FROM touched k
+                                  WHERE k.region = o.region AND k.scenario = o.scenario AND k.month = o.month)
+                UNION ALL
+                SELECT c.* FROM cur_digest c
+                WHERE EXISTS (SELECT 1 FROM touched k
+                              WHERE k.region = c.region AND k.scenario = c.scenario AND k.month = c.month)
+            ) TO '{tmp.as_posix()}' (FORMAT PARQUET)
+        """)
+    else:
+        con.execute(f"COPY cur_digest TO '{tmp.as_posix()}' (FORMAT PARQUET)")
+    tmp.replace(state)
+    if fingerprint is not None:
+        save_fingerprint(qid, fingerprint)
+
+
+def refresh_question(qid: str, full_check: bool = False, formats=("csv",)) -> str:
+    """Incrementally refresh one partitioned question; returns what was done."""
+    from power_market.runner import run_question  # runner imports this module
+
+    q = QUESTIONS[qid]
+    part = q.partition
+    if part is None:
+        raise ValueError(f"{qid} has no Partition and cannot be refreshed incrementally")
+
+    source = q.sources[0]
+    dc = DATE_COLS[source]
+    out_path = OUTPUTS_DIR / q.outputs[0]
+
+    # Taken before the scan: a source rewritten meanwhile is digested next time
+    fp = source_fingerprint(source)
+    if not full_check and out_path.exists() and unchanged(qid, fp):
+        return "up to date"
+
+    con = connect(names=[source])
+    try:
+        have_state = touched_partitions(con, qid, full_check=full_check)
+        if not have_state or not out_path.exists():
+            run_question(qid, con, formats=formats)
+            _save_state(con, qid, incremental=False, fingerprint=fp)
+            return "full rebuild"
+
+        n_touched = con.execute("SELECT count(*) FROM touched").fetchone()[0]
+        if n_touched == 0:
+            save_fingerprint(qid, fp)
+            return "up to date"
+
+        # Answer keys for the touched partitions: (region, month) or (region, year).
+        # Baseline deltas join across scenarios, so a touched scenario touches the
+        # whole (region, period) partition.
+        key = part.keys[-1]
+        period = f"date_trunc('{part.grain}', month)::DATE"
+        key_expr = "month" if part.grain == "month" else f"year({period})"
+        con.execute(f"""
+            CREATE OR REPLACE TEMP TABLE touched_keys AS
+            SELECT DISTINCT region, {period} AS period, {key_expr} AS {key} FROM touched
+        """)
+
+        # Recompute on a private connection whose source view only holds the
+        # touched partitions, so the question's own SQL runs unchanged.
+        lower = con.execute("SELECT min(period) FROM touched_keys").fetchone()[0]
+        keys_df = con.execute("SELECT region, period FROM touched_keys").df()
+        partial_path = STATE_DIR / f"{qid}.partial.parquet"
+        STATE_DIR.mkdir(parents=True, exist_ok=True)
+        sub = duckdb.connect()
+        try:
+            sub.register("touched_keys_df", keys_df)
+            sub.execute(f"""
+                CREATE VIEW {source} AS
+                SELECT t.* FROM {source_relation(sub, source)} t
+                SEMI JOIN touched_keys_df k
+                  ON t.region = k.region AND date_trunc('{part.grain}', t.{dc}) = k.period
+                WHERE t.{dc} >= DATE '{lower}'
+            """)
+            # Spill to Parquet before sub (which the result is bound to)
+            # closes; keeps the DATE/BIGINT types for the merge below
+            to_relation(sub, q.fn(sub)).write_parquet(partial_path.as_posix())
+        finally:
+            sub.close()
+
+        on = " AND ".join(f"k.{c} = e.{c}" for c in part.keys)
+        # The kept rows are read with the recomputed rows' types, not sniffed ones
+        partial = f"read_parquet('{partial_path.as_posix()}')"
+        types = dict(con.execute(f"SELECT column_name, column_type FROM (DESCRIBE SELECT * FROM {partial})").fetchall())
+        merged = con.sql(f"""
+            SELECT * FROM {schema.typed_csv(out_path, types)} e
+            WHERE NOT EXISTS (SELECT 1 FROM touched_keys k WHERE {on})
+            UNION ALL BY NAME
+            SELECT * FROM {partial}
+            ORDER BY {", ".join(part.order_by)}
+        """)
+        write_answer(merged, q.outputs[0], formats=formats)
+        partial_path.unlink()
+        _save_state(con, qid, incremental=True, fingerprint=fp)
+        return f"{n_touched} partition(s) recomputed"
+    finally:
+        con.close()
+
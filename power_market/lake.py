@@ -0,0 +1,168 @@
+# lake.py
+# Hive-partitioned Parquet copies of the warehouse tables (region/scenario/year).
+#
+# lake/<table>/region=CAISO/scenario=Baseline/year=2024/data_0.parquet
+#
+# Ingest writes market_daily, the fuel prices and the v_* views once; the
+# analyses then prefer the lake over the warehouse for any table whose copy is
+# still fresh (the manifest records the fingerprint of what it was built
+# from). With Filters the region/scenario/year predicates prune directories
+# before a single file is opened.
+#
+# Usage:
+#   python -m power_market.lake                 # ingest every table
+#   python -m power_market.lake --tables v_price_drivers_daily
+
+import argparse
+import json
+import shutil
+import time
+
+import duckdb
+
+from power_market import schema
+from power_market.paths import DATA_DIR, LAKE_DIR, SOURCE_CSVS, WAREHOUSE
+
+# Table -> (date column, partition columns); "year" is derived from the date column
+LAKE_TABLES = {
+    "market_daily":              ("date", ["region", "scenario", "year"]),
+    "fuel_prices_monthly":       ("month", ["region", "year"]),
+    "v_price_drivers_daily":     ("date", ["region", "scenario", "year"]),
+    "v_lmp_components_monthly":  ("month", ["region", "year"]),
+    "v_renew_share_curtailment": ("month", ["region", "scenario", "year"]),
+}
+
+# Raw inputs used when the warehouse has not been built
+RAW_CSVS = {
+    "market_daily":        DATA_DIR / "market_daily_fundamentals.csv",
+    "fuel_prices_monthly": DATA_DIR / "fuel_prices_monthly.csv",
+}
+
+MANIFEST = LAKE_DIR / "_manifest.json"
+
+
+def _manifest() -> dict:
+    return json.loads(MANIFEST.read_text()) if MANIFEST.exists() else {}
+
+
+def _upstream_fingerprint(name: str):
+    """Fingerprint of whatever the lake copy of name is built from (None if missing).
+
+    Includes the declared schema, so a changed schema rewrites the copy.
+    """
+    from power_market.cache import fingerprint, in_warehouse
+
+    if in_warehouse(name):
+        return {**fingerprint(WAREHOUSE), "schema": schema.version(name)}
+    src = SOURCE_CSVS.get(name) or RAW_CSVS.get(name)
+    if src is None or not src.exists():
+        return None
+    return {**fingerprint(src), "schema": schema.version(name)}
+
+
+def _upstream_relation(name: str) -> str:
+    from power_market.cache import WAREHOUSE_ALIAS, cached_parquet, in_warehouse
+
+    if in_warehouse(name):
+        return f"{WAREHOUSE_ALIAS}.main.{name}"
+    if name in SOURCE_CSVS:
+        return f"read_parquet('{cached_parquet(name).as_posix()}')"
+    if name in RAW_CSVS and RAW_CSVS[name].exists():
+        return schema.csv_relation(name, RAW_CSVS[name])
+    raise FileNotFoundError(_missing_input(name))
+
+
+def _missing_input(name: str) -> str:
+    src = SOURCE_CSVS.get(name) or RAW_CSVS.get(name)
+    return (f"No source for {name}: neither the warehouse table nor {src} exists "
+            f"(build the warehouse: python -m power_market.warehouse).")
+
+
+def is_fresh(name: str) -> bool:
+    entry = _manifest().get(name)
+    if entry is None or not (LAKE_DIR / name).exists():
+        return False
+    fp = _upstream_fingerprint(name)
+    # Upstream gone: the lake copy is all there is
+    return fp is None or entry["source"] == fp
+
+
+def lake_relation(name: str, filters=None):
+    """Relation over the lake copy of name (None when absent or stale).
+
+    The derived year partition column is dropped from the output; filters'
+    date range is applied to it inside so year directories are pruned.
+    """
+    if name not in LAKE_TABLES or not is_fresh(name):
+        return None
+    glob = (LAKE_DIR / name / "**" / "*.parquet").as_posix()
+    preds = []
+    if filters is not None:
+        first, last = filters.years
+        if first is not None:
+            preds.append(f"year >= {first}")
+        if last is not None:
+            preds.append(f"year <= {last}")
+    where = ("WHERE " + " AND ".join(preds)) if preds else ""
+    return f"(SELECT * EXCLUDE (year) FROM read_parquet('{glob}', hive_partitioning=true) {where})"
+
+
+def ingest(tables=None) -> dict:
+    """(Re)write the lake copies of tables; returns row counts.
+
+    By default every LAKE_TABLES entry with an upstream source is written and
+    the others are skipped (and reported); a table asked for by name without
+    one raises FileNotFoundError.
+    """
+    from power_market.cache import WAREHOUSE_ALIAS, configure, in_warehouse
+
+    if tables:
+        tables = list(tables)
+        for name in tables:
+            if _upstream_fingerprint(name) is None:
+                raise FileNotFoundError(_missing_input(name))
+    else:
+        tables = [t for t in LAKE_TABLES if _upstream_fingerprint(t) is not None]
+        for name in LAKE_TABLES:
+            if name not in tables:
+                src = SOURCE_CSVS.get(name) or RAW_CSVS[name]
+                print(f"✘ lake: skipped {name} (no warehouse table, no {src.name})")
+    LAKE_DIR.mkdir(parents=True, exist_ok=True)
+    manifest = _manifest()
+    counts = {}
+    with configure(duckdb.connect()) as con:
+        if any(in_warehouse(t) for t in tables):
+            con.execute(f"ATTACH '{WAREHOUSE.as_posix()}' AS {WAREHOUSE_ALIAS} (READ_ONLY)")
+        for name in tables:
+            date_col, partition_by = LAKE_TABLES[name]
+            rel, fp = _upstream_relation(name), _upstream_fingerprint(name)
+            out = LAKE_DIR / name
+            tmp = LAKE_DIR / f".{name}.tmp"
+            shutil.rmtree(tmp, ignore_errors=True)
+            # Keep the partition columns inside the files too, so the schema
+            # (and column order) matches the warehouse table
+            counts[name] = con.execute(f"""
+                COPY (SELECT *, year({date_col}) AS year FROM {rel}
+                      ORDER BY {", ".join(partition_by[:-1])}, {date_col})
+                TO '{tmp.as_posix()}'
+                (FORMAT PARQUET, PARTITION_BY ({", ".join(partition_by)}), WRITE_PARTITION_COLUMNS true)
+            """).fetchone()[0]
+            shutil.rmtree(out, ignore_errors=True)
+            tmp.rename(out)
+            manifest[name] = {"source": fp, "partition_by": partition_by, "rows": counts[name]}
+            print(f"✔ lake -> {out} ({counts[name]:,} rows)")
+    MANIFEST.write_text(json.dumps(manifest, indent=2))
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write Hive-partitioned Parquet copies of the warehouse tables.")
+    parser.add_argument("--tables", help=f"Comma-separated subset of {list(LAKE_TABLES)}")
+    args = parser.parse_args(argv)
+    t0 = time.perf_counter()
+    ingest(args.tables.split(",") if args.tables else None)
+    print(f"Ingested in {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+# memo.py
+# Content-addressed memo of answers: skip questions whose inputs, code and
+# parameters are unchanged since an earlier run.
+#
+# key = sha1 of
+#   qid and code version   the question function's source, same-module
+#                          helpers/constants it names, and the power_market
+#                          modules it calls into (deltas.py, stress.py, ...)
+#                          together with every power_market module those
+#                          import, transitively (filters.py, schema.py, ...)
+#   input fingerprints     cache.source_fingerprint() of every source view;
+#                          content hash of every upstream answer it reads
+#   parameters             output directory (encodes the filters) and formats
+# Each key's output files (every file of a directory output, e.g. the chart
+# PNGs) are stored under outputs/.cache/memo/<key>/ at their path relative
+# to the outputs tree. On a hit they are copied back only when the file on
+# disk differs, so unchanged answers are not even rewritten. manifest.json indexes the entries; past
+# max_bytes (PM_MEMO_MB, default 512) entries are evicted, superseded ones
+# (not the most recently used key of their question and parameters) first,
+# then least recently used.
+#
+# Used by power_market.runner (on by default, --no-memo to recompute).
+
+import ast
+import filecmp
+import hashlib
+import importlib.util
+import inspect
+import json
+import os
+import shutil
+import textwrap
+import time
+from pathlib import Path
+
+from power_market.paths import CACHE_DIR, OUTPUTS_DIR, SOURCE_CSVS
+
+MEMO_DIR = CACHE_DIR / "memo"
+DEFAULT_MAX_MB = 512
+# Bump when the stored layout changes: older entries then never hit and age out
+LAYOUT = 2
+
+
+def code_version(fn) -> str:
+    """Hash of fn's source, the same-module code it calls by name and every
+    power_market module that code reaches through imports (transitively)."""
+    h = hashlib.sha1()
+    modules = set()
+    seen = set()
+    todo = [fn]
+    while todo:
+        f = todo.pop()
+        if f in seen:
+            continue
+        seen.add(f)
+        source = inspect.getsource(f)
+        h.update(source.encode())
+        # Imports inside the function body (heavy or optional modules)
+        modules |= _imports(ast.parse(textwrap.dedent(source)))
+        for name in f.__code__.co_names:
+            obj = f.__globals__.get(name)
+            if obj is None:
+                continue
+            if inspect.ismodule(obj):
+                modules.add(obj.__name__)
+                continue
+            module = getattr(obj, "__module__", None)
+            if module == fn.__module__:
+                # Helpers and constants next to the question, and what they call
+                if inspect.isfunction(obj):
+                    todo.append(obj)
+                else:
+                    h.update(repr(obj).encode())
+            elif module and module.startswith("power_market."):
+                modules.add(module)
+    for path in _module_closure(modules):
+        h.update(path.read_bytes())
+    return h.hexdigest()
+
+
+def _imports(tree) -> set:
+    """power_market modules imported anywhere in an AST."""
+    out = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            out.update(a.name for a in node.names if a.name.startswith("power_market."))
+        elif isinstance(node, ast.ImportFrom) and node.module == "power_market":
+            out.update(f"power_market.{a.name}" for a in node.names)
+        elif isinstance(node, ast.ImportFrom) and (node.module or "").startswith("power_market."):
+            out.add(node.module)
+    return out
+
+
+def _module_closure(modules) -> list:
+    """Source files of modules and of every power_market module they import, sorted."""
+    files = {}
+    todo = [m for m in modules if m.startswith("power_market.")]
+    while todo:
+        module = todo.pop()
+        if module in files:
+            continue
+        spec = importlib.util.find_spec(module)
+        if spec is None or not spec.origin or not spec.origin.endswith(".py"):
+            files[module] = None
+            continue
+        files[module] = Path(spec.origin)
+        todo.extend(_imports(ast.parse(files[module].read_bytes())))
+    return [files[m] for m in sorted(files) if files[m] is not None]
+
+
+def _file_hash(path: Path) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class AnswerMemo:
+    """Memo store of one outputs tree; the manifest is written by flush()."""
+
+    def __init__(self, max_bytes: int = None, root: Path = MEMO_DIR):
+        mb = int(os.environ.get("PM_MEMO_MB", DEFAULT_MAX_MB))
+        self.max_bytes = max_bytes if max_bytes is not None else mb * 1024 * 1024
+        self.root = root
+        self.manifest_path = root / "manifest.json"
+        self.entries = json.loads(self.manifest_path.read_text()) if self.manifest_path.exists() else {}
+        self.hits = self.stored = 0
+
+    def key(self, question, out_dir=OUTPUTS_DIR, formats=("csv",)):
+        """(key, params) of a question's next run; None when an upstream answer is missing."""
+        from power_market.cache import source_fingerprint
+
+        inputs = {}
+        for name in question.inputs:
+            if name in SOURCE_CSVS:
+                inputs[name] = source_fingerprint(name)
+            else:
+                path = out_dir / name
+                if not path.exists():
+                    return None
+                inputs[name] = _file_hash(path)
+        try:
+            where = out_dir.relative_to(OUTPUTS_DIR).as_posix()
+        except ValueError:
+            where = Path(out_dir).as_posix()
+        params = {"out_dir": where, "formats": sorted(formats)}
+        spec = {"qid": question.qid, "code": code_version(question.fn), "inputs": inputs, "params": params,
+                "layout": LAYOUT}
+        return hashlib.sha1(json.dumps(spec, sort_keys=True, default=str).encode()).hexdigest(), params
+
+    def restore(self, key, out_dir=OUTPUTS_DIR) -> bool:
+        """Put the files stored for key back under out_dir; False when there are none."""
+        stored = self.root / key
+        files = self.entries.get(key, {}).get("files")
+        if not files or not all((stored / f).exists() for f in files):
+            return False
+        for name in files:
+            src, path = stored / name, out_dir / name
+            if path.exists() and filecmp.cmp(src, path, shallow=False):
+                continue
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            shutil.copyfile(src, tmp)
+            os.replace(tmp, path)
+        self.entries[key]["last_used"] = time.time()
+        self.hits += 1
+        return True
+
+    def save(self, qid: str, key, params: dict, paths, out_dir=OUTPUTS_DIR):
+        """Store the files just written for key (paths under out_dir)."""
+        if not paths or not all(p.exists() for p in paths):
+            return
+        files = [p.relative_to(out_dir).as_posix() for p in paths]
+        final = self.root / key
+        if not final.exists():
+            tmp = self.root / f".{key}.{os.getpid()}.tmp"
+            shutil.rmtree(tmp, ignore_errors=True)
+            for path, name in zip(paths, files):
+                (tmp / name).parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(path, tmp / name)
+            os.replace(tmp, final)
+        now = time.time()
+        self.entries[key] = {
+            "qid": qid,
+            "slot": hashlib.sha1(json.dumps([qid, params], sort_keys=True).encode()).hexdigest(),
+            "files": files,
+            "bytes": sum((final / f).stat().st_size for f in files),
+            "created": now,
+            "last_used": now,
+        }
+        self.stored += 1
+
+    def _evict(self):
+        total = sum(e["bytes"] for e in self.entries.values())
+        if total <= self.max_bytes:
+            return []
+        latest = {}
+        for key, e in self.entries.items():
+            if e["slot"] not in latest or e["last_used"] > self.entries[latest[e["slot"]]]["last_used"]:
+                latest[e["slot"]] = key
+        current = set(latest.values())
+        evicted = []
+        for key in sorted(self.entries, key=lambda k: (k in current, self.entries[k]["last_used"])):
+            if total <= self.max_bytes:
+                break
+            total -= self.entries.pop(key)["bytes"]
+            shutil.rmtree(self.root / key, ignore_errors=True)
+            evicted.append(key)
+        return evicted
+
+    def flush(self) -> list:
+        """Evict past max_bytes and write the manifest; returns the evicted keys."""
+        evicted = self._evict()
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.manifest_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(self.entries, indent=2))
+        os.replace(tmp, self.manifest_path)
+        return evicted
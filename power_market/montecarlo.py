@@ -0,0 +1,178 @@
+# montecarlo.py
+# Monte Carlo fuel-price paths and the power-price distributions they imply.
+#
+# Fit (per region, on fuel_prices_monthly): monthly log-returns of natgas,
+# coal and oil -> mean vector and 3x3 covariance (correlated fuels).
+# Simulate: paths x months x regions x fuels standard normals in one array,
+# correlated with the stacked Cholesky factors, cumulated from each region's
+# last observed prices (geometric random walk).
+# Price: each natgas path goes through the Q14 driver fit (price ~ natgas +
+# cdd by region, reference scenario), with cdd at the region's calendar-month
+# average; coal and oil drive no price there but are reported with it, giving
+# P10/P50/P90 of the three fuels and the price by region and month.
+#
+# Paths are split into fixed-size shards, each with its own child of one
+# SeedSequence, so results depend only on the seed and path count, never on
+# the number of workers. Shards run serially or on a process pool.
+#
+# Usage:
+#   python -m power_market.montecarlo --paths 10000 --years 20 --seed 42
+#   python -m power_market.montecarlo --paths 50000 --years 30 --workers 4 --out outputs/answers/mc.csv
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from power_market.filters import sql_literal
+from power_market.paths import ANSWERS_DIR
+
+# Simulated fuels, the price driver first (see simulate_shard)
+FUELS = {"natgas": "natgas_usd_mmbtu", "coal": "coal_usd_mmbtu", "oil": "oil_usd_bbl"}
+QUANTILES = (0.1, 0.5, 0.9)
+MC_CSV = ANSWERS_DIR / "mc_price_distribution.csv"
+SHARD_PATHS = 1000
+
+
+class FuelModel:
+    """Fitted inputs of the simulation, as arrays aligned with `regions`.
+
+    p0 (R, 3) last observed prices, mu (R, 3) mean monthly log-returns,
+    chol (R, 3, 3) Cholesky factors of their covariance, start the last
+    observed month; intercept (R,), b_natgas (R,), b_cdd (R,) the Q14 price
+    fit and cdd (R, 12) calendar-month average cdd.
+    """
+
+    def __init__(self, regions, start, p0, mu, chol, intercept, b_natgas, b_cdd, cdd):
+        self.regions = list(regions)
+        self.start = pd.Timestamp(start)
+        self.p0 = p0
+        self.mu = mu
+        self.chol = chol
+        self.intercept = intercept
+        self.b_natgas = b_natgas
+        self.b_cdd = b_cdd
+        self.cdd = cdd
+
+
+def fit(con, reference: str = "Baseline") -> FuelModel:
+    """Fit the fuel return model and the price drivers on con's views."""
+    from power_market.regression import grouped_ols
+
+    cols = list(FUELS.values())
+    fuel = con.execute(f"""
+        SELECT region, month, {", ".join(cols)}
+        FROM fuel_prices_monthly
+        ORDER BY region, month
+    """).df()
+    rets = np.log(fuel[cols]).groupby(fuel["region"]).diff()
+    rets["region"] = fuel["region"]
+    rets = rets.dropna()
+
+    drivers = grouped_ols(
+        con, f"(SELECT * FROM v_price_drivers_daily WHERE scenario = {sql_literal(reference)})",
+        y="avg_price_usd_mwh", x={"natgas": "natgas_monthly", "cdd": "cdd"}, by=["region"], min_obs=30,
+    )
+    regions = [r for r in drivers.keys["region"] if r in set(rets["region"])]
+    if not regions:
+        raise RuntimeError("No region has both fuel price history and a price driver fit.")
+    at = {r: i for i, r in enumerate(drivers.keys["region"])}
+    idx = [at[r] for r in regions]
+
+    last = fuel.groupby("region").tail(1).set_index("region")
+    mu = rets.groupby("region")[cols].mean().loc[regions].to_numpy()
+    cov = np.stack([rets.loc[rets["region"] == r, cols].cov().to_numpy() for r in regions])
+    # Jitter keeps the factorization defined for degenerate (e.g. flat) fuels
+    chol = np.linalg.cholesky(cov + 1e-12 * np.eye(len(cols)))
+
+    clim = con.execute(f"""
+        SELECT region, month(date) AS m, avg(cdd) AS cdd
+        FROM v_price_drivers_daily
+        WHERE scenario = {sql_literal(reference)}
+        GROUP BY 1, 2
+    """).df().pivot(index="region", columns="m", values="cdd").reindex(index=regions, columns=range(1, 13))
+
+    return FuelModel(
+        regions, fuel["month"].max(), last.loc[regions, cols].to_numpy(), mu, chol,
+        drivers.intercept[idx], drivers.beta[idx, 0], drivers.beta[idx, 1], clim.fillna(0.0).to_numpy(),
+    )
+
+
+def simulate_shard(model: FuelModel, n_paths: int, months: int, seed) -> dict:
+    """{"natgas", "coal", "oil", "price"}: float32 arrays (paths, months, regions)."""
+    rng = np.random.default_rng(seed)
+    z = rng.standard_normal((n_paths, months, len(model.regions), len(FUELS)))
+    # r = mu + L z for every (path, month, region) at once
+    r = model.mu + np.einsum("rij,nmrj->nmri", model.chol, z, optimize=True)
+    prices = np.log(model.p0) + np.cumsum(r, axis=1)
+    np.exp(prices, out=prices)
+
+    moy = (model.start.month + np.arange(1, months + 1) - 1) % 12  # calendar month index of each step
+    cdd = model.cdd[:, moy].T  # (months, regions)
+    out = {name: prices[..., j].astype(np.float32) for j, name in enumerate(FUELS)}
+    out["price"] = (model.intercept + model.b_natgas * prices[..., 0] + model.b_cdd * cdd).astype(np.float32)
+    return out
+
+
+def simulate(model: FuelModel, n_paths: int = 10_000, months: int = 240, seed: int = 42,
+             workers: int = 1, shard_paths: int = SHARD_PATHS) -> dict:
+    """All paths, shard by shard; same arrays for any workers value."""
+    sizes = [shard_paths] * (n_paths // shard_paths) + ([n_paths % shard_paths] if n_paths % shard_paths else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [(model, n, months, s) for n, s in zip(sizes, seeds)]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(args)))
+    if workers == 1:
+        shards = [simulate_shard(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            shards = list(pool.map(simulate_shard, *zip(*args)))
+    return {k: np.concatenate([s[k] for s in shards]) for k in shards[0]}
+
+
+def distribution(model: FuelModel, paths: dict, quantiles=QUANTILES) -> pd.DataFrame:
+    """Long table: region, month, then P10/P50/P90 (and mean) of every simulated series."""
+    n_months = next(iter(paths.values())).shape[1]
+    months = pd.date_range(model.start + pd.offsets.MonthBegin(1), periods=n_months, freq="MS")
+    grid = pd.MultiIndex.from_product([model.regions, months.date], names=["region", "month"])
+    out = pd.DataFrame(index=grid).reset_index()
+    for name, arr in paths.items():
+        q = np.quantile(arr, quantiles, axis=0)  # (q, months, regions)
+        for qi, p in enumerate(quantiles):
+            out[f"{name}_p{round(p * 100)}"] = q[qi].T.ravel()
+        out[f"{name}_mean"] = arr.mean(axis=0, dtype=np.float64).T.ravel()
+    return out
+
+
+def main(argv=None):
+    from power_market.cache import connect
+
+    parser = argparse.ArgumentParser(description="Monte Carlo fuel paths -> power price distributions.")
+    parser.add_argument("--paths", type=int, default=10_000)
+    parser.add_argument("--years", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=1, help="Process pool size (0 = one per core)")
+    parser.add_argument("--reference", default="Baseline", help="Scenario the price drivers are fitted on")
+    parser.add_argument("--out", default=str(MC_CSV))
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    with connect(names=["fuel_prices_monthly", "v_price_drivers_daily"]) as con:
+        model = fit(con, args.reference)
+    paths = simulate(model, args.paths, 12 * args.years, args.seed, args.workers)
+    t_sim = time.perf_counter() - t0
+    dist = distribution(model, paths)
+
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    dist.to_csv(out, index=False)
+    print(f"{args.paths:,} paths x {12 * args.years} months x {len(model.regions)} regions "
+          f"simulated in {t_sim:.1f}s")
+    print(f"✔ saved -> {out} ({time.perf_counter() - t0:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
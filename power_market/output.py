@@ -0,0 +1,90 @@
+# output.py
+# Answer writer: DuckDB relations go straight to disk with COPY, no pandas.
+#
+# Questions may return a DuckDB relation (con.sql(...)) or a pandas
+# DataFrame. Relations are written by DuckDB's own CSV/Parquet writers, so
+# the rows never pass through pandas and are formatted by the engine that
+# produced them. DataFrames (answers computed in pandas) keep the pandas CSV
+# writer and go to Parquet through a scratch DuckDB connection.
+#
+# Parquet answers sit next to the CSVs with the same name, typed (DATE,
+# DOUBLE, BOOLEAN), for Tableau / Power BI extracts.
+
+import os
+
+import duckdb
+import pandas as pd
+
+from power_market.paths import OUTPUTS_DIR
+
+FORMATS = ("csv", "parquet")
+
+
+def answer_paths(name: str, out_dir=OUTPUTS_DIR, formats=("csv",)) -> dict:
+    """{format: path} for an output declared as name (relative to out_dir)."""
+    base = out_dir / name
+    return {fmt: base.with_suffix(f".{fmt}") for fmt in formats}
+
+
+def _check_formats(formats):
+    unknown = set(formats) - set(FORMATS)
+    if unknown or not formats:
+        raise ValueError(f"formats must be a non-empty subset of {FORMATS}, got {formats!r}")
+
+
+def _tmp(path):
+    # Write beside the target and rename, so readers never see a partial file
+    return path.with_name(f".{path.name}.{os.getpid()}.tmp")
+
+
+def _write_relation(rel, paths: dict):
+    # Parquet first; when both are asked for, the CSV is copied from the
+    # Parquet file rather than running the query twice
+    written = None
+    for fmt in sorted(paths, key=lambda f: f != "parquet"):
+        tmp = _tmp(paths[fmt])
+        if fmt == "parquet":
+            rel.write_parquet(tmp.as_posix())
+        elif written is not None:
+            with duckdb.connect() as scratch:
+                scratch.read_parquet(written.as_posix()).write_csv(tmp.as_posix(), header=True)
+        else:
+            rel.write_csv(tmp.as_posix(), header=True)
+        os.replace(tmp, paths[fmt])
+        written = paths[fmt]
+
+
+def _write_frame(df: pd.DataFrame, paths: dict):
+    for fmt, path in paths.items():
+        tmp = _tmp(path)
+        if fmt == "csv":
+            df.to_csv(tmp, index=False)
+        else:
+            with duckdb.connect() as scratch:
+                scratch.from_df(df).write_parquet(tmp.as_posix())
+        os.replace(tmp, path)
+
+
+def write_answer(result, name: str, out_dir=OUTPUTS_DIR, formats=("csv",)) -> list:
+    """Write a question's result (DuckDB relation or DataFrame) in each format."""
+    _check_formats(formats)
+    paths = answer_paths(name, out_dir, formats)
+    for path in paths.values():
+        path.parent.mkdir(parents=True, exist_ok=True)
+    if isinstance(result, pd.DataFrame):
+        _write_frame(result, paths)
+    else:
+        _write_relation(result, paths)
+    for path in paths.values():
+        print("✔ saved ->", path)
+    return list(paths.values())
+
+
+def to_relation(con, result):
+    """A question's result as a DuckDB relation on con."""
+    return con.from_df(result) if isinstance(result, pd.DataFrame) else result
+
+
+def to_frame(result) -> pd.DataFrame:
+    """A question's result as a DataFrame; DataFrame answers are returned as they are."""
+    return result if isinstance(result, pd.DataFrame) else result.df()
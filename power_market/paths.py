@@ -0,0 +1,35 @@
+# paths.py
+# Project locations shared by every script.
+#
+# Data, outputs and the warehouse live under the project root by default; set
+# PM_HOME to point the whole pipeline at another tree with the same layout
+# (e.g. a synthetic dataset generated by power_market.synth).
+
+import os
+from pathlib import Path
+
+BASE = Path(__file__).resolve().parent.parent
+SQL_DIR = BASE / "sql"
+
+ROOT = Path(os.environ.get("PM_HOME", BASE)).resolve()
+DATA_DIR = ROOT / "data"
+OUTPUTS_DIR = ROOT / "outputs"
+ANSWERS_DIR = OUTPUTS_DIR / "answers"
+CHARTS_DIR = OUTPUTS_DIR / "charts"
+CACHE_DIR = OUTPUTS_DIR / ".cache"
+MODELS_DIR = OUTPUTS_DIR / "models"
+WAREHOUSE = ROOT / "power_market.duckdb"
+LAKE_DIR = ROOT / "lake"  # Hive-partitioned Parquet copies (power_market.lake)
+
+# Hourly (optionally nodal) market data; rolled up to daily by power_market.rollup
+HOURLY_CSV = DATA_DIR / "market_hourly_fundamentals.csv"
+
+# CSV fallbacks for the warehouse tables the analyses read: exported views
+# (see sql/02_views.sql) and raw inputs
+SOURCE_CSVS = {
+    "v_price_drivers_daily":     OUTPUTS_DIR / "v_price_drivers_daily.csv",
+    "v_lmp_components_monthly":  OUTPUTS_DIR / "v_lmp_components_monthly.csv",
+    "v_renew_share_curtailment": OUTPUTS_DIR / "v_renew_share_curtailment.csv",
+    "capacity_plan":             DATA_DIR / "capacity_expansion_plan.csv",
+    "fuel_prices_monthly":       DATA_DIR / "fuel_prices_monthly.csv",
+}
@@ -0,0 +1,163 @@
+# profiling.py
+# Opt-in per-question / per-stage instrumentation and the JSON run report.
+#
+# With --profile (or PM_PROFILE=1) every question the runner executes, and
+# every stage of the forecast notebook, is measured:
+#   seconds, cpu_seconds    wall and process CPU time
+#   peak_rss_mb             the process's peak resident set so far
+#   rows_read, bytes_read   rows produced by DuckDB table scans / bytes read
+#   duckdb_cpu_seconds      CPU DuckDB spent on the query
+#   hot_operator            the slowest operator of the query plan
+#   rows_written            data rows in the CSV / Parquet outputs
+# The DuckDB numbers come from the profile of the task's last query (for a
+# relation answer, the COPY that runs the whole plan), saved next to the
+# report as <name>.json: the same tree EXPLAIN ANALYZE prints.
+#
+# In thread mode CPU time and peak RSS are process-wide, so concurrent
+# questions overlap; use --workers 1 or --mode process for clean
+# attribution. Reports go to outputs/profiles/<run>_<timestamp>/report.json.
+
+import json
+import os
+import resource
+import sys
+import time
+from datetime import datetime
+
+from power_market.paths import OUTPUTS_DIR
+
+PROFILES_DIR = OUTPUTS_DIR / "profiles"
+
+
+def enabled(flag: bool = False) -> bool:
+    """True when profiling was asked for by flag or PM_PROFILE."""
+    return flag or os.environ.get("PM_PROFILE", "") not in ("", "0")
+
+
+def peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def _walk(node):
+    yield node
+    for child in node.get("children", []):
+        yield from _walk(child)
+
+
+def plan_stats(profile: dict) -> dict:
+    """Rows/bytes read, DuckDB CPU and the slowest operator of a JSON query profile."""
+    ops = [n for n in _walk(profile) if "operator_type" in n]
+    scans = [n for n in ops if n["operator_type"] == "TABLE_SCAN"]
+    hot = max(ops, key=lambda n: n.get("operator_timing", 0), default=None)
+    return {
+        "rows_read": sum(n.get("operator_cardinality", 0) for n in scans),
+        "bytes_read": profile.get("total_bytes_read"),
+        "duckdb_cpu_seconds": profile.get("cpu_time"),
+        "hot_operator": hot and f"{hot.get('operator_name', hot['operator_type']).strip()} "
+                                f"({hot.get('operator_timing', 0):.3f}s)",
+    }
+
+
+def rows_written(paths):
+    """Data rows in the CSV / Parquet files among paths (None when there are none)."""
+    import duckdb
+
+    paths = [p for p in paths if p.suffix in (".csv", ".parquet") and p.exists()]
+    if not paths:
+        return None
+    n = 0
+    for path in paths:
+        if path.suffix == ".csv":
+            with open(path, "rb") as f:
+                n += max(0, sum(1 for _ in f) - 1)
+        elif path.suffix == ".parquet":
+            with duckdb.connect() as scratch:
+                n += scratch.execute(f"SELECT count(*) FROM read_parquet('{path.as_posix()}')").fetchone()[0]
+    return n
+
+
+def measure(name: str, fn, con=None, outputs=(), profile_dir=None):
+    """Run fn() and return (its result, its measurements).
+
+    With con (a connection or cursor fn runs its queries on) and
+    profile_dir, DuckDB profiling is on for the call and the last query's
+    profile is saved as profile_dir/<name>.json.
+    """
+    plan_path = None
+    if con is not None and profile_dir is not None:
+        profile_dir.mkdir(parents=True, exist_ok=True)
+        plan_path = profile_dir / f"{name}.json"
+        plan_path.unlink(missing_ok=True)
+        con.execute("PRAGMA enable_profiling='json'")
+        con.execute(f"SET profiling_output='{plan_path.as_posix()}'")
+
+    wall0, cpu0 = time.perf_counter(), time.process_time()
+    try:
+        result = fn()
+    finally:
+        if plan_path is not None:
+            con.execute("PRAGMA disable_profiling")
+    record = {
+        "name": name,
+        "seconds": time.perf_counter() - wall0,
+        "cpu_seconds": time.process_time() - cpu0,
+        "peak_rss_mb": peak_rss_mb(),
+        "pid": os.getpid(),
+    }
+    if plan_path is not None and plan_path.exists():
+        record.update(plan_stats(json.loads(plan_path.read_text())), profile=plan_path.name)
+    if outputs:
+        record["rows_written"] = rows_written(outputs)
+    return result, record
+
+
+class RunReport:
+    """Collects measurements for one run and writes report.json plus a summary table."""
+
+    def __init__(self, run: str):
+        self.run = run
+        self.started = datetime.now()
+        self.dir = PROFILES_DIR / f"{run}_{self.started:%Y%m%d_%H%M%S}"
+        self.records = []
+        self._t0 = time.perf_counter()
+
+    def add(self, record: dict):
+        self.records.append(record)
+
+    def stage(self, name: str, fn, *args, con=None, outputs=(), **kwargs):
+        """Measure fn(*args, **kwargs) as a stage of this run and return its result."""
+        result, record = measure(name, lambda: fn(*args, **kwargs), con, outputs, self.dir)
+        self.add(record)
+        return result
+
+    def summary(self) -> str:
+        head = f"  {'name':<16} {'wall s':>8} {'cpu s':>8} {'peak MB':>9} {'rows read':>11} {'rows out':>10}  hot operator"
+        lines = [head]
+        for r in sorted(self.records, key=lambda r: -r["seconds"]):
+            fmt = lambda k: f"{r[k]:,}" if r.get(k) is not None else "-"  # noqa: E731
+            lines.append(f"  {r['name']:<16} {r['seconds']:8.2f} {r['cpu_seconds']:8.2f} {r['peak_rss_mb']:9.1f} "
+                         f"{fmt('rows_read'):>11} {fmt('rows_written'):>10}  {r.get('hot_operator') or '-'}")
+        return "\n".join(lines)
+
+    def write(self, **meta):
+        """Write report.json (with meta: flags, scale, ...) and print the summary."""
+        import platform
+
+        import duckdb
+
+        self.dir.mkdir(parents=True, exist_ok=True)
+        path = self.dir / "report.json"
+        path.write_text(json.dumps({
+            "run": self.run,
+            "started": self.started.isoformat(timespec="seconds"),
+            "wall_seconds": time.perf_counter() - self._t0,
+            "host": {"python": platform.python_version(), "duckdb": duckdb.__version__,
+                     "platform": platform.platform(), "cpus": os.cpu_count()},
+            **meta,
+            "records": self.records,
+        }, indent=2, default=str))
+        print(self.summary())
+        print("✔ saved ->", path)
+        return path
@@ -0,0 +1,310 @@
+# questions.py
+# Q03 and Q6–Q15 as registered tasks.
+#
+# Each question takes a DuckDB connection (with the cached sources registered
+# as views) and returns its answer frame; the runner writes it to the declared
+# output (paths relative to outputs/).
+
+import pandas as pd
+
+from power_market import schema
+from power_market.capacity import load_plan, project, to_frame, variant_grid
+from power_market.charts import render_charts, select_specs
+from power_market.correlation import MOMENT_COLS, corr_matrix, correlations, partition_moments
+from power_market.deltas import scenario_deltas
+from power_market.filters import is_identifier
+from power_market.paths import OUTPUTS_DIR
+from power_market.registry import Partition, question
+from power_market.regression import grouped_ols
+from power_market.stress import stress_screen
+from power_market.volatility import rolling_volatility
+
+# ----------------------------------------------------------
+# Q03: Correlation matrix of the daily drivers
+# ----------------------------------------------------------
+Q03_NUM_COLS = MOMENT_COLS
+
+
+@question("q03", inputs=["v_price_drivers_daily"], outputs=["answers/q03_correlations.csv"])
+def q03(con, moments=None):
+    # Every pairwise moment in one streaming aggregate (or the incremental
+    # moment store, see correlation.py): nothing but the 11x11 matrix is
+    # materialized, however many rows the drivers table has
+    moments = moments if moments is not None else partition_moments(con, by=())
+    return corr_matrix(correlations(moments))
+
+
+def corr_heatmap(corr: pd.DataFrame, path):
+    """Save a correlation matrix as a heatmap PNG (matplotlib loads here, on first use)."""
+    import matplotlib
+
+    matplotlib.use("Agg")
+    from matplotlib.figure import Figure
+
+    # Object-oriented API on Agg: no pyplot state, safe in worker threads/processes
+    num_cols = list(corr.columns)
+    fig = Figure(figsize=(8, 6), layout="tight")
+    ax = fig.subplots()
+    im = ax.imshow(corr, cmap='coolwarm', vmin=-1, vmax=1)
+    ax.set_xticks(range(len(num_cols)), num_cols, rotation=90)
+    ax.set_yticks(range(len(num_cols)), num_cols)
+    fig.colorbar(im, ax=ax, label='Correlation')
+    fig.savefig(path, dpi=140)
+
+
+@question("q03_heatmap", inputs=["answers/q03_correlations.csv"], outputs=["charts/q03_corr_heatmap.png"])
+def q03_heatmap(con, out_dir=OUTPUTS_DIR):
+    corr = schema.read_answer(out_dir / "answers" / "q03_correlations.csv", index_col=0)
+
+    # Ensure charts folder exists before saving plot
+    charts_dir = out_dir / "charts"
+    charts_dir.mkdir(parents=True, exist_ok=True)
+    corr_heatmap(corr, charts_dir / "q03_corr_heatmap.png")
+
+
+# ------------------
+# Q6: DART spread stats by region
+# ------------------
+@question("q06", inputs=["v_price_drivers_daily"], outputs=["answers/q06_dart_spread_stats_by_region.csv"])
+def q06(con):
+    return con.sql("""
+      SELECT region,
+             MIN(dart_spread_usd_mwh) AS dart_min,
+             AVG(dart_spread_usd_mwh) AS dart_avg,
+             MAX(dart_spread_usd_mwh) AS dart_max
+      FROM v_price_drivers_daily
+      GROUP BY 1
+      ORDER BY 1
+    """)
+
+
+# ------------------
+# Q7: Price deltas vs Baseline
+# ------------------
+@question("q07", inputs=["v_price_drivers_daily"], outputs=["answers/q07_price_delta_vs_baseline.csv"],
+          partition=Partition("month", keys=["region", "month"], order_by=["region", "month", "scenario"]))
+def q07(con):
+    d = scenario_deltas(con, "v_price_drivers_daily", {"price": "AVG(avg_price_usd_mwh)"}, grain="month")
+    return d.select("region, scenario, month, price, "
+                    "price_ref AS base_price, price_delta AS price_delta_vs_baseline")
+
+
+# ------------------
+# Q8: Correlation (natgas vs price) by region & scenario
+# ------------------
+@question("q08", inputs=["v_price_drivers_daily"], outputs=["answers/q08_corr_natgas_vs_price_by_scenario.csv"])
+def q08(con, moments=None):
+    pair = [('avg_price_usd_mwh', 'natgas_monthly')]
+    if moments is None:
+        moments = partition_moments(con, by=("region", "scenario"), pairs=pair)
+    return correlations(moments, by=("region", "scenario")).query("c", f"""
+      SELECT region, scenario, r AS r_natgas_price
+      FROM c
+      WHERE a = '{pair[0][0]}' AND b = '{pair[0][1]}'
+      ORDER BY 1,2
+    """)
+
+
+# ------------------
+# Q9: Curtailment & renew share deltas vs Baseline
+# ------------------
+@question("q09", inputs=["v_renew_share_curtailment"],
+          outputs=["answers/q09_curtailment_and_share_deltas_vs_baseline.csv"],
+          partition=Partition("month", keys=["region", "month"], order_by=["region", "month", "scenario"]))
+def q09(con):
+    d = scenario_deltas(
+        con, "v_renew_share_curtailment",
+        {"renew_share_pct": "AVG(avg_renew_share_pct)", "curtailment_mwh": "AVG(curtailment_mwh_month)"},
+        grain="month", date_col="month",
+    )
+    return d.select("""
+        region, scenario, month,
+        renew_share_pct, curtailment_mwh,
+        renew_share_pct_ref   AS base_share,
+        curtailment_mwh_ref   AS base_curtail,
+        renew_share_pct_delta AS renew_share_delta_vs_baseline,
+        curtailment_mwh_delta AS curtailment_delta_vs_baseline
+    """)
+
+
+# ----------------------------------------------------------
+# Q10: DART spread delta (Storage_Focus vs Baseline), monthly
+# ----------------------------------------------------------
+# Monthly average DART spread per (region, scenario, month), Storage_Focus
+# against Baseline by (region, month), with absolute and percent deltas.
+@question("q10", inputs=["v_price_drivers_daily"], outputs=["answers/q10_dart_spread_delta_storage_focus.csv"],
+          partition=Partition("month", keys=["region", "month"], order_by=["region", "month"]))
+def q10(con):
+    d = scenario_deltas(con, "v_price_drivers_daily", {"dart": "AVG(dart_spread_usd_mwh)"},
+                        grain="month", scenarios=["Storage_Focus"])
+    return d.select("""
+        region, month,
+        dart_ref       AS base_dart,
+        dart           AS storage_dart,
+        dart_delta     AS dart_delta_vs_baseline,
+        dart_pct_delta AS dart_pct_change_vs_baseline
+    """)
+
+
+# ----------------------------------------------------------
+# Q11: Capacity additions by region & technology (annual MW)
+# ----------------------------------------------------------
+# Source: data/capacity_expansion_plan.csv
+# Columns expected: region, tech, year, add_capacity_mw
+# ----------------------------------------------------------
+@question("q11", inputs=["capacity_plan"], outputs=["answers/q11_capacity_additions_by_tech.csv"])
+def q11(con):
+    # Simple aggregation by region, tech, and year
+    return con.sql("""
+    SELECT
+        region,
+        tech AS technology,
+        year,
+        SUM(add_capacity_mw) AS total_add_mw
+    FROM capacity_plan
+    GROUP BY region, tech, year
+    ORDER BY region, tech, year;
+    """)
+
+
+# ----------------------------------------------------------
+# Q11 (stock): installed capacity stock, net additions and capex
+# ----------------------------------------------------------
+# The plan as written (the identity variant of capacity.py): additions net
+# of retirements, cumulative stock since the first plan year, capex spend.
+@question("q11_stock", inputs=["capacity_plan"], outputs=["answers/q11_capacity_stock_and_capex.csv"])
+def q11_stock(con):
+    plan = load_plan(con)
+    grid = variant_grid()
+    result = project(plan, grid["add_scale"], grid["retire_delay"], grid["capex_learning"])
+    return to_frame(result, plan, grid).drop(columns="variant")
+
+
+# ----------------------------------------------------------
+# Q12: Annual curtailment & renewable share summary
+# ----------------------------------------------------------
+# Source: outputs/v_renew_share_curtailment.csv
+# Columns expected: region, scenario, month, avg_renew_share_pct, curtailment_mwh_month
+# ----------------------------------------------------------
+@question("q12", inputs=["v_renew_share_curtailment"], outputs=["answers/q12_annual_curtailment_and_share.csv"],
+          partition=Partition("year", keys=["region", "year"], order_by=["region", "scenario", "year"]))
+def q12(con):
+    # Aggregate to annual totals
+    return con.sql("""
+    SELECT
+        region,
+        scenario,
+        EXTRACT(YEAR FROM month) AS year,
+        SUM(curtailment_mwh_month) AS total_curtailment_mwh,
+        AVG(avg_renew_share_pct)   AS avg_renew_share_pct
+    FROM v_renew_share_curtailment
+    GROUP BY region, scenario, year
+    ORDER BY region, scenario, year;
+    """)
+
+
+# ----------------------------------------------------------
+# Q13: Summer Peak Stress Screen (Jun–Sep)
+# Composite z-score per (region, month) using:
+#   - Monthly CDD (load proxy) from daily drivers
+#   - Monthly congestion_usd_mwh (from LMP components)
+#   - Monthly curtailment_mwh_month (Baseline scenario)
+# Other seasons/scenarios/components: see stress.stress_screen.
+# ----------------------------------------------------------
+@question("q13",
+          inputs=["v_price_drivers_daily", "v_lmp_components_monthly", "v_renew_share_curtailment"],
+          outputs=["answers/q13_summer_peak_stress.csv"])
+def q13(con):
+    df = stress_screen(con, components=("cdd", "congestion", "curtailment"),
+                       seasons="summer", scenarios=("Baseline",), threshold=1.5)
+
+    # Tidy columns
+    out_cols = [
+        "region", "month",
+        "cdd_monthly", "congestion_usd_mwh", "curtailment_mwh_month",
+        "z_cdd", "z_congestion", "z_curtailment",
+        "stress_score", "rank_in_region", "stress_flag"
+    ]
+    return df[out_cols]
+
+
+# ----------------------------------------------------------
+# Q14: Driver Attribution by Region (nat gas vs CDD)
+# Regress daily avg_price_usd_mwh on natgas_monthly and CDD.
+# For each region (batched, see regression.py):
+#   - OLS from grouped covariance moments
+#   - Report n_obs, R^2, betas, standardized betas, importance %
+# ----------------------------------------------------------
+Q14_DRIVERS = {"natgas": "natgas_monthly", "cdd": "cdd"}
+
+
+@question("q14", inputs=["v_price_drivers_daily"], outputs=["answers/q14_driver_attribution_by_region.csv"])
+def q14(con, by=("region",), drivers=None):
+    drivers = drivers or Q14_DRIVERS
+
+    # Required columns (driver columns may be any the view has); keys and
+    # drivers given as expressions ("year(date) AS year") bind in the query
+    plain = {c for c in (*by, *drivers.values()) if is_identifier(c)}
+    schema.validate(con, "v_price_drivers_daily", {*plain, "date", "avg_price_usd_mwh"})
+
+    # Groups need at least 30 observations for a stable fit
+    fit = grouped_ols(con, "v_price_drivers_daily", y="avg_price_usd_mwh",
+                      x=drivers, by=list(by), min_obs=30)
+    return fit.to_frame()
+
+
+# ----------------------------------------------------------
+# Q15: Price & DART volatility (monthly, by region)
+# ----------------------------------------------------------
+# Uses v_price_drivers_daily which includes:
+# ['date','region','scenario','avg_price_usd_mwh','dart_spread_usd_mwh', ...]
+# Computes monthly stddev of avg price and DART spread per region.
+@question("q15", inputs=["v_price_drivers_daily"], outputs=["answers/q15_price_and_dart_volatility_monthly.csv"],
+          partition=Partition("month", keys=["region", "month"], order_by=["region", "month"]))
+def q15(con):
+    # Sanity: require columns we need
+    schema.validate(con, "v_price_drivers_daily", {'date', 'region', 'avg_price_usd_mwh', 'dart_spread_usd_mwh'})
+
+    # Compute monthly volatility and mean DART for reference
+    return con.sql("""
+        WITH monthly AS (
+            SELECT
+                region,
+                date_trunc('month', try_cast(date AS DATE))::DATE AS month,
+                avg_price_usd_mwh,
+                dart_spread_usd_mwh
+            FROM v_price_drivers_daily
+            WHERE date IS NOT NULL
+        )
+        SELECT
+            region,
+            month,
+            stddev_samp(avg_price_usd_mwh)   AS price_vol_usd,
+            stddev_samp(dart_spread_usd_mwh) AS dart_vol_usd,
+            avg(dart_spread_usd_mwh)         AS dart_mean_usd
+        FROM monthly
+        GROUP BY 1,2
+        ORDER BY 1,2
+    """)
+
+
+# ----------------------------------------------------------
+# Q15 (rolling): trailing 7/30/90-day and EWMA volatility
+# ----------------------------------------------------------
+# Per (region, scenario) rather than pooled, one row per day; see volatility.py.
+@question("q15_rolling", inputs=["v_price_drivers_daily"],
+          outputs=["answers/q15_price_and_dart_volatility_rolling.csv"])
+def q15_rolling(con):
+    return rolling_volatility(con)
+
+
+# ----------------------------------------------------------
+# Charts: the overview PNGs of the scenario answers (see charts.py)
+# ----------------------------------------------------------
+# Runs after the answers it draws (the runner's post-stage); only charts whose
+# rows changed are redrawn. The chart directories are outputs too, so the
+# memo stores and restores the PNGs with the index.
+@question("charts", inputs=sorted({f"answers/{spec.answer}.csv" for spec in select_specs()}),
+          outputs=["charts/index.csv", *(f"{spec.subdir}/" for spec in select_specs())])
+def charts(con, out_dir=OUTPUTS_DIR):
+    return render_charts(out_dir)
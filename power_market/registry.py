@@ -0,0 +1,73 @@
+# registry.py
+# Question registry: every Qn is a task with declared inputs and outputs.
+#
+# Inputs are either cached sources (keys of paths.SOURCE_CSVS) or files written
+# by another question; the runner uses them to order the DAG. Outputs are paths
+# relative to outputs/ (e.g. "answers/q06_....csv", "charts/....png").
+
+import inspect
+
+from power_market.paths import SOURCE_CSVS
+
+QUESTIONS = {}
+
+
+class Partition:
+    """How an answer splits into independently recomputable partitions.
+
+    grain is "month" or "year"; keys are the answer columns identifying a
+    partition (region + the grain column); order_by restores the answer's
+    row order after merging recomputed partitions back in.
+    """
+
+    def __init__(self, grain: str, keys, order_by):
+        if grain not in ("month", "year"):
+            raise ValueError(f"grain must be 'month' or 'year', got {grain!r}")
+        self.grain = grain
+        self.keys = tuple(keys)
+        self.order_by = tuple(order_by)
+
+
+class Question:
+    def __init__(self, qid: str, fn, inputs, outputs, partition=None):
+        self.qid = qid
+        self.fn = fn
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.partition = partition
+        # Questions that write their own files (charts) take out_dir=...
+        params = inspect.signature(fn).parameters
+        self.takes_out_dir = "out_dir" in params
+        # Questions answered from correlation moments take moments=... (the
+        # incremental runner passes the moment store, see correlation.py)
+        self.takes_moments = "moments" in params
+
+    @property
+    def sources(self):
+        """Inputs served from the view cache (as opposed to upstream answers)."""
+        return [i for i in self.inputs if i in SOURCE_CSVS]
+
+    def __repr__(self):
+        return f"Question({self.qid!r}, inputs={self.inputs}, outputs={self.outputs})"
+
+
+def question(qid: str, inputs, outputs, partition=None):
+    """Decorator registering fn(con) under qid.
+
+    Pass a Partition for questions that support incremental refresh.
+    """
+    def register(fn):
+        if qid in QUESTIONS:
+            raise ValueError(f"Question {qid!r} registered twice")
+        QUESTIONS[qid] = Question(qid, fn, inputs, outputs, partition)
+        return fn
+    return register
+
+
+def dependencies(selected):
+    """Map each selected qid to the selected qids producing its inputs."""
+    producers = {out: q.qid for q in (QUESTIONS[s] for s in selected) for out in q.outputs}
+    return {
+        qid: {producers[i] for i in QUESTIONS[qid].inputs if i in producers}
+        for qid in selected
+    }
@@ -0,0 +1,113 @@
+# regression.py
+# Batched OLS driver attribution over any grouping.
+#
+# One aggregation pass computes, per group, the means and the population
+# covariance matrix of [y, x1..xk] (DuckDB's covar_pop is numerically stable,
+# unlike raw sums of squares). All groups are then solved at once as a stack
+# of k×k systems, so thousands of group fits cost one scan plus a few array
+# operations instead of a Python loop with a lstsq per group.
+
+import numpy as np
+import pandas as pd
+
+
+class GroupedOLS:
+    """Per-group OLS results as arrays aligned with the rows of `keys`.
+
+    n (G,), intercept (G,), beta (G, k), beta_std (G, k), r2 (G,),
+    importance (G, k) — importance is |beta_std| as a % share per group.
+    """
+
+    def __init__(self, keys, labels, n, intercept, beta, beta_std, r2, importance):
+        self.keys = keys
+        self.labels = list(labels)
+        self.n = n
+        self.intercept = intercept
+        self.beta = beta
+        self.beta_std = beta_std
+        self.r2 = r2
+        self.importance = importance
+
+    def to_frame(self) -> pd.DataFrame:
+        """Wide table: keys, n_obs, r2, beta_*, beta_*_std, importance_*_pct."""
+        out = self.keys.copy()
+        out["n_obs"] = self.n
+        out["r2"] = self.r2
+        out["beta_intercept"] = self.intercept
+        for j, lab in enumerate(self.labels):
+            out[f"beta_{lab}"] = self.beta[:, j]
+        for j, lab in enumerate(self.labels):
+            out[f"beta_{lab}_std"] = self.beta_std[:, j]
+        for j, lab in enumerate(self.labels):
+            out[f"importance_{lab}_pct"] = self.importance[:, j]
+        return out
+
+
+def grouped_ols(con, relation: str, y: str, x, by, min_obs: int = 30) -> GroupedOLS:
+    """Fit y ~ 1 + x separately for every group of `by` in one pass.
+
+    relation: table/view name or parenthesised subquery on con.
+    x: list of driver columns, or {label: column or SQL expression}.
+    by: list of grouping expressions, e.g. ["region"], ["region", "scenario"]
+        or ["region", "year(date) AS year"].
+    Groups with fewer than min_obs complete rows are skipped.
+    """
+    x = dict(x) if isinstance(x, dict) else {c: c for c in x}
+    labels, cols = list(x), [y] + list(x.values())
+    k = len(labels)
+
+    aggs = ["count(*) AS n"]
+    aggs += [f"avg({c}) AS m{i}" for i, c in enumerate(cols)]
+    aggs += [
+        f"covar_pop({cols[i]}, {cols[j]}) AS c{i}_{j}"
+        for i in range(k + 1) for j in range(i, k + 1)
+    ]
+    complete = " AND ".join(f"({c}) IS NOT NULL" for c in cols)
+    group_idx = ", ".join(str(i + 1) for i in range(len(by)))
+
+    stats = con.execute(f"""
+        SELECT {", ".join(by)}, {", ".join(aggs)}
+        FROM {relation}
+        WHERE {complete}
+        GROUP BY {group_idx}
+        HAVING count(*) >= {int(min_obs)}
+        ORDER BY {group_idx}
+    """).df()
+
+    keys = stats.iloc[:, :len(by)].reset_index(drop=True)
+    n = stats["n"].to_numpy()
+    mean = stats[[f"m{i}" for i in range(k + 1)]].to_numpy(dtype=float)
+
+    # Symmetric (G, k+1, k+1) covariance stack; index 0 is y
+    cov = np.empty((len(stats), k + 1, k + 1))
+    for i in range(k + 1):
+        for j in range(i, k + 1):
+            cov[:, i, j] = cov[:, j, i] = stats[f"c{i}_{j}"].to_numpy(dtype=float)
+
+    return solve_moments(keys, labels, n, mean, cov)
+
+
+def solve_moments(keys, labels, n, mean, cov) -> GroupedOLS:
+    """Solve the stacked normal equations from per-group means and covariances."""
+    cxx = cov[:, 1:, 1:]
+    cxy = cov[:, 1:, 0]
+    syy = cov[:, 0, 0]
+
+    # pinv gives the same minimum-norm answer as lstsq for rank-deficient groups
+    beta = (np.linalg.pinv(cxx) @ cxy[:, :, None])[:, :, 0]
+    intercept = mean[:, 0] - np.einsum("gk,gk->g", beta, mean[:, 1:])
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r2 = np.where(syy > 0, np.einsum("gk,gk->g", beta, cxy) / syy, np.nan)
+
+        # Standardized betas: beta_std_j = beta_j * std(X_j) / std(y); 0 when a std is 0
+        x_std = np.sqrt(np.clip(np.diagonal(cxx, axis1=1, axis2=2), 0, None))
+        y_std = np.sqrt(np.clip(syy, 0, None))
+        beta_std = np.where((x_std > 0) & (y_std[:, None] > 0), beta * x_std / y_std[:, None], 0.0)
+
+        # Importance: absolute standardized betas to % share
+        abs_std = np.abs(beta_std)
+        total = abs_std.sum(axis=1, keepdims=True)
+        importance = np.where(total > 0, 100.0 * abs_std / total, 0.0)
+
+    return GroupedOLS(keys, labels, n, intercept, beta, beta_std, r2, importance)
@@ -0,0 +1,101 @@
+# rollup.py
+# Out-of-core roll-up of hourly (and nodal) market data to the daily grain.
+#
+# Hourly-by-node inputs are 24x+ the rows of market_daily, too many for the
+# pandas paths. DuckDB streams the source (CSV or Parquet, globs allowed)
+# through a GROUP BY (region, scenario, day) under a memory_limit, spilling to
+# a temp directory when the aggregate state outgrows it, and writes the daily
+# file that sql/01_setup.sql loads. The monthly views are derived from it in
+# sql/02_views.sql as usual, so every question sees its normal grains.
+#
+# Usage:
+#   python -m power_market.rollup data/market_hourly_fundamentals.csv --memory-limit 2GB
+#   python -m power_market.warehouse --hourly          # roll up, then build
+
+import argparse
+import time
+from pathlib import Path
+
+import duckdb
+
+from power_market.cache import configure
+from power_market.paths import DATA_DIR, HOURLY_CSV
+
+DAILY_CSV = DATA_DIR / "market_daily_fundamentals.csv"
+
+# How each market_daily column rolls up across hours (and nodes): prices,
+# shares and degree-days are time averages, energy quantities are totals.
+HOURLY_AGGS = {
+    "avg_price_usd_mwh":       "avg",
+    "total_demand_mwh":        "sum",
+    "energy_cost_usd_mwh":     "avg",
+    "congestion_cost_usd_mwh": "avg",
+    "losses_cost_usd_mwh":     "avg",
+    "renewable_share_pct":     "avg",
+    "curtailment_mwh":         "sum",
+    "hdd":                     "avg",
+    "cdd":                     "avg",
+    "dart_spread_usd_mwh":     "avg",
+}
+
+
+def reader(src) -> str:
+    """DuckDB relation reading a CSV or Parquet file."""
+    src = Path(src).as_posix()
+    if src.endswith(".parquet"):
+        return f"read_parquet('{src}')"
+    return f"read_csv_auto('{src}', header=TRUE)"
+
+
+def rollup_sql(relation: str, date_col: str = "date", aggs=None) -> str:
+    """Daily roll-up of an hourly/nodal relation (date_col may be a DATE or TIMESTAMP).
+
+    Columns not in aggs (hour, node, ...) are dropped; rows for every hour and
+    node of a (region, scenario, day) collapse into one.
+    """
+    aggs = aggs or HOURLY_AGGS
+    cols = ",\n           ".join(f"{fn}({c}) AS {c}" for c, fn in aggs.items())
+    return f"""
+    SELECT CAST(date_trunc('day', {date_col}) AS DATE) AS date, region, scenario,
+           {cols}
+    FROM {relation}
+    GROUP BY ALL
+    """
+
+
+def rollup_to_daily(src=HOURLY_CSV, out=DAILY_CSV, date_col: str = "date",
+                    memory_limit=None) -> int:
+    """Stream src through the daily roll-up into out (CSV or Parquet); returns daily rows."""
+    src, out = Path(src), Path(out)
+    if "*" not in src.name and not src.exists():
+        raise FileNotFoundError(f"Hourly source not found: {src}")
+
+    out.parent.mkdir(parents=True, exist_ok=True)
+    fmt = "(FORMAT PARQUET)" if out.suffix == ".parquet" else "(HEADER, DELIMITER ',')"
+    tmp = out.with_name(f".{out.name}.tmp")
+    with duckdb.connect() as con:
+        configure(con, memory_limit=memory_limit)
+        # COPY reports the number of rows written
+        rows = con.execute(f"""
+            COPY ({rollup_sql(reader(src), date_col)} ORDER BY region, scenario, date)
+            TO '{tmp.as_posix()}' {fmt}
+        """).fetchone()[0]
+    tmp.replace(out)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Roll hourly/nodal market data up to daily.")
+    parser.add_argument("src", nargs="?", default=str(HOURLY_CSV), help="Hourly CSV/Parquet (globs allowed)")
+    parser.add_argument("--out", default=str(DAILY_CSV))
+    parser.add_argument("--date-col", default="date")
+    parser.add_argument("--memory-limit", help="DuckDB memory_limit, e.g. 2GB (default PM_MEMORY_LIMIT)")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    rows = rollup_to_daily(args.src, args.out, args.date_col, args.memory_limit)
+    print(f"✔ rolled up -> {args.out} ({rows:,} daily rows, {time.perf_counter() - t0:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+# runner.py
+# Run registered questions as a DAG on a thread or process pool.
+#
+# Usage:
+#   python -m power_market.runner                      # every question
+#   python -m power_market.runner --only q07,q14
+#   python -m power_market.runner --mode process --workers 4
+#   python -m power_market.runner --incremental       # only months with new/changed rows
+#                                                     # (Q03/Q08 from the correlation moment store)
+#   python -m power_market.runner --region CAISO --start 2024-01-01   # -> outputs/subsets/<filter>/
+#   python -m power_market.runner --parquet           # typed .parquet beside every answer CSV
+#   python -m power_market.runner --profile           # per-question run report -> outputs/profiles/
+#   python -m power_market.runner --no-memo           # recompute even unchanged answers (see memo.py)
+#   python -m power_market.runner --charts            # then draw the overview charts (charts.py)
+#   python -m power_market.runner --list
+
+import argparse
+import time
+
+import duckdb
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import power_market.questions  # noqa: F401  (registers the questions)
+from power_market.cache import configure, connect, prepare
+from power_market.correlation import refresh as refresh_moments, stored_moments
+from power_market.filters import Filters
+from power_market.incremental import refresh_question
+from power_market.memo import AnswerMemo
+from power_market.output import answer_paths, write_answer
+from power_market.paths import OUTPUTS_DIR
+from power_market.profiling import RunReport, enabled, measure
+from power_market.registry import QUESTIONS, dependencies
+
+SCENARIO_QUESTIONS = ["q06", "q07", "q08", "q09", "q10", "q11", "q11_stock", "q12", "q13", "q14", "q15", "q15_rolling"]
+EDA_QUESTIONS = ["q03", "q03_heatmap"]
+# Run only when asked for (--charts, or --only): drawing costs more than
+# every question together
+ON_REQUEST = ["charts"]
+
+
+def run_question(qid: str, con, out_dir=OUTPUTS_DIR, formats=("csv",)) -> float:
+    """Run one question on con, write its answer and return the elapsed seconds."""
+    q = QUESTIONS[qid]
+    t0 = time.perf_counter()
+    result = q.fn(con, out_dir=out_dir) if q.takes_out_dir else q.fn(con)
+    if result is not None:
+        write_answer(result, q.outputs[0], out_dir, formats)
+    return time.perf_counter() - t0
+
+
+def _outputs(qid: str, out_dir=OUTPUTS_DIR, formats=("csv",)) -> list:
+    paths = []
+    for name in QUESTIONS[qid].outputs:
+        if name.endswith(".csv"):
+            paths += answer_paths(name, out_dir, formats).values()
+        elif name.endswith("/"):
+            # A directory output (chart PNGs): the files in it now
+            paths += sorted(p for p in (out_dir / name).glob("*") if p.is_file() and not p.name.startswith("."))
+        else:
+            paths.append(out_dir / name)
+    return paths
+
+
+def _measured(qid: str, fn, con=None, out_dir=OUTPUTS_DIR, formats=("csv",), profile_dir=None):
+    """fn()'s elapsed seconds, or with profile_dir its measurements (profiling.py)."""
+    if profile_dir is None:
+        t0 = time.perf_counter()
+        fn()
+        return time.perf_counter() - t0
+    return measure(qid, fn, con, _outputs(qid, out_dir, formats), profile_dir)[1]
+
+
+def _run_task(qid: str, con, out_dir=OUTPUTS_DIR, formats=("csv",), profile_dir=None):
+    return _measured(qid, lambda: run_question(qid, con, out_dir, formats), con, out_dir, formats, profile_dir)
+
+
+def _run_in_process(qid: str, filters=None, out_dir=OUTPUTS_DIR, formats=("csv",), profile_dir=None):
+    # Worker processes cannot share a DuckDB connection; open one per task
+    # over the warehouse or the (already warm) Parquet cache.
+    con = connect(names=QUESTIONS[qid].sources, filters=filters)
+    try:
+        return _run_task(qid, con, out_dir, formats, profile_dir)
+    finally:
+        con.close()
+
+
+def _refresh_in_place(qid: str, full_check: bool, formats=("csv",), profile_dir=None):
+    def refresh():
+        status = refresh_question(qid, full_check=full_check, formats=formats)
+        print(f"✔ {qid} incremental: {status}")
+
+    # The refresh opens its own connections: no DuckDB profile, just the totals
+    return _measured(qid, refresh, formats=formats, profile_dir=profile_dir)
+
+
+def _run_from_moments(qid: str, formats=("csv",), profile_dir=None):
+    con = configure(duckdb.connect())
+    try:
+        q = QUESTIONS[qid]
+        return _measured(qid, lambda: write_answer(q.fn(con, moments=stored_moments(con)), q.outputs[0],
+                                                   formats=formats),
+                         con, formats=formats, profile_dir=profile_dir)
+    finally:
+        con.close()
+
+
+def run(selected=None, workers: int = 4, mode: str = "thread", refresh_cache: bool = False,
+        incremental: bool = False, full_check: bool = False, filters=None, parquet: bool = False,
+        profile: bool = False, memo: bool = True) -> dict:
+    """Run the selected questions, starting each as soon as its inputs are ready.
+
+    With incremental=True, questions that declare a Partition only recompute
+    the months touched by new or changed rows (see incremental.py), and the
+    correlation questions are answered from the moment store after rescanning
+    only those months (see correlation.py).
+    With filters (a Filters), every source is restricted to the selected
+    regions/scenarios/dates and answers go to outputs/subsets/<filters.slug>/
+    so the full answers are left untouched.
+    With parquet=True every answer is also written as typed Parquet beside
+    its CSV (the CSVs stay: downstream questions and incremental refresh
+    read them).
+    With profile=True (or PM_PROFILE=1) every question is measured (wall,
+    CPU, peak RSS, rows read/written, DuckDB plan profile) into a JSON run
+    report under outputs/profiles/ (see profiling.py).
+    With memo=True a question whose inputs, code and parameters match an
+    earlier run gets that run's answer back instead of recomputing (see
+    memo.py); incrementally refreshed questions keep their own state.
+    """
+    selected = list(selected or (qid for qid in QUESTIONS if qid not in ON_REQUEST))
+    unknown = [qid for qid in selected if qid not in QUESTIONS]
+    if unknown:
+        raise KeyError(f"Unknown question(s): {unknown}. Known: {sorted(QUESTIONS)}")
+    if filters and incremental:
+        raise ValueError("incremental refresh works on the full answers; drop the filters or --incremental")
+    out_dir = OUTPUTS_DIR / "subsets" / filters.slug if filters else OUTPUTS_DIR
+    formats = ("csv", "parquet") if parquet else ("csv",)
+    report = RunReport("runner") if enabled(profile) else None
+    profile_dir = report.dir if report else None
+
+    memo = AnswerMemo() if memo else None
+    deps = dependencies(selected)
+    sources = sorted({s for qid in selected for s in QUESTIONS[qid].sources})
+
+    # Warm the cache once up front so workers never race to convert the same CSV
+    if report is not None:
+        report.stage("prepare", prepare, sources, refresh=refresh_cache)
+    else:
+        prepare(sources, refresh=refresh_cache)
+
+    if mode == "process":
+        con = None
+        pool = ProcessPoolExecutor(max_workers=workers)
+        submit = lambda qid: pool.submit(_run_in_process, qid, filters, out_dir, formats, profile_dir)
+    elif mode == "thread":
+        con = connect(names=sources, filters=filters)
+        pool = ThreadPoolExecutor(max_workers=workers)
+        # One cursor per task: cursors share the database (and its views) but
+        # are safe to use from separate threads.
+        submit = lambda qid: pool.submit(_run_task, qid, con.cursor(), out_dir, formats, profile_dir)
+    else:
+        raise ValueError(f"mode must be 'thread' or 'process', got {mode!r}")
+
+    if incremental:
+        # Refresh the shared moment store once, before any task reads it
+        if any(QUESTIONS[qid].takes_moments for qid in selected):
+            status = (report.stage("moments", refresh_moments, full_check=full_check) if report is not None
+                      else refresh_moments(full_check=full_check))
+            print("✔ correlation moments:", status)
+        submit_full = submit
+
+        def submit(qid):
+            if QUESTIONS[qid].partition is not None:
+                return pool.submit(_refresh_in_place, qid, full_check, formats, profile_dir)
+            if QUESTIONS[qid].takes_moments:
+                return pool.submit(_run_from_moments, qid, formats, profile_dir)
+            return submit_full(qid)
+
+    def memoized(qid):
+        """Restore qid's answer from the memo; returns its memo key when it must run."""
+        q = QUESTIONS[qid]
+        if memo is None or (incremental and (q.partition is not None or q.takes_moments)):
+            return None
+        key = memo.key(q, out_dir, formats)
+        if key is None:
+            return None
+        restore = lambda: memo.restore(key[0], out_dir)  # noqa: E731
+        hit, record = measure(qid, restore) if report is not None else (restore(), None)
+        if not hit:
+            return key
+        print(f"✔ {qid} unchanged (memo {key[0][:12]})")
+        if record is not None:
+            report.add({**record, "memo": "hit"})
+        timings[qid] = record["seconds"] if record is not None else 0.0
+        done.add(qid)
+        return None
+
+    def finish(qid, result):
+        if report is not None:
+            report.add(result)
+            result = result["seconds"]
+        timings[qid] = result
+        done.add(qid)
+        if keys.get(qid) is not None:
+            memo.save(qid, *keys[qid], _outputs(qid, out_dir, formats), out_dir)
+
+    # Questions that write their own files (charts) run after the pool, see below
+    pooled = [qid for qid in selected if not QUESTIONS[qid].takes_out_dir]
+    post = [qid for qid in selected if QUESTIONS[qid].takes_out_dir]
+
+    timings, keys = {}, {}
+    done, running = set(), {}
+    t0 = time.perf_counter()
+    try:
+        try:
+            while len(done) < len(pooled):
+                for qid in pooled:
+                    if qid not in done and qid not in running.values() and deps[qid] <= done:
+                        keys[qid] = memoized(qid)
+                        if qid not in done:
+                            running[submit(qid)] = qid
+                if len(done) == len(pooled):
+                    break
+                if not running:
+                    raise RuntimeError(f"Dependency cycle among {sorted(set(pooled) - done)}")
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    finish(running.pop(fut), fut.result())
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+            if con is not None:
+                con.close()
+
+        # Post-stage, in this thread once the pool and its DuckDB connection are
+        # gone: these only read finished answers, and may start processes of
+        # their own (charts.py) without forking a process with live threads.
+        for qid in post:
+            keys[qid] = memoized(qid)
+            if qid not in done:
+                finish(qid, _run_task(qid, None, out_dir, formats, profile_dir))
+    finally:
+        if memo is not None:
+            memo.flush()
+
+    wall = time.perf_counter() - t0
+    for qid in selected:
+        print(f"  {qid:<12} {timings[qid]:7.2f}s")
+    print(f"Ran {len(selected)} question(s) in {wall:.2f}s wall "
+          f"({sum(timings.values()):.2f}s summed, {mode} x{workers})")
+    if memo is not None:
+        print(f"Memo: {memo.hits} unchanged, {memo.stored} stored")
+    if report is not None:
+        report.write(questions=selected, mode=mode, workers=workers, incremental=incremental,
+                     filters=filters.slug if filters else None, formats=list(formats))
+    return timings
+
+
+def main(argv=None, default=None):
+    parser = argparse.ArgumentParser(description="Run power market questions.")
+    parser.add_argument("--only", help="Comma-separated question ids, e.g. q07,q14")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--mode", choices=["thread", "process"], default="thread")
+    parser.add_argument("--refresh-cache", action="store_true",
+                        help="Rebuild the Parquet cache even if the CSVs are unchanged")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Recompute only partitions touched by new/changed rows (Q3, Q7-Q10, Q12, Q15)")
+    parser.add_argument("--full-check", action="store_true",
+                        help="With --incremental, digest the whole history to catch restated rows")
+    parser.add_argument("--region", help="Comma-separated regions to restrict every source to")
+    parser.add_argument("--scenario", help="Comma-separated scenarios (Baseline is always kept)")
+    parser.add_argument("--start", help="First date (YYYY-MM-DD), inclusive")
+    parser.add_argument("--end", help="Last date (YYYY-MM-DD), inclusive")
+    parser.add_argument("--parquet", action="store_true", help="Also write each answer as typed Parquet")
+    parser.add_argument("--profile", action="store_true",
+                        help="Measure every question into a JSON run report (outputs/profiles/); also PM_PROFILE=1")
+    parser.add_argument("--no-memo", action="store_true",
+                        help="Recompute every question even when its inputs, code and parameters are unchanged")
+    parser.add_argument("--charts", action="store_true",
+                        help="Also render the overview charts once the answers are written (see charts.py)")
+    parser.add_argument("--list", action="store_true", help="List registered questions and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for qid, q in sorted(QUESTIONS.items()):
+            print(f"{qid:<12} inputs={list(q.inputs)} outputs={list(q.outputs)}")
+        return
+
+    selected = [s.strip().lower() for s in args.only.split(",")] if args.only else default
+    if args.charts:
+        selected = [*(selected or (qid for qid in QUESTIONS if qid not in ON_REQUEST)), *ON_REQUEST]
+        selected = list(dict.fromkeys(selected))
+    filters = Filters(
+        regions=args.region.split(",") if args.region else None,
+        scenarios=args.scenario.split(",") if args.scenario else None,
+        start=args.start, end=args.end,
+    )
+    run(selected, workers=args.workers, mode=args.mode, refresh_cache=args.refresh_cache,
+        incremental=args.incremental, full_check=args.full_check, filters=filters or None,
+        parquet=args.parquet, profile=args.profile, memo=not args.no_memo)
+
+
+if __name__ == "__main__":
+    main()
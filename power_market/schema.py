@@ -0,0 +1,225 @@
+# schema.py
+# Declared column types of the three base tables and the three v_* views.
+#
+# Every loader takes its types from here instead of re-inferring them:
+#   label    region / scenario / tech: ENUM in the warehouse and on the views
+#            over the Parquet cache (built from the loaded values, sorted, so
+#            ORDER BY is unchanged), pandas category
+#   date     DATE / datetime64
+#   int      BIGINT / int64
+#   float32  cost components, shares, fuel prices and MW, published with a few
+#            decimals: float32 in pandas. DuckDB keeps DOUBLE, so SQL answers
+#            do not move in the last digits; a REAL Parquet copy of
+#            v_price_drivers_daily is no smaller (dictionary + snappy)
+#   float64  the price level and DART spread (model target, volatility
+#            inputs) and full-precision measures (demand, curtailment,
+#            degree-days)
+# Columns not declared here pass through with inferred types; answer CSVs
+# (read_answer) take the label and date types of the columns they share a
+# name with.
+#
+# Validation happens where the data is read, with no extra pass over files:
+# DuckDB's typed read_csv fails at bind time on a missing or malformed
+# column, pandas on usecols/dtype; validate() checks a view's columns from
+# its catalog entry (DESCRIBE) for the questions.
+
+import csv
+import hashlib
+import json
+from pathlib import Path
+
+LABEL, DATE, INT, FLOAT32, FLOAT64 = "label", "date", "int", "float32", "float64"
+
+DUCKDB_TYPES = {LABEL: "VARCHAR", DATE: "DATE", INT: "BIGINT", FLOAT32: "DOUBLE", FLOAT64: "DOUBLE"}
+PANDAS_TYPES = {LABEL: "category", INT: "int64", FLOAT32: "float32", FLOAT64: "float64"}
+
+# ENUM type per label column in the warehouse
+ENUM_TYPES = {"region": "region_t", "scenario": "scenario_t", "tech": "tech_t"}
+
+_MARKET = {
+    "date": DATE,
+    "region": LABEL,
+    "scenario": LABEL,
+    "avg_price_usd_mwh": FLOAT64,
+    "total_demand_mwh": FLOAT64,
+    "energy_cost_usd_mwh": FLOAT32,
+    "congestion_cost_usd_mwh": FLOAT32,
+    "losses_cost_usd_mwh": FLOAT32,
+    "renewable_share_pct": FLOAT32,
+    "curtailment_mwh": FLOAT64,
+    "hdd": FLOAT64,
+    "cdd": FLOAT64,
+    "dart_spread_usd_mwh": FLOAT64,
+}
+
+SCHEMAS = {
+    # Base tables (sql/01_setup.sql)
+    "market_daily": _MARKET,
+    "fuel_prices_monthly": {
+        "month": DATE,
+        "region": LABEL,
+        "natgas_usd_mmbtu": FLOAT32,
+        "coal_usd_mmbtu": FLOAT32,
+        "oil_usd_bbl": FLOAT32,
+    },
+    "capacity_plan": {
+        "region": LABEL,
+        "year": INT,
+        "tech": LABEL,
+        "add_capacity_mw": FLOAT32,
+        "retire_capacity_mw": FLOAT32,
+        "capex_usd_per_kw": FLOAT32,
+    },
+    # Views (sql/02_views.sql)
+    "v_price_drivers_daily": {**_MARKET, "natgas_monthly": FLOAT32},
+    "v_lmp_components_monthly": {
+        "region": LABEL,
+        "month": DATE,
+        "price_usd_mwh": FLOAT64,
+        "energy_usd_mwh": FLOAT64,
+        "congestion_usd_mwh": FLOAT64,
+        "losses_usd_mwh": FLOAT64,
+    },
+    "v_renew_share_curtailment": {
+        "region": LABEL,
+        "scenario": LABEL,
+        "month": DATE,
+        "avg_renew_share_pct": FLOAT64,
+        "curtailment_mwh_month": FLOAT64,
+    },
+}
+
+
+def version(name: str) -> str:
+    """Short hash of name's schema (part of every cache fingerprint built from it)."""
+    spec = {"columns": SCHEMAS[name], "duckdb": DUCKDB_TYPES}
+    return hashlib.sha1(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:12]
+
+
+# Kind of the identity columns wherever they appear (answers reuse the names)
+_IDENTITY = {col: kind for cols in SCHEMAS.values() for col, kind in cols.items() if kind in (LABEL, DATE)}
+
+
+def typed_csv(path, types: dict) -> str:
+    """DuckDB read_csv of path with the given {column: DuckDB type} instead of sniffed ones."""
+    types = ", ".join(f"'{col}': '{t}'" for col, t in types.items())
+    return f"read_csv('{Path(path).as_posix()}', header=TRUE, types={{{types}}})"
+
+
+def csv_relation(name: str, path, columns=None) -> str:
+    """Typed DuckDB read of a CSV holding name; a missing or malformed declared column fails the query.
+
+    columns: the declared columns the file must have (default all of them).
+    """
+    schema = SCHEMAS[name]
+    return typed_csv(path, {col: DUCKDB_TYPES[schema[col]] for col in (columns or schema)})
+
+
+def csv_columns(path) -> list:
+    """Header of a CSV file."""
+    with open(path, newline="") as f:
+        return next(csv.reader(f), [])
+
+
+def read_frame(name: str, path, columns=None):
+    """pandas frame of a CSV holding name, with the declared dtypes.
+
+    columns: the declared columns to load, in this order (default all of them).
+    """
+    import pandas as pd
+
+    schema = SCHEMAS[name]
+    columns = list(columns or schema)
+    unknown = [c for c in columns if c not in schema]
+    if unknown:
+        raise ValueError(f"{name} declares no column(s) {unknown}")
+    try:
+        df = pd.read_csv(
+            path, usecols=columns,
+            dtype={c: PANDAS_TYPES[schema[c]] for c in columns if schema[c] != DATE},
+            parse_dates=[c for c in columns if schema[c] == DATE],
+        )
+    except ValueError as e:
+        raise RuntimeError(f"{path} does not match the {name} schema: {e}") from e
+    return df[columns]
+
+
+def read_answer(path, **kwargs):
+    """pandas frame of an answer CSV: label columns as categories, date columns parsed.
+
+    Measures keep the inferred float64 (they are aggregates, not the declared
+    inputs); kwargs go to pd.read_csv.
+    """
+    import pandas as pd
+
+    df = pd.read_csv(path, dtype={c: "category" for c, k in _IDENTITY.items() if k == LABEL}, **kwargs)
+    for col in df.columns.intersection([c for c, k in _IDENTITY.items() if k == DATE]):
+        df[col] = pd.to_datetime(df[col])
+    return df
+
+
+def enum_values(con, relation: str, name: str) -> dict:
+    """Sorted distinct values of every label column of name in relation."""
+    return {col: [r[0] for r in con.execute(
+                f"SELECT DISTINCT {col} FROM {relation} WHERE {col} IS NOT NULL ORDER BY 1").fetchall()]
+            for col, kind in SCHEMAS[name].items() if kind == LABEL}
+
+
+def create_enums(con, values: dict):
+    """ENUM types (ENUM_TYPES) on con from {label column: values}, sorted, replacing old ones."""
+    from power_market.filters import sql_list
+
+    for col, vals in values.items():
+        con.execute(f"DROP TYPE IF EXISTS {ENUM_TYPES[col]}")
+        con.execute(f"CREATE TYPE {ENUM_TYPES[col]} AS ENUM ({sql_list(sorted(vals))})")
+
+
+def enum_select(name: str, relation: str, enums) -> str:
+    """SELECT over relation with name's label columns cast to the ENUM types in enums."""
+    casts = [f"{col}::{ENUM_TYPES[col]} AS {col}" for col, kind in SCHEMAS[name].items()
+             if kind == LABEL and col in enums]
+    return f"SELECT * REPLACE ({', '.join(casts)}) FROM {relation}" if casts else f"SELECT * FROM {relation}"
+
+
+def validate(con, name: str, required=None, relation: str = None) -> set:
+    """Columns of view name on con (or of relation); RuntimeError if required ones are missing.
+
+    required defaults to every declared column of name.
+    """
+    have = {r[0] for r in con.execute(f"DESCRIBE SELECT * FROM {relation or name}").fetchall()}
+    missing = set(required if required is not None else SCHEMAS[name]) - have
+    if missing:
+        declared = f" Declared: {list(SCHEMAS[name])}." if name in SCHEMAS else ""
+        raise RuntimeError(f"Missing columns in {name}: {sorted(missing)}.{declared}")
+    return have
+
+
+def enforce(con):
+    """Validate the registered tables present in con's current database and apply their types.
+
+    Label columns become ENUMs holding the sorted values of every table that
+    has them (created once, then inherited by the tables derived from them);
+    date columns become DATE. Idempotent: run after each warehouse script.
+    """
+    present = {r[0]: {} for r in con.execute(
+        "SELECT table_name FROM duckdb_tables() WHERE database_name = current_database() AND schema_name = 'main'"
+    ).fetchall() if r[0] in SCHEMAS}
+    for table in present:
+        validate(con, table)
+        present[table] = dict(con.execute(f"SELECT column_name, column_type FROM (DESCRIBE {table})").fetchall())
+
+    for col, enum in ENUM_TYPES.items():
+        pending = [t for t, types in present.items()
+                   if SCHEMAS[t].get(col) == LABEL and types[col] == "VARCHAR"]
+        if not pending:
+            continue
+        values = " UNION ".join(f"SELECT {col} AS v FROM {t}" for t in pending)
+        con.execute(f"DROP TYPE IF EXISTS {enum}")
+        con.execute(f"CREATE TYPE {enum} AS ENUM (SELECT DISTINCT v FROM ({values}) WHERE v IS NOT NULL ORDER BY v)")
+        for t in pending:
+            con.execute(f"ALTER TABLE {t} ALTER COLUMN {col} TYPE {enum}")
+
+    for table, types in present.items():
+        for col, kind in SCHEMAS[table].items():
+            if kind == DATE and types[col] != "DATE":
+                con.execute(f"ALTER TABLE {table} ALTER COLUMN {col} TYPE DATE")
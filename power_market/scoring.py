@@ -0,0 +1,172 @@
+# scoring.py
+# Persisted price models and batch scoring of new rows.
+#
+# outputs/models/global/<model>/model.joblib + schema.json   (02_Model_Forecast.py)
+# outputs/models/fleet/<model>/region=/scenario=/...           (fleet.py)
+#
+# Scoring loads every model once, streams the input through DuckDB in
+# fixed-size chunks (never the whole table in memory), predicts each chunk in
+# one vectorized call per model (per shard for the fleet) and appends the
+# predictions to a CSV.
+#
+# Usage:
+#   python -m power_market.scoring --start 2025-06-01            # new days of v_price_drivers_daily
+#   python -m power_market.scoring --input new_days.parquet --fleet --out outputs/scored.csv
+
+import argparse
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+
+import duckdb
+import pandas as pd
+
+from power_market import schema
+from power_market.features import CAT_FEATS, NUM_FEATS, TARGET
+from power_market.paths import MODELS_DIR, OUTPUTS_DIR
+
+GLOBAL_DIR = MODELS_DIR / "global"
+SCORED_CSV = OUTPUTS_DIR / "price_forecast_scored.csv"
+FEATURES = NUM_FEATS + CAT_FEATS
+ID_COLS = ['date', 'region', 'scenario']
+
+
+def save_model(pipe, name: str, metrics=None, **info):
+    """Persist a fitted raw-frame Pipeline with its feature schema."""
+    import joblib
+
+    out = GLOBAL_DIR / name
+    out.mkdir(parents=True, exist_ok=True)
+    joblib.dump(pipe, out / "model.joblib")
+    (out / "schema.json").write_text(json.dumps({
+        "model": name,
+        "target": TARGET,
+        "numeric_features": NUM_FEATS,
+        "categorical_features": CAT_FEATS,
+        "trained_at": datetime.now().isoformat(timespec="seconds"),
+        "metrics": metrics or {},
+        **info,
+    }, indent=2, default=str))
+    return out
+
+
+def load_models(fleet: bool = False, names=None) -> dict:
+    """Global: {model: pipeline}. Fleet: {model: {(region, scenario): pipeline}}."""
+    import joblib
+
+    from power_market.fleet import FLEET_DIR
+
+    models = {}
+    if not fleet:
+        for path in sorted(GLOBAL_DIR.glob("*/model.joblib")):
+            name = path.parent.name
+            spec = json.loads((path.parent / "schema.json").read_text())
+            if spec["numeric_features"] != NUM_FEATS or spec["categorical_features"] != CAT_FEATS:
+                raise RuntimeError(f"{path.parent} was trained on a different feature schema; retrain it.")
+            models[name] = joblib.load(path)
+    else:
+        for path in sorted(FLEET_DIR.glob("*/region=*/scenario=*/model.joblib")):
+            name = path.parents[2].name
+            region = path.parents[1].name.split("=", 1)[1]
+            scenario = path.parent.name.split("=", 1)[1]
+            models.setdefault(name, {})[(region, scenario)] = joblib.load(path)
+    if names:
+        models = {k: v for k, v in models.items() if k in names}
+    if not models:
+        where = "fleet (notebooks/02_Model_Forecast.py --fleet)" if fleet else "global (notebooks/02_Model_Forecast.py)"
+        raise FileNotFoundError(f"No saved {where} models under {MODELS_DIR}.")
+    return models
+
+
+def score_chunk(chunk: pd.DataFrame, models: dict, fleet: bool = False) -> pd.DataFrame:
+    """Predictions for one chunk: id columns, y_true (if present), y_pred_<model>."""
+    out = chunk[ID_COLS].copy()
+    if TARGET in chunk:
+        out["y_true"] = chunk[TARGET].to_numpy()
+    X = chunk[FEATURES]
+    for name, model in models.items():
+        if not fleet:
+            out[f"y_pred_{name}"] = model.predict(X)
+            continue
+        pred = pd.Series(float("nan"), index=chunk.index)
+        for key, idx in X.groupby(['region', 'scenario']).indices.items():
+            shard = model.get(key)
+            if shard is not None:
+                pred.iloc[idx] = shard.predict(X.iloc[idx])
+        out[f"y_pred_{name}"] = pred.to_numpy()
+    return out
+
+
+def _input_relation(src):
+    src = str(src)
+    if src.endswith(".parquet") or "*" in src:
+        return f"read_parquet('{src}')"
+    # Typed as v_price_drivers_daily; new rows may come without the target
+    declared = [c for c in schema.csv_columns(src) if c in schema.SCHEMAS["v_price_drivers_daily"]]
+    return schema.csv_relation("v_price_drivers_daily", src, columns=declared)
+
+
+def score(src=None, out=SCORED_CSV, fleet: bool = False, names=None, filters=None,
+          batch_rows: int = 100_000) -> int:
+    """Score src (a CSV/Parquet path, or v_price_drivers_daily when None) into out.
+
+    Rows are read in chunks of about batch_rows; returns the number scored.
+    """
+    from power_market.cache import configure, connect
+
+    models = load_models(fleet=fleet, names=names)
+    con = connect(names=["v_price_drivers_daily"], filters=filters) if src is None else configure(duckdb.connect())
+    try:
+        rel = "v_price_drivers_daily" if src is None else _input_relation(src)
+        cols = {r[0] for r in con.execute(f"DESCRIBE SELECT * FROM {rel}").fetchall()}
+        missing = set(ID_COLS + FEATURES) - cols
+        if missing:
+            raise RuntimeError(f"Scoring input is missing columns: {missing}")
+        select = ", ".join(ID_COLS + NUM_FEATS + ([TARGET] if TARGET in cols else []))
+        where = filters.where("v_price_drivers_daily", cols) if (filters and src is not None) else ""
+        # No ORDER BY: rows stream out in scan order instead of waiting on a sort
+        result = con.execute(f"SELECT {select} FROM {rel} {where}")
+
+        out.parent.mkdir(parents=True, exist_ok=True)
+        tmp = out.with_name(f".{out.name}.tmp")
+        vectors = max(1, batch_rows // 2048)  # DuckDB chunks are 2048 rows
+        n = 0
+        while True:
+            chunk = result.fetch_df_chunk(vectors)
+            if chunk.empty:
+                break
+            scored = score_chunk(chunk.dropna(subset=FEATURES), models, fleet)
+            scored.to_csv(tmp, mode="a" if n else "w", header=not n, index=False)
+            n += len(scored)
+    finally:
+        con.close()
+    if n:
+        tmp.replace(out)
+    return n
+
+
+def main(argv=None):
+    from power_market.filters import Filters
+
+    parser = argparse.ArgumentParser(description="Score rows with the saved price models.")
+    parser.add_argument("--input", help="CSV/Parquet of rows to score (default: v_price_drivers_daily)")
+    parser.add_argument("--out", default=str(SCORED_CSV))
+    parser.add_argument("--fleet", action="store_true", help="Use the per-(region, scenario) fleet models")
+    parser.add_argument("--models", help="Comma-separated model names (default: all saved)")
+    parser.add_argument("--region", help="Comma-separated regions")
+    parser.add_argument("--start", help="First date to score (YYYY-MM-DD)")
+    parser.add_argument("--end", help="Last date to score (YYYY-MM-DD)")
+    parser.add_argument("--batch-rows", type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    filters = Filters(regions=args.region.split(",") if args.region else None, start=args.start, end=args.end)
+    t0 = time.perf_counter()
+    n = score(args.input, Path(args.out), fleet=args.fleet,
+              names=args.models.split(",") if args.models else None,
+              filters=filters or None, batch_rows=args.batch_rows)
+    print(f"✔ scored {n:,} rows -> {args.out} ({time.perf_counter() - t0:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+# service.py
+# Resident query service on localhost: one warm DuckDB connection, an LRU
+# cache of answers, parameterized questions over HTTP.
+#
+#   GET /questions                                  registered questions (JSON)
+#   GET /q/<qid>?region=CAISO,ERCOT&scenario=Carbon_Tax&start=2024-01-01&end=2024-12-31&format=csv|json
+#   GET /health                                     cache stats and source fingerprints
+#
+# The connection (warehouse attached read-only, or the lake / Parquet cache)
+# and every source view are set up once. A request runs on a cursor of it
+# whose source views are narrowed to the request's filters (cache.scoped), so
+# the question's SQL runs unchanged (as with runner --region ...). Only the
+# regions and scenarios present in the sources are accepted as filters (400
+# otherwise). Answers are cached by (question, filters, format,
+# input fingerprints): a rebuilt warehouse, lake or CSV changes the
+# fingerprint, the connection is reopened (the old one is closed once its
+# last request finishes) and stale entries are never hit again (they age
+# out of the LRU).
+#
+# Usage:
+#   python -m power_market.service                          # http://127.0.0.1:8765
+#   python -m power_market.service --port 9000 --cache-mb 512
+#   curl 'http://127.0.0.1:8765/q/q07?region=CAISO&start=2025-01-01'
+
+import argparse
+import json
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import power_market.questions  # noqa: F401  (registers the questions)
+from power_market.cache import connect, fingerprint, scoped
+from power_market.filters import Filters
+from power_market.lake import MANIFEST
+from power_market.output import to_frame
+from power_market.paths import SOURCE_CSVS, WAREHOUSE
+from power_market.registry import QUESTIONS
+
+FORMATS = {"csv": "text/csv; charset=utf-8", "json": "application/json"}
+
+
+def input_fingerprints(names) -> tuple:
+    """Fingerprints of everything the named sources can be served from."""
+    paths = [WAREHOUSE, MANIFEST, *(SOURCE_CSVS[n] for n in names)]
+    return tuple(json.dumps(fingerprint(p), sort_keys=True) if p.exists() else None for p in paths)
+
+
+class LRUCache:
+    """Thread-safe LRU of encoded answers, bounded by total bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            body = self._items.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key, body: bytes):
+        with self._lock:
+            if key in self._items or len(body) > self.max_bytes:
+                return
+            self._items[key] = body
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, old = self._items.popitem(last=False)
+                self.size -= len(old)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._items), "bytes": self.size, "max_bytes": self.max_bytes,
+                    "hits": self.hits, "misses": self.misses}
+
+
+def source_labels(con, names) -> dict:
+    """{"region": set, "scenario": set} of the labels present in the named sources."""
+    labels = {"region": set(), "scenario": set()}
+    for name in names:
+        cols = {r[0] for r in con.execute(f"DESCRIBE {name}").fetchall()}
+        for col in labels.keys() & cols:
+            labels[col].update(str(v) for (v,) in con.execute(f"SELECT DISTINCT {col} FROM {name}").fetchall())
+    return labels
+
+
+class QueryService:
+    """The warm connection, its source views and the answer cache."""
+
+    def __init__(self, cache_mb: int = 256):
+        self.sources = sorted(SOURCE_CSVS)
+        self.cache = LRUCache(cache_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        self._con = None
+        self._fingerprints = None
+        self._labels = None
+        self._users = {}  # id(connection) -> [connection, requests using it]
+
+    def _acquire(self):
+        """(connection, fingerprints, labels), reopening when any input fingerprint changed.
+
+        Pair every call with _release(connection).
+        """
+        current = input_fingerprints(self.sources)
+        with self._lock:
+            if self._con is None or current != self._fingerprints:
+                old = self._con
+                available = [n for n in self.sources if SOURCE_CSVS[n].exists() or WAREHOUSE.exists()]
+                con = connect(names=available)
+                self._con, self._fingerprints, self._labels = con, current, source_labels(con, available)
+                self._users[id(con)] = [con, 0]
+                if old is not None and self._users[id(old)][1] == 0:
+                    # Requests still on the old connection close it in _release
+                    del self._users[id(old)]
+                    old.close()
+            self._users[id(self._con)][1] += 1
+            return self._con, self._fingerprints, self._labels
+
+    def _release(self, con):
+        with self._lock:
+            entry = self._users[id(con)]
+            entry[1] -= 1
+            if entry[1] == 0 and con is not self._con:
+                del self._users[id(con)]
+                con.close()
+
+    def labels(self) -> dict:
+        """Regions and scenarios the current sources hold."""
+        con, _, labels = self._acquire()
+        self._release(con)
+        return labels
+
+    def answer(self, qid: str, filters=None, fmt: str = "csv"):
+        """(body bytes, cache hit?) for one question."""
+        q = QUESTIONS.get(qid)
+        if q is None or q.takes_out_dir:
+            raise KeyError(qid)
+        if fmt not in FORMATS:
+            raise ValueError(f"format must be one of {sorted(FORMATS)}, got {fmt!r}")
+        con, fps, _ = self._acquire()
+        try:
+            key = (qid, filters.slug if filters else "", fmt, fps)
+            body = self.cache.get(key)
+            if body is not None:
+                return body, True
+
+            cur = scoped(con, filters, q.sources)
+            try:
+                df = to_frame(q.fn(cur))
+            finally:
+                cur.close()
+        finally:
+            self._release(con)
+        if fmt == "csv":
+            body = df.to_csv(index=False).encode()
+        else:
+            body = df.to_json(orient="records", date_format="iso").encode()
+        self.cache.put(key, body)
+        return body, False
+
+    def health(self) -> dict:
+        return {"cache": self.cache.stats(), "fingerprints": self._fingerprints,
+                "questions": len(QUESTIONS)}
+
+
+def _filters(params: dict, labels: dict):
+    """Filters from the query string; ValueError for a region or scenario the sources do not hold."""
+    one = lambda k: params[k][0] if k in params else None  # noqa: E731
+    split = lambda k: one(k).split(",") if one(k) else None  # noqa: E731
+    regions, scenarios = split("region"), split("scenario")
+    for col, values in (("region", regions), ("scenario", scenarios)):
+        unknown = sorted(set(values or ()) - labels[col])
+        if unknown:
+            raise ValueError(f"Unknown {col}(s) {unknown}; known: {sorted(labels[col])}")
+    f = Filters(regions=regions, scenarios=scenarios, start=one("start"), end=one("end"))
+    return f or None
+
+
+def make_handler(service: QueryService):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, body: bytes, ctype: str = "application/json", **headers):
+            self.send_response(status)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            for k, v in headers.items():
+                self.send_header(k.replace("_", "-"), v)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _error(self, status: int, message: str):
+            self._send(status, json.dumps({"error": message}).encode())
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            parts = [p for p in url.path.split("/") if p]
+            t0 = time.perf_counter()
+            try:
+                if parts == ["health"]:
+                    return self._send(200, json.dumps(service.health()).encode())
+                if parts == ["questions"]:
+                    listing = {qid: {"inputs": list(q.inputs), "outputs": list(q.outputs)}
+                               for qid, q in sorted(QUESTIONS.items()) if not q.takes_out_dir}
+                    return self._send(200, json.dumps(listing).encode())
+                if len(parts) == 2 and parts[0] == "q":
+                    qid = parts[1].lower()
+                    q = QUESTIONS.get(qid)
+                    if q is None or q.takes_out_dir:
+                        return self._error(404, f"Unknown question {qid!r}")
+                    params = parse_qs(url.query)
+                    fmt = params.get("format", ["csv"])[0]
+                    body, hit = service.answer(qid, _filters(params, service.labels()), fmt)
+                    return self._send(200, body, FORMATS[fmt], X_Cache="hit" if hit else "miss",
+                                      X_Elapsed_ms=f"{(time.perf_counter() - t0) * 1000:.1f}")
+                return self._error(404, f"Unknown path {url.path}")
+            except ValueError as e:
+                return self._error(400, str(e))
+            except Exception as e:  # noqa: BLE001  (report, keep serving)
+                return self._error(500, f"{type(e).__name__}: {e}")
+
+        def log_message(self, fmt, *args):
+            if not self.server.quiet:
+                super().log_message(fmt, *args)
+
+    return Handler
+
+
+def serve(host: str = "127.0.0.1", port: int = 8765, cache_mb: int = 256, quiet: bool = False):
+    service = QueryService(cache_mb)
+    service.labels()  # warm up before the first request
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.quiet = quiet
+    print(f"✔ serving {len(QUESTIONS)} questions on http://{host}:{port} (cache {cache_mb} MB)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resident localhost query service with a warm connection.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--cache-mb", type=int, default=256, help="Answer cache size")
+    parser.add_argument("--quiet", action="store_true", help="No per-request log lines")
+    args = parser.parse_args(argv)
+    serve(args.host, args.port, args.cache_mb, args.quiet)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+# stress.py
+# Configurable stress-screen engine (generalizes Q13's summer peak screen).
+#
+# Every component is aggregated to (region[, scenario], month), joined, and
+# scored in a single DuckDB query: per-(scenario, season, region) z-scores via
+# window functions, a weighted composite, dense ranks and a threshold flag.
+# No per-group Python apply, so screening every scenario and season costs one
+# scan of each source.
+
+from power_market import schema
+from power_market.filters import sql_list, sql_literal
+
+SEASONS = {
+    "summer": (6, 7, 8, 9),
+    "winter": (12, 1, 2),
+    "shoulder": (3, 4, 5, 10, 11),
+    "annual": tuple(range(1, 13)),
+}
+
+
+class Component:
+    """A monthly stress component.
+
+    The monthly value is agg(value) over `source`, bucketed by its date_col,
+    and reported as `column`. Scenario-specific components are screened per
+    scenario; the others (weather, region-level LMP components) are shared by
+    every scenario.
+    """
+
+    def __init__(self, source: str, date_col: str, value: str, column: str,
+                 by_scenario: bool, agg: str = "avg"):
+        self.source = source
+        self.date_col = date_col
+        self.value = value
+        self.column = column
+        self.by_scenario = by_scenario
+        self.agg = agg
+
+
+COMPONENTS = {
+    "cdd":         Component("v_price_drivers_daily", "date", "cdd", "cdd_monthly", by_scenario=False),
+    "hdd":         Component("v_price_drivers_daily", "date", "hdd", "hdd_monthly", by_scenario=False),
+    "congestion":  Component("v_lmp_components_monthly", "month", "congestion_usd_mwh",
+                             "congestion_usd_mwh", by_scenario=False),
+    "curtailment": Component("v_renew_share_curtailment", "month", "curtailment_mwh_month",
+                             "curtailment_mwh_month", by_scenario=True),
+    "price":       Component("v_price_drivers_daily", "date", "avg_price_usd_mwh",
+                             "price_usd_mwh", by_scenario=True),
+    "demand":      Component("v_price_drivers_daily", "date", "total_demand_mwh",
+                             "demand_mwh", by_scenario=True),
+}
+
+
+def stress_screen(con, components=("cdd", "congestion", "curtailment"), weights=None,
+                  seasons="summer", scenarios=("Baseline",), threshold: float = 1.5):
+    """Screen (scenario, season, region, month) rows by composite stress.
+
+    components: names in COMPONENTS (or Component objects keyed by name in a dict).
+    weights: {component: weight} over the screened components, default 1.0 each.
+    seasons: a SEASONS name, a tuple of month numbers, or a {name: months} dict.
+    scenarios: scenario labels to screen, or None for every scenario present.
+    """
+    comps = dict(components) if isinstance(components, dict) else {c: COMPONENTS[c] for c in components}
+    unknown = set(weights or {}) - set(comps)
+    if unknown:
+        raise ValueError(f"Weights for unknown component(s) {sorted(unknown)}; screened: {list(comps)}")
+    weights = {name: 1.0 for name in comps} | dict(weights or {})
+    if isinstance(seasons, str):
+        seasons = {seasons: SEASONS[seasons]}
+    elif not isinstance(seasons, dict):
+        seasons = {"custom": tuple(seasons)}
+
+    _check_columns(con, comps)
+
+    all_months = sorted({m for months in seasons.values() for m in months})
+    season_rows = ", ".join(f"({sql_literal(name)}, {int(m)})" for name, months in seasons.items() for m in months)
+
+    # Scenarios to screen: explicit list, or every scenario in the scenario-specific sources
+    if scenarios is not None:
+        scen_sql = f"SELECT unnest([{sql_list(scenarios)}]) AS scenario"
+    else:
+        scen_sources = sorted({c.source for c in comps.values() if c.by_scenario}) or ["v_price_drivers_daily"]
+        scen_sql = " UNION ".join(f"SELECT DISTINCT scenario FROM {s}" for s in scen_sources)
+
+    ctes = [f"scen AS ({scen_sql})",
+            f"season_months(season, month_num) AS (VALUES {season_rows})"]
+    for name, c in comps.items():
+        scen_col = "scenario, " if c.by_scenario else ""
+        scen_filter = "AND scenario IN (SELECT scenario FROM scen)" if c.by_scenario else ""
+        ctes.append(f"""
+        c_{name} AS (
+            SELECT region, {scen_col}date_trunc('month', {c.date_col})::DATE AS month,
+                   {c.agg}({c.value}) AS {c.column}
+            FROM {c.source}
+            WHERE month({c.date_col}) IN ({sql_list(all_months)}) {scen_filter}
+            GROUP BY ALL
+        )""")
+
+    # Join: shared components by (region, month), scenario ones also by scenario
+    names = list(comps)
+    first = names[0]
+    joins = []
+    for name in names[1:]:
+        on = "region, month" + (", scenario" if comps[name].by_scenario else "")
+        joins.append(f"JOIN c_{name} USING ({on})")
+    if not comps[first].by_scenario:
+        # Fan the first (shared) component out to every screened scenario
+        base = f"c_{first} CROSS JOIN scen"
+    else:
+        base = f"c_{first}"
+
+    value_cols = ", ".join(f"{comps[n].column}" for n in names)
+    window = "PARTITION BY scenario, season, region"
+    z_cols = ",\n               ".join(
+        f"coalesce(({comps[n].column} - avg({comps[n].column}) OVER w)"
+        f" / nullif(stddev_pop({comps[n].column}) OVER w, 0), 0) AS z_{n}"
+        for n in names
+    )
+    score = " + ".join(f"{float(weights[n])!r} * z_{n}" for n in names)
+
+    sql = f"""
+    WITH {", ".join(ctes)},
+    joined AS (
+        SELECT scenario, s.season, region, month, {value_cols}
+        FROM {base}
+        {" ".join(joins)}
+        JOIN season_months s ON month(month) = s.month_num
+    ),
+    scored AS (
+        SELECT *,
+               {z_cols}
+        FROM joined
+        WINDOW w AS ({window})
+    ),
+    composite AS (
+        SELECT *, {score} AS stress_score FROM scored
+    )
+    SELECT *,
+           dense_rank() OVER ({window} ORDER BY stress_score DESC) AS rank_in_region,
+           stress_score >= {float(threshold)!r} AS stress_flag
+    FROM composite
+    ORDER BY scenario, season, region, stress_score DESC, month
+    """
+    df = con.execute(sql).df()
+    if df.empty:
+        raise RuntimeError(
+            f"Stress screen is empty after joining {names}. "
+            "Check that region/month values align across the sources."
+        )
+    return df
+
+
+def _check_columns(con, comps):
+    need = {}
+    for c in comps.values():
+        cols = need.setdefault(c.source, {"region", c.date_col})
+        cols.add(c.value)
+        if c.by_scenario:
+            cols.add("scenario")
+    for source, cols in need.items():
+        schema.validate(con, source, cols)
@@ -0,0 +1,214 @@
+# synth.py
+# Synthetic market data at configurable scale, with the same schema as data/.
+#
+# Writes <root>/data/market_daily_fundamentals.csv (market_hourly_fundamentals.csv
+# with --hourly), fuel_prices_monthly.csv and capacity_expansion_plan.csv. Point
+# PM_HOME at <root> and build the warehouse (with --hourly for hourly data) to
+# run the whole pipeline against it.
+#
+# Usage:
+#   python -m power_market.synth /tmp/pm_big --regions 20 --scenarios 10 --years 5
+#   python -m power_market.synth /tmp/pm_hourly --hourly
+
+import argparse
+import shutil
+import zlib
+from pathlib import Path
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+DEFAULT_REGIONS = ["CAISO", "ERCOT", "NYISO", "PJM", "SPP"]
+DEFAULT_SCENARIOS = ["Baseline", "Carbon_Tax", "Demand_Growth", "Renewable_Push", "Storage_Focus"]
+TECHS = ["solar", "wind", "battery", "gas_cc"]
+
+# Scenario effects: price shift ($/MWh), demand multiplier, renewable share
+# shift (pts), curtailment multiplier, DART volatility multiplier
+SCENARIO_EFFECTS = {
+    "Baseline":       (0.0, 1.00, 0.0, 1.00, 1.00),
+    "Carbon_Tax":     (-0.4, 0.98, 2.0, 1.10, 1.00),
+    "Demand_Growth":  (0.9, 1.04, 1.0, 1.05, 1.05),
+    "Renewable_Push": (-0.1, 0.99, 4.0, 1.25, 1.10),
+    "Storage_Focus":  (0.0, 1.00, 1.5, 0.90, 0.80),
+}
+
+
+def region_names(n: int):
+    return DEFAULT_REGIONS[:n] + [f"REGION_{i:03d}" for i in range(len(DEFAULT_REGIONS) + 1, n + 1)]
+
+
+def scenario_names(n: int):
+    return DEFAULT_SCENARIOS[:n] + [f"Scenario_{i:03d}" for i in range(len(DEFAULT_SCENARIOS) + 1, n + 1)]
+
+
+def fuel_prices(regions, months: pd.DatetimeIndex, rng) -> pd.DataFrame:
+    """Monthly natgas/coal/oil per region as mean-reverting random walks."""
+    n_r, n_m = len(regions), len(months)
+
+    def walk(level, vol, revert=0.2):
+        x = np.empty((n_r, n_m))
+        x[:, 0] = level * (1 + rng.normal(0, vol, n_r))
+        shocks = rng.normal(0, vol, (n_r, n_m))
+        for t in range(1, n_m):
+            x[:, t] = x[:, t - 1] + revert * (level - x[:, t - 1]) + level * shocks[:, t]
+        return x
+
+    return pd.DataFrame({
+        "month": np.tile(months.values, n_r).astype("datetime64[D]"),
+        "region": np.repeat(regions, n_m),
+        "natgas_usd_mmbtu": walk(2.8, 0.05).ravel().round(3),
+        "coal_usd_mmbtu": walk(1.7, 0.02).ravel().round(3),
+        "oil_usd_bbl": walk(70.0, 0.03).ravel().round(2),
+    })
+
+
+def capacity_plan(regions, years, rng) -> pd.DataFrame:
+    n = len(regions) * len(years) * len(TECHS)
+    capex_base = np.tile([900, 1300, 700, 1100], n // len(TECHS))
+    return pd.DataFrame({
+        "region": np.repeat(regions, len(years) * len(TECHS)),
+        "year": np.tile(np.repeat(years, len(TECHS)), len(regions)),
+        "tech": np.tile(TECHS, len(regions) * len(years)),
+        "add_capacity_mw": rng.uniform(10, 195, n).round(1),
+        "retire_capacity_mw": rng.exponential(10, n).round(1),
+        "capex_usd_per_kw": (capex_base * rng.uniform(0.75, 1.25, n)).round(0).astype(int),
+    })
+
+
+def market_block(dates: pd.DatetimeIndex, region_idx: int, scenario: str, natgas_by_day, rng,
+                 hourly: bool = False) -> pd.DataFrame:
+    """Daily (or hourly) market fundamentals for one (region, scenario)."""
+    if scenario in SCENARIO_EFFECTS:
+        price_shift, demand_mult, renew_shift, curtail_mult, dart_scale = SCENARIO_EFFECTS[scenario]
+    else:
+        srng = np.random.default_rng(zlib.crc32(scenario.encode()))
+        price_shift, demand_mult, renew_shift, curtail_mult, dart_scale = (
+            srng.normal(0, 0.5), srng.uniform(0.97, 1.05), srng.normal(1, 1.5),
+            srng.uniform(0.9, 1.3), srng.uniform(0.8, 1.1),
+        )
+
+    n = len(dates)
+    phase = 2 * np.pi * dates.dayofyear.values / 365.25
+    base_demand = 85_000 + 10_000 * (region_idx % 5)
+    base_share = 36 + 2 * (region_idx % 4)
+
+    hdd = np.clip(9 * np.cos(phase) + 4 + rng.normal(0, 3, n), 0, None)
+    cdd = np.clip(-7 * np.cos(phase) - 2 + rng.normal(0, 2.5, n), 0, None)
+    demand = base_demand * demand_mult * (1 + 0.012 * hdd + 0.015 * cdd + rng.normal(0, 0.05, n))
+    share = np.clip(base_share + renew_shift + 5 * np.sin(phase) + rng.normal(0, 2, n), 5, 95)
+    curtail = demand * share / 100 * 0.17 * curtail_mult * rng.lognormal(0, 0.35, n)
+    energy = 14 + 2.3 * natgas_by_day + 0.11 * demand / 1000 + price_shift + rng.normal(0, 1.5, n)
+    congestion = np.clip(2 + 0.05 * cdd + rng.normal(0, 0.6, n), 0, None)
+    losses = np.clip(1.2 + rng.normal(0, 0.3, n), 0, None)
+    dart = rng.normal(0.5, 1.0 * dart_scale, n)
+
+    cols = {
+        "date": dates.values.astype("datetime64[D]"),
+        "avg_price_usd_mwh": energy + congestion + losses,
+        "total_demand_mwh": demand,
+        "energy_cost_usd_mwh": energy,
+        "congestion_cost_usd_mwh": congestion,
+        "losses_cost_usd_mwh": losses,
+        "renewable_share_pct": share,
+        "curtailment_mwh": curtail,
+        "hdd": hdd,
+        "cdd": cdd,
+        "dart_spread_usd_mwh": dart,
+    }
+
+    if hourly:
+        # Each day becomes 24 rows: intraday load/price shape, per-hour noise;
+        # MWh quantities are split across hours, degree-days stay daily values
+        hours = np.arange(24)
+        shape = 1 + 0.25 * np.sin(2 * np.pi * (hours - 10) / 24)
+        shape = shape / shape.mean()
+        noise = rng.normal(1, 0.03, (n, 24))
+        out = {"date": np.repeat(cols["date"], 24), "hour": np.tile(hours, n)}
+        for c, v in cols.items():
+            if c == "date":
+                continue
+            if c in ("total_demand_mwh", "curtailment_mwh"):
+                out[c] = (v[:, None] / 24 * shape * noise).ravel()
+            elif c in ("hdd", "cdd", "renewable_share_pct"):
+                out[c] = np.repeat(v, 24)
+            else:
+                out[c] = (v[:, None] * shape * noise).ravel()
+        cols = out
+
+    df = pd.DataFrame(cols)
+    for c in ("avg_price_usd_mwh", "energy_cost_usd_mwh", "congestion_cost_usd_mwh",
+              "losses_cost_usd_mwh", "dart_spread_usd_mwh"):
+        df[c] = df[c].round(2)
+    df["renewable_share_pct"] = df["renewable_share_pct"].round(1)
+    return df
+
+
+def generate(root, regions: int = 5, scenarios: int = 5, years: int = 3, start_year: int = 2023,
+             hourly: bool = False, seed: int = 42) -> dict:
+    """Write the three input CSVs under root/data; returns row counts."""
+    root = Path(root)
+    data_dir = root / "data"
+    parts_dir = data_dir / ".parts"
+    data_dir.mkdir(parents=True, exist_ok=True)
+    parts_dir.mkdir(exist_ok=True)
+
+    rng = np.random.default_rng(seed)
+    region_list = region_names(regions)
+    scenario_list = scenario_names(scenarios)
+    year_list = list(range(start_year, start_year + years))
+    dates = pd.date_range(f"{start_year}-01-01", f"{year_list[-1]}-12-31", freq="D")
+    months = pd.date_range(f"{start_year}-01-01", f"{year_list[-1]}-12-01", freq="MS")
+
+    fuel = fuel_prices(region_list, months, rng)
+    plan = capacity_plan(region_list, year_list, rng)
+    fuel.to_csv(data_dir / "fuel_prices_monthly.csv", index=False)
+    plan.to_csv(data_dir / "capacity_expansion_plan.csv", index=False)
+
+    # Market data one (region, scenario) block at a time, spilled to Parquet
+    # parts so memory stays bounded, then streamed into a single CSV by DuckDB
+    month_idx = (dates.year - start_year) * 12 + dates.month - 1
+    natgas = fuel["natgas_usd_mmbtu"].to_numpy().reshape(len(region_list), len(months))
+    con = duckdb.connect()
+    rows = 0
+    for ri, region in enumerate(region_list):
+        for scenario in scenario_list:
+            block = market_block(dates, ri, scenario, natgas[ri, month_idx], rng, hourly=hourly)
+            block.insert(1, "region", region)
+            block.insert(2, "scenario", scenario)
+            con.register("block", block)
+            con.execute(f"COPY block TO '{(parts_dir / f'{ri:04d}_{scenario}.parquet').as_posix()}' (FORMAT PARQUET)")
+            con.unregister("block")
+            rows += len(block)
+
+    out_csv = data_dir / ("market_hourly_fundamentals.csv" if hourly else "market_daily_fundamentals.csv")
+    con.execute(f"""
+        COPY (SELECT * REPLACE (CAST(date AS DATE) AS date)
+              FROM read_parquet('{parts_dir.as_posix()}/*.parquet'))
+        TO '{out_csv.as_posix()}' (HEADER, DELIMITER ',')
+    """)
+    con.close()
+    shutil.rmtree(parts_dir)
+
+    return {"market_hourly" if hourly else "market_daily": rows, "fuel_prices_monthly": len(fuel), "capacity_plan": len(plan)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic power market inputs.")
+    parser.add_argument("root", help="Output project root (data/ is created inside)")
+    parser.add_argument("--regions", type=int, default=5)
+    parser.add_argument("--scenarios", type=int, default=5)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--start-year", type=int, default=2023)
+    parser.add_argument("--hourly", action="store_true", help="24 rows per day (adds an hour column)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    counts = generate(args.root, args.regions, args.scenarios, args.years, args.start_year,
+                      args.hourly, args.seed)
+    for name, n in counts.items():
+        print(f"✔ {name}: {n:,} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+# volatility.py
+# Trailing rolling and EWMA volatility of price and DART spread per (region, scenario).
+#
+# Extends Q15 (calendar-month stddev by region, scenarios pooled) with
+# trailing 7/30/90-day sample std and a RiskMetrics-style EWMA std
+# (lambda = 0.94 per day), each (region, scenario) series on its own.
+#
+# The trailing windows are DuckDB window aggregates over RANGE frames
+# (ts - N days, ts], computed for every series in the query that sorts them;
+# the EWMA is a single recursive pass in pandas. DuckDB streams the rows sorted
+# by (region, scenario, time) in chunks and each series' EWMA is taken as soon
+# as the series is complete, so memory holds one series, not the table. Hourly input
+# (data/market_hourly_fundamentals.csv, nodes averaged per hour) uses the
+# same day-length windows over hourly observations and reports the
+# end-of-day values, i.e. one daily surface per (region, scenario).
+#
+# Usage:
+#   python -m power_market.volatility                       # daily view -> answers/q15_price_and_dart_volatility_rolling.csv
+#   python -m power_market.volatility --hourly              # from the hourly file
+#   python -m power_market.volatility --hourly --intraday   # every hour, not just end of day
+
+import argparse
+import time
+from pathlib import Path
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+from power_market.paths import ANSWERS_DIR, HOURLY_CSV
+
+WINDOWS = (7, 30, 90)   # trailing days
+LAMBDA = 0.94           # EWMA decay per day
+SERIES = {"price": "avg_price_usd_mwh", "dart": "dart_spread_usd_mwh"}
+VOL_CSV = ANSWERS_DIR / "q15_price_and_dart_volatility_rolling.csv"
+
+
+def _daily_sql(relation: str) -> str:
+    cols = ", ".join(SERIES.values())
+    return f"""
+        SELECT region, scenario, CAST(date AS TIMESTAMP) AS ts, {cols}
+        FROM {relation}
+        WHERE date IS NOT NULL
+    """
+
+
+def _hourly_sql(relation: str, columns) -> str:
+    # Hourly files carry (date, hour); nodal ones repeat each hour per node
+    ts = "CAST(date AS TIMESTAMP) + to_hours(CAST(hour AS INTEGER))" if "hour" in columns else "CAST(date AS TIMESTAMP)"
+    cols = ", ".join(f"avg({c}) AS {c}" for c in SERIES.values())
+    return f"""
+        SELECT region, scenario, {ts} AS ts, {cols}
+        FROM {relation}
+        WHERE date IS NOT NULL
+        GROUP BY ALL
+    """
+
+
+def _window_sql(series_sql: str, steps_per_day: int = 1, windows=WINDOWS) -> str:
+    """series_sql's rows sorted by (region, scenario, ts) with the trailing-window stds.
+
+    A frame holds the observations in (ts - N days, ts], like pandas'
+    time-based rolling; a window is reported once the series spans all of it
+    and holds two observations.
+    """
+    day_us = 86_400_000_000
+    step_us = day_us // steps_per_day
+    vols = []
+    for name, col in SERIES.items():
+        for days in windows:
+            frame = f"s ORDER BY ts RANGE BETWEEN to_microseconds({days * day_us - 1}) PRECEDING AND CURRENT ROW"
+            vols.append(f"CASE WHEN ts - min(ts) OVER s >= to_microseconds({days * day_us - step_us}) "
+                        f"THEN stddev_samp({col}) OVER ({frame}) END AS {name}_vol_{days}d")
+    return f"""
+        SELECT region, scenario, ts, {", ".join(SERIES.values())},
+               {", ".join(vols)}
+        FROM ({series_sql})
+        WINDOW s AS (PARTITION BY region, scenario)
+        ORDER BY region, scenario, ts
+    """
+
+
+def _series(result, vectors: int = 64):
+    """Yield ((region, scenario), frame) from a result sorted by region, scenario."""
+    pending = []
+    while True:
+        chunk = result.fetch_df_chunk(vectors)
+        if chunk.empty:
+            break
+        keys = chunk["region"].astype(str) + "\x00" + chunk["scenario"].astype(str)
+        starts = np.flatnonzero(keys.ne(keys.shift()).to_numpy())
+        for i, lo in enumerate(starts):
+            hi = starts[i + 1] if i + 1 < len(starts) else len(chunk)
+            part = chunk.iloc[lo:hi]
+            key = (part["region"].iat[0], part["scenario"].iat[0])
+            if pending and pending[0][0] != key:
+                yield pending[0][0], pd.concat([p for _, p in pending], ignore_index=True)
+                pending = []
+            pending.append((key, part))
+    if pending:
+        yield pending[0][0], pd.concat([p for _, p in pending], ignore_index=True)
+
+
+def series_volatility(frame: pd.DataFrame, steps_per_day: int = 1, windows=WINDOWS,
+                      lam: float = LAMBDA) -> pd.DataFrame:
+    """Volatility surface of one (region, scenario) series sorted by ts.
+
+    frame holds the trailing-window stds from _window_sql; the EWMA std is
+    added here, its decay per day spread over steps_per_day observations.
+    """
+    alpha = 1 - lam ** (1 / steps_per_day)
+    out = {c: frame[c].to_numpy() for c in ("ts", "region", "scenario")}
+    for name, col in SERIES.items():
+        for days in windows:
+            out[f"{name}_vol_{days}d"] = frame[f"{name}_vol_{days}d"].to_numpy(dtype=float, na_value=np.nan)
+        out[f"{name}_vol_ewma"] = frame[col].ewm(alpha=alpha, min_periods=2).std().to_numpy()
+    return pd.DataFrame(out)
+
+
+def volatility_frames(con, relation: str = "v_price_drivers_daily", hourly: bool = False,
+                      intraday: bool = False, windows=WINDOWS, lam: float = LAMBDA):
+    """Yield the volatility surface of each (region, scenario) series in turn."""
+    columns = {r[0] for r in con.execute(f"DESCRIBE SELECT * FROM {relation}").fetchall()}
+    missing = {"date", "region", "scenario", *SERIES.values()} - columns
+    if missing:
+        raise RuntimeError(f"Volatility input is missing columns: {missing}")
+    steps_per_day = 24 if hourly else 1
+    sql = _hourly_sql(relation, columns) if hourly else _daily_sql(relation)
+    result = con.execute(_window_sql(sql, steps_per_day, windows))
+    for _, frame in _series(result):
+        vol = series_volatility(frame, steps_per_day, windows, lam)
+        if hourly and not intraday:
+            # End-of-day surface: the last hour observed on each day
+            day = vol["ts"].dt.normalize()
+            vol = vol[~day.duplicated(keep="last").to_numpy()]
+        yield vol if (hourly and intraday) else vol.rename(columns={"ts": "date"})
+
+
+def rolling_volatility(con, relation: str = "v_price_drivers_daily", **kwargs) -> pd.DataFrame:
+    """All series' volatility surfaces in one frame (for daily-sized inputs)."""
+    frames = list(volatility_frames(con, relation, **kwargs))
+    if not frames:
+        return pd.DataFrame()
+    out = pd.concat(frames, ignore_index=True)
+    if "date" in out:
+        out["date"] = out["date"].dt.date
+    return out
+
+
+def write_volatility(con, out=VOL_CSV, relation: str = "v_price_drivers_daily", **kwargs) -> int:
+    """Stream every series' surface into out (CSV); returns the rows written."""
+    out = Path(out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_name(f".{out.name}.tmp")
+    n = 0
+    for vol in volatility_frames(con, relation, **kwargs):
+        if "date" in vol:
+            vol = vol.assign(date=vol["date"].dt.date)
+        vol.to_csv(tmp, mode="a" if n else "w", header=not n, index=False)
+        n += len(vol)
+    if n:
+        tmp.replace(out)
+    return n
+
+
+def main(argv=None):
+    from power_market.cache import configure, connect
+    from power_market.rollup import reader
+
+    parser = argparse.ArgumentParser(description="Rolling and EWMA price/DART volatility by region and scenario.")
+    parser.add_argument("--hourly", nargs="?", const=str(HOURLY_CSV),
+                        help="Use an hourly/nodal file (default data/market_hourly_fundamentals.csv)")
+    parser.add_argument("--intraday", action="store_true", help="With --hourly, keep every hour")
+    parser.add_argument("--windows", default=",".join(map(str, WINDOWS)), help="Trailing windows in days")
+    parser.add_argument("--lam", type=float, default=LAMBDA, help="EWMA decay per day")
+    parser.add_argument("--out", default=str(VOL_CSV))
+    args = parser.parse_args(argv)
+
+    windows = tuple(int(w) for w in args.windows.split(","))
+    t0 = time.perf_counter()
+    if args.hourly:
+        con = configure(duckdb.connect())
+        relation = reader(args.hourly)
+    else:
+        con = connect(names=["v_price_drivers_daily"])
+        relation = "v_price_drivers_daily"
+    try:
+        n = write_volatility(con, Path(args.out), relation, hourly=bool(args.hourly),
+                             intraday=args.intraday, windows=windows, lam=args.lam)
+    finally:
+        con.close()
+    print(f"✔ saved -> {args.out} ({n:,} rows, {time.perf_counter() - t0:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# warehouse.py
+# Build power_market.duckdb from the SQL scripts (base tables + materialized views).
+#
+# Usage (from anywhere):
+#   python -m power_market.warehouse
+#   python -m power_market.warehouse --hourly --memory-limit 2GB
+# Equivalent to running sql/01_setup.sql, 02_views.sql and 03_questions.sql in the
+# DuckDB CLI from the project root. With --hourly, data/market_hourly_fundamentals.csv
+# (or the given path) is first rolled up to data/market_daily_fundamentals.csv
+# out of core (see rollup.py). After each script the tables are checked
+# against schema.py and region/scenario/tech become ENUMs.
+
+import argparse
+import os
+from contextlib import contextmanager
+
+import duckdb
+
+from power_market.cache import configure
+from power_market.paths import HOURLY_CSV, ROOT, SQL_DIR
+from power_market.schema import enforce
+
+SQL_SCRIPTS = ["01_setup.sql", "02_views.sql", "03_questions.sql"]
+
+
+@contextmanager
+def _in_project_root():
+    # The SQL scripts use paths relative to the project root (or PM_HOME)
+    prev = os.getcwd()
+    os.chdir(ROOT)
+    try:
+        yield
+    finally:
+        os.chdir(prev)
+
+
+def build(scripts=None, hourly=None, memory_limit=None):
+    if hourly:
+        from power_market.rollup import rollup_to_daily
+
+        rows = rollup_to_daily(hourly, memory_limit=memory_limit)
+        print(f"✔ rolled up {hourly} -> {rows:,} daily rows")
+
+    with _in_project_root(), duckdb.connect() as con:
+        configure(con, memory_limit=memory_limit)
+        for name in (scripts or SQL_SCRIPTS):
+            con.execute((SQL_DIR / name).read_text())
+            # Validate the tables just (re)created and apply their declared types
+            enforce(con)
+            print("✔ ran ->", SQL_DIR / name)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the DuckDB warehouse.")
+    parser.add_argument("--hourly", nargs="?", const=str(HOURLY_CSV),
+                        help="Roll an hourly/nodal file up to daily first (default data/market_hourly_fundamentals.csv)")
+    parser.add_argument("--memory-limit", help="DuckDB memory_limit, e.g. 2GB (default PM_MEMORY_LIMIT)")
+    args = parser.parse_args(argv)
+    build(hourly=args.hourly, memory_limit=args.memory_limit)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,8 @@ ATTACH 'power_market.duckdb' AS db;
 USE db;
 
 -- Create or replace base tables
+-- (python -m power_market.warehouse then checks them against power_market/schema.py
+--  and stores region/scenario/tech as ENUMs)
 CREATE OR REPLACE TABLE market_daily AS
 SELECT * FROM read_csv_auto('data/market_daily_fundamentals.csv');
 
@@ -1,11 +1,15 @@
 
 -- 02_views.sql
--- Derive analytical views
+-- Derive analytical views, materialized as tables inside the warehouse so the
+-- Python analyses query them straight from power_market.duckdb with their
+-- DATE/DOUBLE types intact (no CSV export + re-parse on every run).
+-- Re-run after reloading the base tables in 01_setup.sql.
 
 USE db;
 
 -- Price drivers joined with monthly fuel (natgas) price
-CREATE OR REPLACE VIEW v_price_drivers_daily AS
+-- Sorted by (region, scenario, date) so region/scenario/date filters can skip row groups
+CREATE OR REPLACE TABLE v_price_drivers_daily AS
 WITH m AS (
   SELECT
     date, region, scenario,
@@ -21,36 +25,41 @@ f AS (
 )
 SELECT
   m.*,
-  f.natgas_usd_mmbtu AS natgas_monthly
+  CAST(f.natgas_usd_mmbtu AS DOUBLE) AS natgas_monthly
 FROM m
 JOIN f
   ON date_trunc('month', m.date) = f.month
- AND m.region = f.region;
+ AND m.region = f.region
+ORDER BY m.region, m.scenario, m.date;
 
 -- Monthly LMP decomposition (energy vs congestion vs losses)
-CREATE OR REPLACE VIEW v_lmp_components_monthly AS
+CREATE OR REPLACE TABLE v_lmp_components_monthly AS
 SELECT
   region,
-  date_trunc('month', date) AS month,
+  date_trunc('month', date)::DATE AS month,
   AVG(avg_price_usd_mwh)          AS price_usd_mwh,
   AVG(energy_cost_usd_mwh)        AS energy_usd_mwh,
   AVG(congestion_cost_usd_mwh)    AS congestion_usd_mwh,
   AVG(losses_cost_usd_mwh)        AS losses_usd_mwh
 FROM market_daily
-GROUP BY 1,2;
+GROUP BY 1,2
+ORDER BY 1,2;
 
 -- Renewable share vs curtailment by month + scenario
-CREATE OR REPLACE VIEW v_renew_share_curtailment AS
+CREATE OR REPLACE TABLE v_renew_share_curtailment AS
 SELECT
   region,
   scenario,
-  date_trunc('month', date) AS month,
+  date_trunc('month', date)::DATE AS month,
   AVG(renewable_share_pct)  AS avg_renew_share_pct,
   SUM(curtailment_mwh)      AS curtailment_mwh_month
 FROM market_daily
-GROUP BY 1,2,3;
+GROUP BY 1,2,3
+ORDER BY 1,2,3;
 
--- Optional: Export views to CSV (uncomment to run)
+-- Optional: Export views to CSV for Tableau (uncomment to run).
+-- The Python analyses no longer need these; they fall back to them only when
+-- the warehouse has not been built.
 -- COPY (SELECT * FROM v_price_drivers_daily)     TO 'outputs/v_price_drivers_daily.csv' WITH (HEADER, DELIMITER ',');
 -- COPY (SELECT * FROM v_lmp_components_monthly)  TO 'outputs/v_lmp_components_monthly.csv' WITH (HEADER, DELIMITER ',');
 -- COPY (SELECT * FROM v_renew_share_curtailment) TO 'outputs/v_renew_share_curtailment.csv' WITH (HEADER, DELIMITER ',');
@@ -0,0 +1,15 @@
+import numpy as np
+
+from power_market.api import correlation_matrix, dart_stats
+from power_market.cache import connect
+from power_market.correlation import MOMENT_COLS
+
+
+def test_frame_answers_come_back_as_computed():
+    with connect(names=["v_price_drivers_daily"]) as con:
+        corr = correlation_matrix(con)
+        stats = dart_stats(con, regions=["CAISO"])
+    assert list(corr.columns) == ["", *MOMENT_COLS]
+    assert corr[""].tolist() == list(MOMENT_COLS)
+    np.testing.assert_allclose(np.diag(corr[MOMENT_COLS].to_numpy()), 1.0)
+    assert stats["region"].tolist() == ["CAISO"]
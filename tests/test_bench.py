@@ -0,0 +1,8 @@
+from power_market.bench import bench_scale
+
+
+def test_bench_smoke():
+    records = bench_scale("2x2x1", ["q06"])
+    assert [r["qid"] for r in records] == ["generate", "warehouse", "q06"]
+    q06 = records[-1]
+    assert q06["seconds"] > 0 and q06["peak_rss_mb"] > 0 and q06["market_rows"] > 0
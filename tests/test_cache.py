@@ -0,0 +1,35 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from power_market.synth import generate
+
+REPO = Path(__file__).resolve().parent.parent
+
+CHECK = """
+from power_market.cache import connect
+from power_market.paths import CACHE_DIR, SOURCE_CSVS
+
+con = connect()
+for name in SOURCE_CSVS:
+    assert con.execute(f"SELECT count(*) FROM {name}").fetchone()[0] > 0, name
+region = con.execute("SELECT typeof(region) FROM v_price_drivers_daily LIMIT 1").fetchone()[0]
+assert region.startswith("ENUM"), region
+assert not list(CACHE_DIR.glob("*.parquet")), "warehouse tables went through the CSV cache"
+"""
+
+
+def _python(home, *args):
+    env = {**os.environ, "PM_HOME": str(home)}
+    return subprocess.run([sys.executable, *args], cwd=REPO, env=env, capture_output=True, text=True)
+
+
+def test_connect_on_warehouse_without_exported_csvs(tmp_path):
+    generate(tmp_path, regions=2, scenarios=2, years=1)
+    built = _python(tmp_path, "-m", "power_market.warehouse")
+    assert built.returncode == 0, built.stderr
+    assert not list((tmp_path / "outputs").glob("v_*.csv"))
+
+    out = _python(tmp_path, "-c", CHECK)
+    assert out.returncode == 0, out.stderr
@@ -0,0 +1,50 @@
+import duckdb
+import numpy as np
+import pandas as pd
+import pytest
+
+from power_market.deltas import scenario_deltas
+
+
+@pytest.fixture
+def con():
+    rng = np.random.default_rng(1)
+    days = pd.date_range("2024-01-01", "2024-06-30", freq="D")
+    df = pd.DataFrame([(d, r, s) for r in ["A", "B"] for s in ["Baseline", "Hot", "Wet"] for d in days],
+                      columns=["date", "region", "scenario"])
+    df["p"] = rng.normal(40, 5, len(df))
+    df["q"] = rng.normal(100, 10, len(df))
+    # No reference for B in March; a zero reference for A's April q
+    df = df[~((df["region"] == "B") & (df["scenario"] == "Baseline") & (df["date"].dt.month == 3))]
+    df.loc[(df["region"] == "A") & (df["scenario"] == "Baseline") & (df["date"].dt.month == 4), "q"] = 0.0
+    con = duckdb.connect()
+    con.register("t", df)
+    yield con
+    con.close()
+
+
+SELF_JOIN = """
+    WITH m AS (
+        SELECT region, scenario, date_trunc('month', date)::DATE AS month, avg(p) AS price, sum(q) AS q
+        FROM t GROUP BY ALL
+    )
+    SELECT s.region, s.scenario, s.month,
+           s.price, b.price AS price_ref, s.price - b.price AS price_delta,
+           CASE WHEN b.price = 0 THEN NULL ELSE (s.price - b.price) / b.price END AS price_pct_delta,
+           s.q, b.q AS q_ref, s.q - b.q AS q_delta,
+           CASE WHEN b.q = 0 THEN NULL ELSE (s.q - b.q) / b.q END AS q_pct_delta
+    FROM m s JOIN m b ON b.region = s.region AND b.month = s.month AND b.scenario = 'Baseline'
+    WHERE s.scenario <> 'Baseline' {extra}
+    ORDER BY region, scenario, month
+"""
+
+
+@pytest.mark.parametrize("scenarios", [None, ["Wet"]])
+def test_single_pass_matches_self_join(con, scenarios):
+    got = scenario_deltas(con, "t", {"price": "AVG(p)", "q": "SUM(q)"}, grain="month", scenarios=scenarios)
+    got = got.order("region, scenario, month").df()
+    want = con.sql(SELF_JOIN.format(extra="AND s.scenario = 'Wet'" if scenarios else "")).df()
+    assert len(want) == (2 * 6 - 1) * (1 if scenarios else 2)
+    pd.testing.assert_frame_equal(got, want, check_exact=False, rtol=1e-12)
+    assert got.loc[got["month"].astype(str).str.startswith("2024-04") & (got["region"] == "A"),
+                   "q_pct_delta"].isna().all()
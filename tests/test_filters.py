@@ -0,0 +1,72 @@
+import duckdb
+import pytest
+
+from power_market.deltas import scenario_deltas
+from power_market.filters import Filters, identifier, sql_list, sql_literal
+
+
+@pytest.fixture
+def con():
+    con = duckdb.connect()
+    con.execute("""
+        CREATE TABLE t AS SELECT * FROM (VALUES
+            (DATE '2024-01-01', 'CAISO', 'Baseline', 1.0),
+            (DATE '2024-01-02', 'CAISO', 'Baseline', 2.0),
+            (DATE '2024-01-01', 'O''Hare', 'Baseline', 3.0),
+            (DATE '2024-01-01', 'CAISO', 'Carbon_Tax', 5.0)
+        ) v(date, region, scenario, x)
+    """)
+    yield con
+    con.close()
+
+
+def test_literal_doubles_quotes():
+    assert sql_literal("O'Hare") == "'O''Hare'"
+    assert sql_list(["a", "b'c", 6, 7.5]) == "'a', 'b''c', 6, 7.5"
+
+
+def test_identifier_rejects_expressions():
+    assert identifier("region") == "region"
+    for bad in ["year(date)", "region; DROP TABLE t", "a b", "", None]:
+        with pytest.raises(ValueError):
+            identifier(bad)
+
+
+def test_where_matches_quoted_labels(con):
+    where = Filters(regions=["O'Hare"]).where("t", {"date", "region", "scenario", "x"})
+    assert con.execute(f"SELECT sum(x) FROM t {where}").fetchone()[0] == 3.0
+
+
+def test_injection_stays_a_literal(con):
+    evil = "CAISO'); CREATE TABLE pwned AS SELECT 1; SELECT 1 WHERE '1' IN ('1"
+    where = Filters(regions=[evil]).where("t", {"date", "region", "scenario", "x"})
+    assert con.execute(f"SELECT count(*) FROM t {where}").fetchone()[0] == 0
+    assert con.execute("SELECT count(*) FROM duckdb_tables() WHERE table_name = 'pwned'").fetchone()[0] == 0
+
+
+def test_date_bounds_by_grain(con):
+    f = Filters(start="2024-01-02", end="2024-03-31")
+    assert f.predicates("t", {"date"}) == ["date >= DATE '2024-01-02'", "date <= DATE '2024-03-31'"]
+    assert f.predicates("fuel_prices_monthly", {"month"}) == ["month >= DATE '2024-01-01'", "month <= DATE '2024-03-31'"]
+    assert f.predicates("capacity_plan", {"year"}) == ["year >= 2024", "year <= 2024"]
+
+
+def test_deltas_quote_reference_and_check_identifiers(con):
+    con.execute("UPDATE t SET scenario = 'Base''line' WHERE scenario = 'Baseline'")
+    d = scenario_deltas(con, "t", {"x": "AVG(x)"}, grain="day", reference="Base'line").df()
+    assert d[["region", "scenario", "x_delta"]].values.tolist() == [["CAISO", "Carbon_Tax", 4.0]]
+    with pytest.raises(ValueError):
+        scenario_deltas(con, "t", {"x": "AVG(x)"}, keys=["region) --"])
+
+
+def test_service_rejects_unknown_labels():
+    from power_market.service import _filters
+
+    labels = {"region": {"CAISO", "ERCOT"}, "scenario": {"Baseline", "Carbon_Tax"}}
+    f = _filters({"region": ["CAISO,ERCOT"], "scenario": ["Carbon_Tax"]}, labels)
+    assert f.regions == ["CAISO", "ERCOT"] and f.scenarios == ["Baseline", "Carbon_Tax"]
+    assert _filters({}, labels) is None
+    with pytest.raises(ValueError, match="Unknown region"):
+        _filters({"region": ["CAISO') OR ('1"]}, labels)
+    with pytest.raises(ValueError, match="Unknown scenario"):
+        _filters({"scenario": ["Nope"]}, labels)
@@ -0,0 +1,25 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from power_market import fleet
+
+
+def test_shard_rows_match_masks():
+    rng = np.random.default_rng(5)
+    fm = SimpleNamespace(region=rng.integers(0, 3, 500), scenario=rng.integers(0, 4, 500),
+                         categories={"region": ["A", "B", "C"], "scenario": ["s0", "s1", "s2", "s3"]})
+    rows = fleet.shard_rows(fm)
+    assert len(rows) == 12
+    for (region, scenario), idx in rows.items():
+        rc, sc = fm.categories["region"].index(region), fm.categories["scenario"].index(scenario)
+        np.testing.assert_array_equal(idx, np.flatnonzero((fm.region == rc) & (fm.scenario == sc)))
+
+
+def test_empty_selection_gives_empty_metrics(tmp_path, monkeypatch):
+    monkeypatch.setattr(fleet, "FLEET_DIR", tmp_path)
+    df = pd.DataFrame({"date": pd.to_datetime(["2024-01-01"]), "region": ["A"], "scenario": ["s0"],
+                       fleet.TARGET: [1.0], **{c: [0.0] for c in fleet.NUM_FEATS}})
+    metrics = fleet.train_fleet(df, regions=["Nowhere"])
+    assert metrics.empty and list(metrics.columns) == fleet.METRIC_COLUMNS
@@ -0,0 +1,66 @@
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+REPO = Path(__file__).resolve().parent.parent
+QUESTIONS = "q07,q10,q15,q03,q08"
+ANSWERS = ["q07_price_delta_vs_baseline", "q10_dart_spread_delta_storage_focus",
+           "q15_price_and_dart_volatility_monthly", "q03_correlations", "q08_corr_natgas_vs_price_by_scenario"]
+
+
+def _runner(home, *args):
+    env = {**os.environ, "PM_HOME": str(home)}
+    out = subprocess.run([sys.executable, "-m", "power_market.runner", "--only", QUESTIONS, *args],
+                         cwd=REPO, env=env, capture_output=True, text=True, check=True)
+    return out.stdout
+
+
+def _answers(home):
+    return {a: pd.read_csv(home / "outputs" / "answers" / f"{a}.csv") for a in ANSWERS}
+
+
+@pytest.fixture
+def home(tmp_path):
+    shutil.copytree(REPO / "data", tmp_path / "data")
+    (tmp_path / "outputs").mkdir()
+    for csv in (REPO / "outputs").glob("v_*.csv"):
+        shutil.copy(csv, tmp_path / "outputs")
+    return tmp_path
+
+
+def test_refresh_equals_full_rebuild(home):
+    _runner(home, "--incremental")
+
+    # Restate the last month of one region and append a day after it
+    path = home / "outputs" / "v_price_drivers_daily.csv"
+    df = pd.read_csv(path, float_precision="round_trip")  # untouched rows keep their digests
+    last = df["date"].max()
+    restated = (df["region"] == "CAISO") & (df["date"] >= last[:8] + "01")
+    df.loc[restated, "avg_price_usd_mwh"] += 7.5
+    df.loc[restated, "dart_spread_usd_mwh"] -= 1.25
+    new_day = df[df["date"] == last].assign(date=str((pd.Timestamp(last) + pd.Timedelta(days=1)).date()))
+    pd.concat([df, new_day]).to_csv(path, index=False)
+
+    out = _runner(home, "--incremental")
+    # CAISO's last month in every scenario, plus the new day's month everywhere
+    assert "q07 incremental: 30 partition(s) recomputed" in out
+    assert "correlation moments: 30 partition(s) rescanned" in out
+    refreshed = _answers(home)
+
+    _runner(home, "--no-memo")
+    rebuilt = _answers(home)
+    for name in ANSWERS:
+        pd.testing.assert_frame_equal(refreshed[name], rebuilt[name], check_exact=False, rtol=1e-9, atol=1e-12)
+
+
+def test_untouched_source_skips_the_scan(home):
+    _runner(home, "--incremental")
+    out = _runner(home, "--incremental")
+    for qid in ["q07", "q10", "q15"]:
+        assert f"{qid} incremental: up to date" in out
+    assert "correlation moments: up to date" in out
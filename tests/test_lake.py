@@ -0,0 +1,30 @@
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+
+
+def _lake(home, *args):
+    env = {**os.environ, "PM_HOME": str(home)}
+    return subprocess.run([sys.executable, "-m", "power_market.lake", *args],
+                          cwd=REPO, env=env, capture_output=True, text=True)
+
+
+def test_ingest_skips_tables_without_a_source(tmp_path):
+    # The shipped layout: raw fuel/capacity CSVs and the exported views, no warehouse
+    shutil.copytree(REPO / "data", tmp_path / "data")
+    (tmp_path / "outputs").mkdir()
+    for csv in (REPO / "outputs").glob("v_*.csv"):
+        shutil.copy(csv, tmp_path / "outputs")
+
+    out = _lake(tmp_path)
+    assert out.returncode == 0, out.stderr
+    assert "skipped market_daily" in out.stdout
+    assert sorted(p.name for p in (tmp_path / "lake").iterdir() if p.is_dir()) == [
+        "fuel_prices_monthly", "v_lmp_components_monthly", "v_price_drivers_daily", "v_renew_share_curtailment"]
+
+    out = _lake(tmp_path, "--tables", "market_daily")
+    assert out.returncode != 0 and "market_daily_fundamentals.csv" in out.stderr
@@ -0,0 +1,21 @@
+from pathlib import Path
+
+from power_market import memo
+
+
+def _question(con):
+    from power_market.deltas import scenario_deltas  # filters.py only through deltas.py
+
+    return scenario_deltas(con, "t", {"x": "AVG(x)"})
+
+
+def test_closure_follows_imports_transitively():
+    names = [p.name for p in memo._module_closure({"power_market.deltas"})]
+    assert names == ["deltas.py", "filters.py"]
+
+
+def test_code_version_changes_with_a_transitive_dependency(monkeypatch):
+    before = memo.code_version(_question)
+    read = Path.read_bytes
+    monkeypatch.setattr(Path, "read_bytes", lambda p: read(p) + (b"\n# edited\n" if p.name == "filters.py" else b""))
+    assert memo.code_version(_question) != before
@@ -0,0 +1,58 @@
+import duckdb
+import numpy as np
+import pandas as pd
+import pytest
+
+from power_market.cache import connect
+from power_market.questions import q14
+from power_market.regression import grouped_ols
+
+
+@pytest.fixture
+def con():
+    rng = np.random.default_rng(7)
+    n = 400
+    df = pd.DataFrame({
+        "region": rng.choice(["A", "B", "C"], n),
+        "date": pd.date_range("2023-01-01", periods=n, freq="D"),
+        "x1": rng.normal(10, 3, n),
+        "x2": rng.normal(0, 1, n),
+    })
+    df["y"] = 5 + 1.5 * df["x1"] - 2 * df["x2"] + rng.normal(0, 0.5, n)
+    con = duckdb.connect()
+    con.register("t", df)
+    yield con, df
+    con.close()
+
+
+def test_grouped_ols_matches_lstsq(con):
+    con, df = con
+    fit = grouped_ols(con, "t", y="y", x=["x1", "x2"], by=["region"], min_obs=10)
+    assert fit.keys["region"].tolist() == ["A", "B", "C"]
+    for g, region in enumerate(fit.keys["region"]):
+        sub = df[df["region"] == region]
+        X = np.column_stack([np.ones(len(sub)), sub[["x1", "x2"]]])
+        coef, *_ = np.linalg.lstsq(X, sub["y"].to_numpy(), rcond=None)
+        resid = sub["y"].to_numpy() - X @ coef
+        r2 = 1 - resid.var() / sub["y"].var(ddof=0)
+        assert fit.n[g] == len(sub)
+        np.testing.assert_allclose([fit.intercept[g], *fit.beta[g]], coef, rtol=1e-9, atol=1e-9)
+        np.testing.assert_allclose(fit.r2[g], r2, rtol=1e-9)
+
+
+def test_grouped_ols_expression_keys(con):
+    con, df = con
+    fit = grouped_ols(con, "t", y="y", x={"x1": "x1"}, by=["region", "year(date) AS year"], min_obs=1)
+    assert list(fit.keys.columns) == ["region", "year"]
+    assert fit.n.sum() == len(df)
+
+
+def test_q14_accepts_expression_keys():
+    con = connect(names=["v_price_drivers_daily"])
+    try:
+        out = q14(con, by=("region", "year(date) AS year"))
+        assert {"region", "year", "r2", "beta_natgas", "beta_cdd"} <= set(out.columns)
+        with pytest.raises(RuntimeError, match="no_such_column"):
+            q14(con, by=("no_such_column",))
+    finally:
+        con.close()
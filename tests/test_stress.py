@@ -0,0 +1,78 @@
+import duckdb
+import numpy as np
+import pandas as pd
+import pytest
+
+from power_market.stress import stress_screen
+
+
+@pytest.fixture
+def con():
+    rng = np.random.default_rng(3)
+    days = pd.date_range("2022-01-01", "2024-12-31", freq="D")
+    regions, scenarios = ["A", "B"], ["Baseline", "Hot"]
+    daily = pd.DataFrame(
+        [(d, r, s) for r in regions for s in scenarios for d in days], columns=["date", "region", "scenario"])
+    daily["cdd"] = rng.gamma(2, 3, len(daily))
+    daily["hdd"] = rng.gamma(2, 3, len(daily))
+    months = pd.date_range("2022-01-01", "2024-12-01", freq="MS")
+    lmp = pd.DataFrame([(r, m) for r in regions for m in months], columns=["region", "month"])
+    lmp["congestion_usd_mwh"] = rng.normal(2, 1, len(lmp))
+    curt = pd.DataFrame([(r, s, m) for r in regions for s in scenarios for m in months],
+                        columns=["region", "scenario", "month"])
+    curt["curtailment_mwh_month"] = rng.gamma(3, 1e5, len(curt))
+
+    con = duckdb.connect()
+    for name, df in [("v_price_drivers_daily", daily), ("v_lmp_components_monthly", lmp),
+                     ("v_renew_share_curtailment", curt)]:
+        con.register(f"{name}_df", df)
+        con.execute(f"CREATE TABLE {name} AS SELECT * REPLACE (CAST({'date' if 'date' in df else 'month'} AS DATE) "
+                    f"AS {'date' if 'date' in df else 'month'}) FROM {name}_df")
+    yield con, daily, lmp, curt
+    con.close()
+
+
+def _pandas_screen(daily, lmp, curt, weights, months, threshold):
+    """Reference: monthly aggregates, merges and groupby z-scores in plain pandas."""
+    # Shared component: one monthly value per region over every scenario's rows
+    cdd = (daily.assign(month=lambda d: d["date"].dt.to_period("M").dt.to_timestamp())
+           .groupby(["region", "month"], as_index=False)["cdd"].mean())
+    df = (cdd.merge(lmp, on=["region", "month"])
+          .merge(curt, on=["region", "month"]))
+    df = df[df["month"].dt.month.isin(months)]
+    cols = {"cdd": "cdd", "congestion": "congestion_usd_mwh", "curtailment": "curtailment_mwh_month"}
+    score = 0.0
+    for name, col in cols.items():
+        g = df.groupby(["scenario", "region"])[col]
+        z = ((df[col] - g.transform("mean")) / g.transform(lambda s: s.std(ddof=0))).fillna(0)
+        df[f"z_{name}"] = z
+        score = score + weights.get(name, 1.0) * z
+    df["stress_score"] = score
+    df["stress_flag"] = df["stress_score"] >= threshold
+    return df.sort_values(["scenario", "region", "month"]).reset_index(drop=True)
+
+
+def test_screen_matches_pandas_zscores(con):
+    con, daily, lmp, curt = con
+    weights = {"cdd": 2.0, "curtailment": 0.5}
+    got = stress_screen(con, weights=weights, scenarios=None, threshold=1.0)
+    want = _pandas_screen(daily, lmp, curt, weights, (6, 7, 8, 9), threshold=1.0)
+
+    got = got.assign(month=pd.to_datetime(got["month"])).sort_values(["scenario", "region", "month"])
+    got = got.reset_index(drop=True)
+    assert len(got) == len(want) == 2 * 2 * 3 * 4
+    assert (got[["scenario", "region", "month"]].astype(str).values
+            == want[["scenario", "region", "month"]].astype(str).values).all()
+    for col in ["z_cdd", "z_congestion", "z_curtailment", "stress_score"]:
+        np.testing.assert_allclose(got[col], want[col], rtol=1e-9, atol=1e-12)
+    assert (got["stress_flag"] == want["stress_flag"]).all()
+
+    # Ranks: dense rank of the score within each (scenario, season, region)
+    rank = want.groupby(["scenario", "region"])["stress_score"].rank(method="dense", ascending=False)
+    assert (got["rank_in_region"].to_numpy() == rank.to_numpy()).all()
+
+
+def test_unknown_weight_is_an_error(con):
+    con = con[0]
+    with pytest.raises(ValueError, match="price"):
+        stress_screen(con, weights={"price": 1.0})
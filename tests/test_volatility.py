@@ -0,0 +1,31 @@
+import duckdb
+import numpy as np
+import pandas as pd
+
+from power_market.volatility import rolling_volatility
+
+
+def test_windows_match_pandas_time_rolling():
+    rng = np.random.default_rng(11)
+    dates = pd.date_range("2024-01-01", "2024-12-31", freq="D")
+    df = pd.concat([
+        pd.DataFrame({"date": dates, "region": r, "scenario": "Baseline",
+                      "avg_price_usd_mwh": rng.normal(40, 5, len(dates)),
+                      "dart_spread_usd_mwh": rng.normal(0, 2, len(dates))})
+        .drop(index=rng.choice(len(dates), 40, replace=False))  # gaps: windows hold fewer rows
+        for r in ["A", "B"]
+    ])
+    con = duckdb.connect()
+    con.register("t", df)
+    got = rolling_volatility(con, "t", windows=(7, 30))
+
+    for region, sub in df.groupby("region"):
+        s = sub.set_index("date")
+        g = got[got["region"] == region].reset_index(drop=True)
+        age = s.index - s.index[0]
+        for name, col in [("price", "avg_price_usd_mwh"), ("dart", "dart_spread_usd_mwh")]:
+            for days in (7, 30):
+                want = s[col].rolling(f"{days}D", min_periods=2).std()
+                want = want.where(age >= pd.Timedelta(days=days - 1))
+                np.testing.assert_allclose(g[f"{name}_vol_{days}d"], want, rtol=1e-9)
+            np.testing.assert_allclose(g[f"{name}_vol_ewma"], s[col].ewm(alpha=0.06, min_periods=2).std(), rtol=1e-12)